@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Projeto, Beneficiario, Confrontante, Vertice
+from .models import Projeto, Beneficiario, Confrontante, Vertice, Tarefa
 
 @admin.register(Projeto)
 class ProjetoAdmin(admin.ModelAdmin):
@@ -18,4 +18,9 @@ class ConfrontanteAdmin(admin.ModelAdmin):
 @admin.register(Vertice)
 class VerticeAdmin(admin.ModelAdmin):
     list_display = ['de_vertice', 'para_vertice', 'longitude', 'latitude', 'distancia', 'confrontante', 'confrontante_texto', 'projeto']
-    list_filter = ['projeto']
\ No newline at end of file
+    list_filter = ['projeto']
+
+@admin.register(Tarefa)
+class TarefaAdmin(admin.ModelAdmin):
+    list_display = ['tipo', 'projeto', 'status', 'linhas_processadas', 'erros', 'criado_em', 'concluido_em']
+    list_filter = ['status', 'tipo']
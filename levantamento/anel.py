@@ -0,0 +1,82 @@
+from collections import Counter
+from dataclasses import dataclass, field
+
+
+# ======ANEL DE VERTICES (DE_VERTICE -> PARA_VERTICE)======
+
+@dataclass
+class Anel:
+    """
+    Ordem dos vértices seguindo a cadeia de para_vertice. ordem tem os
+    índices da lista de entrada: primeiro os da cadeia a partir do início,
+    depois os que ficaram fora dela, na ordem em que vieram.
+    """
+    ordem: list
+    fechado: bool = False  # a cadeia voltou ao vértice inicial passando por todos
+    duplicados: list = field(default_factory=list)  # de_vertice repetidos
+    ramificacoes: list = field(default_factory=list)  # para_vertice apontado por mais de um vértice
+    quebras: list = field(default_factory=list)  # (de, para) com para_vertice inexistente
+    fora_do_anel: list = field(default_factory=list)  # de_vertice não alcançados pela cadeia
+
+    @property
+    def valido(self):
+        return self.fechado and not (self.duplicados or self.ramificacoes)
+
+    @property
+    def mensagem(self):
+        if self.valido:
+            return f"Anel fechado com {len(self.ordem)} vértices."
+        partes = []
+        if self.quebras:
+            lista = ", ".join(f"{de} -> {para or '(vazio)'}" for de, para in self.quebras[:20])
+            partes.append(f"Sequência interrompida em {len(self.quebras)} vértice(s): {lista}")
+        if self.duplicados:
+            partes.append(f"Vértices repetidos: {', '.join(self.duplicados[:20])}")
+        if self.ramificacoes:
+            partes.append(f"Vértices de chegada de mais de um lado: {', '.join(self.ramificacoes[:20])}")
+        if self.fora_do_anel:
+            partes.append(f"Fora do anel: {len(self.fora_do_anel)} vértice(s)")
+        if not partes:
+            partes.append("O anel não volta ao vértice inicial")
+        return ". ".join(partes) + "."
+
+
+def montar_anel(de, para, inicio=0):
+    """
+    Segue de[i] -> para[i] a partir de de[inicio] com um dicionário de
+    rótulos, em tempo linear. Repetidos valem pela primeira ocorrência.
+    """
+    total = len(de)
+    if total == 0:
+        return Anel(ordem=[], fechado=True)
+
+    posicoes = {}
+    duplicados = []
+    for i, rotulo in enumerate(de):
+        if rotulo in posicoes:
+            duplicados.append(rotulo)
+        else:
+            posicoes[rotulo] = i
+
+    chegadas = Counter(para)
+    ramificacoes = [rotulo for rotulo, vezes in chegadas.items() if vezes > 1 and rotulo in posicoes]
+    quebras = [(de[i], para[i]) for i in range(total) if para[i] not in posicoes]
+
+    visitados = bytearray(total)
+    ordem = []
+    i = inicio
+    while i is not None and not visitados[i]:
+        visitados[i] = 1
+        ordem.append(i)
+        i = posicoes.get(para[i])
+    fechado = i == inicio and len(ordem) == total
+
+    fora = [i for i in range(total) if not visitados[i]]
+    return Anel(
+        ordem=ordem + fora,
+        fechado=fechado,
+        duplicados=duplicados,
+        ramificacoes=ramificacoes,
+        quebras=quebras,
+        fora_do_anel=[de[i] for i in fora],
+    )
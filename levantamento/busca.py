@@ -0,0 +1,166 @@
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Beneficiario, Projeto
+
+
+# ======BUSCA DE PROJETOS (AUTOCOMPLETE)======
+
+LIMITE_RESULTADOS = 20
+SIMILARIDADE_MINIMA = 0.3
+
+RE_MASCARA = re.compile(r"[.\-/]")
+RE_ESPACOS = re.compile(r"\s+")
+
+
+def normalizar(texto):
+    """Minúsculas, sem acentos, sem máscara de documento e com espaços simples."""
+    decomposto = unicodedata.normalize("NFKD", texto or "")
+    sem_acento = "".join(c for c in decomposto if not unicodedata.combining(c))
+    return RE_ESPACOS.sub(" ", RE_MASCARA.sub("", sem_acento.lower())).strip()
+
+
+def texto_busca(nome, inscricao_imobiliaria, beneficiarios):
+    """Monta a coluna busca: nome, inscrição e (nome, documento) dos beneficiários."""
+    partes = [nome, inscricao_imobiliaria or ""]
+    for ben_nome, ben_documento in beneficiarios:
+        partes += [ben_nome, ben_documento]
+    return normalizar(" ".join(partes))
+
+
+def atualizar_busca(projeto_id):
+    """Recalcula a coluna busca do projeto (chamado pelos signals)."""
+    projeto = Projeto.objects.filter(id=projeto_id).values("nome", "inscricao_imobiliaria").first()
+    if projeto is None:
+        return
+    beneficiarios = Beneficiario.objects.filter(projeto_id=projeto_id).order_by("id").values_list("nome", "documento")
+    busca = texto_busca(projeto["nome"], projeto["inscricao_imobiliaria"], beneficiarios)
+    Projeto.objects.filter(id=projeto_id).update(busca=busca)
+
+
+# ======INDICE DE PREFIXOS EM MEMORIA======
+
+TAMANHO_PREFIXO_CURTO = 4
+MAXIMO_ENTRADAS = 200_000
+# Outros workers não recebem os signals deste processo: o índice expira sozinho
+VALIDADE_INDICE = 300
+
+
+class IndicePrefixos:
+    """
+    Lista ordenada das palavras (e do restante do texto a partir delas) dos
+    nomes e inscrições dos projetos, montada na primeira busca do worker.
+    Um prefixo vira um bisect + varredura das chaves que começam com ele.
+    Acima de maximo_entradas o índice fica desligado e as buscas vão ao banco.
+    """
+
+    def __init__(self, maximo_entradas=MAXIMO_ENTRADAS, validade=VALIDADE_INDICE):
+        self.maximo_entradas = maximo_entradas
+        self.validade = validade
+        self.acertos = 0
+        self.faltas = 0
+        self._lock = threading.Lock()
+        self._chaves = None
+        self._ids = []
+        self._nomes = {}
+        self._desligado = False
+        self._construido_em = 0.0
+
+    def invalidar(self):
+        with self._lock:
+            self._chaves = None
+
+    def estatisticas(self):
+        return {
+            "acertos": self.acertos,
+            "faltas": self.faltas,
+            "entradas": len(self._chaves or ()),
+            "projetos": len(self._nomes),
+            "desligado": self._desligado,
+        }
+
+    def _construir(self):
+        entradas = []
+        nomes = {}
+        self._desligado = False
+        for projeto_id, nome, inscricao in Projeto.objects.values_list("id", "nome", "inscricao_imobiliaria").iterator():
+            nomes[projeto_id] = nome
+            for texto in (nome, inscricao):
+                palavras = normalizar(texto).split()
+                entradas.extend((" ".join(palavras[i:]), projeto_id) for i in range(len(palavras)))
+            if len(entradas) > self.maximo_entradas:
+                entradas, nomes = [], {}
+                self._desligado = True
+                break
+
+        entradas.sort()
+        self._chaves = [chave for chave, _ in entradas]
+        self._ids = [projeto_id for _, projeto_id in entradas]
+        self._nomes = nomes
+        self._construido_em = time.monotonic()
+
+    def buscar(self, prefixo, limite=LIMITE_RESULTADOS):
+        """
+        Projetos com alguma palavra do nome/inscrição começando pelo prefixo
+        (já normalizado), ordenados por nome; None se o índice estiver desligado.
+        """
+        with self._lock:
+            if self._chaves is None or time.monotonic() - self._construido_em > self.validade:
+                self.faltas += 1
+                self._construir()
+            else:
+                self.acertos += 1
+
+            if self._desligado:
+                return None
+
+            encontrados = set()
+            i = bisect_left(self._chaves, prefixo)
+            while i < len(self._chaves) and self._chaves[i].startswith(prefixo):
+                encontrados.add(self._ids[i])
+                i += 1
+            nomes = self._nomes
+
+        ordenados = sorted(encontrados, key=lambda projeto_id: (nomes[projeto_id], projeto_id))
+        return [{"id": projeto_id, "nome": nomes[projeto_id]} for projeto_id in ordenados[:limite]]
+
+
+indice_projetos = IndicePrefixos()
+
+
+def buscar_projetos(termo, limite=LIMITE_RESULTADOS):
+    """
+    Projetos cujo nome, inscrição ou beneficiários casam com o termo, como
+    lista de {"id", "nome"}. Prefixos curtos são respondidos pelo índice em
+    memória. No PostgreSQL usa o índice GIN (pg_trgm) da coluna busca e
+    ordena por similaridade; nos demais bancos faz a busca por substring.
+    """
+    termo = normalizar(termo)
+    projetos = Projeto.objects.only("id", "nome")
+
+    if not termo:
+        return list(projetos.order_by("nome")[:limite].values("id", "nome"))
+
+    if len(termo) <= TAMANHO_PREFIXO_CURTO and not termo.isdigit():
+        resultados = indice_projetos.buscar(termo, limite)
+        if resultados is not None:
+            return resultados
+
+    if connection.vendor != "postgresql":
+        return list(projetos.filter(busca__contains=termo).order_by("nome")[:limite].values("id", "nome"))
+
+    from django.contrib.postgres.search import TrigramWordSimilarity
+
+    return list(
+        projetos
+        .filter(Q(busca__contains=termo) | Q(busca__trigram_word_similar=termo))
+        .annotate(similaridade=TrigramWordSimilarity(termo, "busca"))
+        .order_by("-similaridade", "nome")[:limite]
+        .values("id", "nome")
+    )
@@ -0,0 +1,281 @@
+import re
+from functools import lru_cache
+import numpy as np
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from numpy import arctan2, degrees
+
+@lru_cache(maxsize=4096)
+def largura_texto(texto, fonte, tamanho):
+    """stringWidth memorizado: os mesmos confrontantes se repetem em muitas linhas."""
+    return float(stringWidth(texto, fonte, tamanho))
+
+
+# Calcular Largura da coluna Confrontantes
+def calcular_largura_confrontantes(tabela_dados, coluna=4, fonte='Times-Roman', tamanho=10):
+    # Cada texto distinto é medido uma vez
+    textos = {str(linha[coluna]) for linha in tabela_dados}
+    maior_largura = max((largura_texto(texto, fonte, tamanho) for texto in textos), default=0.0)
+
+    return maior_largura + 15
+
+# Calcular Azimute
+def gms_para_decimal(valor):
+    """
+    Converte '48°28'11.37" O' ou '27°12'33.12" S' para decimal
+    """
+    decimais, invalidos = gms_para_decimal_lote([valor])
+    if invalidos:
+        raise ValueError(f"Coordenada em graus/minutos/segundos inválida: {valor!r}")
+    return float(decimais[0])
+
+def parse_float_br(valor):
+    if not valor:
+        return None
+    valores, validos = parse_numeros_br([valor], ponto_decimal=False)
+    return float(valores[0]) if validos[0] else None
+
+def parse_gms(valor):
+    if not valor:
+        return ""
+    return valor.strip()
+
+
+def br(valor, casas=2):
+    try:
+        return f"{float(valor):.{casas}f}".replace(".", ",")
+    except:
+        return "0,00"
+
+def br_coord(valor, casas=3):
+    if valor is None or valor == "":
+        return "0,000"
+    try:
+        # Garante que o valor seja tratado como float antes de formatar
+        return f"{float(valor):.{casas}f}".replace(".", ",")
+    except (ValueError, TypeError):
+        return "0,000"
+
+
+def decimal_para_gms(angulo):
+    return decimal_para_gms_lote([angulo])[0]
+
+
+def calcular_azimute_utm(e1, n1, e2, n2):
+    # Lógica que você testou: (X, Y) para Azimute Topográfico
+    return decimal_para_gms(float(azimutes_utm([e1, e2], [n1, n2], fechado=False)[0]))
+
+
+def calcular_azimute(lat1, lon1, lat2, lon2):
+    return decimal_para_gms_lote(calcular_azimutes([lat1], [lon1], [lat2], [lon2]))[0]
+
+
+def process_utm_coordinate(value):
+
+    """Processa coordenada UTM do frontend para float"""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+
+    # Se já é um número válido (pode vir do banco)
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    valores, validos = parse_numeros_br([value], casas=3)
+    return float(valores[0]) if validos[0] else None
+
+
+# ======CONVERSAO VETORIZADA DE NUMEROS (FORMATO BR)======
+
+def _texto_array(valores):
+    if isinstance(valores, np.ndarray) and valores.dtype.kind == "U":
+        return valores
+    return np.array(["" if v is None else str(v) for v in valores], dtype=str)
+
+
+def _somente_digitos_ascii(texto):
+    """
+    Não vazios e só com 0-9. O isdigit aceitaria "²" e outros dígitos
+    Unicode, que o float() recusa depois.
+    """
+    return (np.char.str_len(texto) > 0) & (np.char.str_len(np.char.strip(texto, "0123456789")) == 0)
+
+
+def parse_numeros_br(valores, ponto_decimal=True, casas=None):
+    """
+    Converte uma coluna inteira de números no formato brasileiro
+    ("6.936.302,27", "755924.694", "80,29") de uma só vez.
+
+    Com vírgula, os pontos são separadores de milhar. Sem vírgula, um único
+    ponto é o separador decimal se ponto_decimal=True (como fazia
+    process_utm_coordinate); caso contrário todos os pontos são de milhar
+    (como parse_float_br). casas trunca a parte decimal após a vírgula (ex.: 3 para UTM).
+
+    Retorna (array float64, máscara de válidos); inválidos ficam como NaN.
+    """
+    texto = np.char.strip(_texto_array(valores))
+    resultado = np.full(texto.shape, np.nan, dtype=np.float64)
+    if texto.size == 0:
+        return resultado, np.zeros(texto.shape, dtype=bool)
+
+    # Sinal: no máximo um, e só no início
+    sinais = np.char.count(texto, "-") + np.char.count(texto, "+")
+    com_sinal = np.char.startswith(texto, "-") | np.char.startswith(texto, "+")
+    negativo = np.char.startswith(texto, "-")
+    corpo = np.char.lstrip(texto, "-+")
+
+    virgulas = np.char.count(corpo, ",")
+    pontos = np.char.count(corpo, ".")
+    # Separador sem dígitos depois ("6045,." / "12.") ou ponto depois da
+    # vírgula decimal ("92.51,8.5"): linha malformada, não um número
+    malformados = (
+        np.char.endswith(corpo, ",") | np.char.endswith(corpo, ".")
+        | (np.char.count(np.char.partition(corpo, ",")[..., 2], ".") > 0)
+    )
+
+    if ponto_decimal:
+        decimal_ponto = (virgulas == 0) & (pontos == 1)
+    else:
+        decimal_ponto = np.zeros(corpo.shape, dtype=bool)
+
+    # Normaliza para "inteiro,decimal" e separa as partes
+    corpo = np.where(decimal_ponto, np.char.replace(corpo, ".", ","), np.char.replace(corpo, ".", ""))
+    partes = np.char.partition(corpo, ",")
+    inteiro, decimal = partes[..., 0], partes[..., 2]
+
+    if casas is not None:
+        # Como em process_utm_coordinate, só trunca quando a vírgula é o decimal
+        truncado = decimal.astype(f"U{casas}") if casas > 0 else np.zeros_like(decimal)
+        decimal = np.where(decimal_ponto, decimal, truncado)
+
+    validos = (
+        (sinais == com_sinal.astype(int))
+        & ~malformados
+        & (np.char.count(corpo, ",") <= 1)
+        & (_somente_digitos_ascii(inteiro) | ((inteiro == "") & (decimal != "")))
+        & (_somente_digitos_ascii(decimal) | (decimal == ""))
+    )
+
+    if validos.any():
+        numeros = np.char.add(np.char.add(inteiro[validos], "."), decimal[validos])
+        numeros = np.char.add(np.where(inteiro[validos] == "", "0", ""), numeros)
+        resultado[validos] = numeros.astype(np.float64)
+        resultado[validos & negativo] *= -1
+
+    return resultado, validos
+
+
+# ======GRAUS/MINUTOS/SEGUNDOS EM LOTE======
+
+# 48°29'05.593" O | 27º27'16,418"S | -27°27'16.4" | 48° 29' 5" W
+RE_GMS = re.compile(
+    r"""
+    ^\s*(?P<sinal>[+-])?
+    (?P<graus>\d+(?:[.,]\d+)?)\s*[°º]\s*
+    (?:(?P<minutos>\d+(?:[.,]\d+)?)\s*['′’]\s*)?
+    (?:(?P<segundos>\d+(?:[.,]\d+)?)\s*(?:"|''|″|”)\s*)?
+    (?P<hemisferio>[NSEWLO])?\s*$
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+
+RE_DECIMAL = re.compile(r"^\s*[+-]?\d+(?:[.,]\d+)?\s*$")
+
+HEMISFERIOS_NEGATIVOS = frozenset("SWO")
+
+
+def gms_para_decimal_lote(valores):
+    """
+    Converte uma lista de strings GMS (ou já decimais) para graus decimais
+    com sinal (S/O/W negativos) em uma passada.
+
+    Não levanta exceção: retorna (array float64, índices inválidos), com
+    NaN nas posições inválidas.
+    """
+    n = len(valores)
+    graus = np.full(n, np.nan)
+    minutos = np.zeros(n)
+    segundos = np.zeros(n)
+    negativo = np.zeros(n, dtype=bool)
+    invalidos = []
+
+    for i, valor in enumerate(valores):
+        texto = "" if valor is None else str(valor)
+        m = RE_GMS.match(texto)
+        if m:
+            minuto = float(m["minutos"].replace(",", ".")) if m["minutos"] else 0.0
+            segundo = float(m["segundos"].replace(",", ".")) if m["segundos"] else 0.0
+            # 27°75'99" não é uma coordenada, é um erro de digitação
+            if minuto >= 60 or segundo >= 60:
+                invalidos.append(i)
+                continue
+            graus[i] = float(m["graus"].replace(",", "."))
+            minutos[i], segundos[i] = minuto, segundo
+            hemisferio = (m["hemisferio"] or "").upper()
+            negativo[i] = m["sinal"] == "-" or hemisferio in HEMISFERIOS_NEGATIVOS
+        elif RE_DECIMAL.match(texto):
+            graus[i] = float(texto.strip().replace(",", "."))
+        else:
+            invalidos.append(i)
+
+    decimais = graus + minutos / 60 + segundos / 3600
+    return np.where(negativo, -np.abs(decimais), decimais), invalidos
+
+
+def decimal_para_gms_lote(angulos, casas=2, hemisferios=None):
+    """
+    Formata graus decimais como 48°29'05.59" em lote.
+    hemisferios=("N", "S") ou ("L", "O") acrescenta a letra e usa o valor absoluto.
+    Valores NaN viram string vazia.
+    """
+    angulos = np.asarray(angulos, dtype=np.float64)
+    validos = ~np.isnan(angulos)
+
+    # Arredonda os segundos antes de separar, para não gerar 60.00"; o
+    # arredondamento pode chegar a 360° (359.99999999), que é o azimute 0°
+    total = np.round(np.abs(np.where(validos, angulos, 0.0)) * 3600, casas) % (360 * 3600)
+    graus = np.floor(total / 3600)
+    minutos = np.floor((total - graus * 3600) / 60)
+    segundos = total - graus * 3600 - minutos * 60
+
+    if hemisferios:
+        sufixos = np.where(angulos < 0, f" {hemisferios[1]}", f" {hemisferios[0]}")
+        prefixos = np.full(angulos.shape, "")
+    else:
+        sufixos = np.full(angulos.shape, "")
+        prefixos = np.where((angulos < 0) & (total > 0), "-", "")
+
+    largura = casas + 3 if casas else 2
+    return [
+        f"{p}{int(g)}°{int(m):02d}'{s:0{largura}.{casas}f}\"{h}" if ok else ""
+        for p, g, m, s, h, ok in zip(
+            prefixos.tolist(), graus.tolist(), minutos.tolist(),
+            segundos.tolist(), sufixos.tolist(), validos.tolist()
+        )
+    ]
+
+
+def azimutes_utm(e, n, fechado=True):
+    """
+    Azimutes (graus decimais, 0-360) de cada vértice para o seguinte, em
+    uma passada. fechado=True inclui o lado do último ao primeiro vértice.
+    """
+    e = np.asarray(e, dtype=np.float64)
+    n = np.asarray(n, dtype=np.float64)
+    if fechado:
+        delta_e = np.roll(e, -1) - e
+        delta_n = np.roll(n, -1) - n
+    else:
+        delta_e = np.diff(e)
+        delta_n = np.diff(n)
+    return degrees(arctan2(delta_e, delta_n)) % 360
+
+
+def calcular_azimutes(lat1, lon1, lat2, lon2):
+    """Azimutes geográficos (graus decimais) entre listas de coordenadas GMS."""
+    lat1, lon1, lat2, lon2 = (np.radians(gms_para_decimal_lote(v)[0]) for v in (lat1, lon1, lat2, lon2))
+
+    dlon = lon2 - lon1
+
+    x = np.sin(dlon) * np.cos(lat2)
+    y = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlon)
+
+    return (np.degrees(np.arctan2(x, y)) + 360) % 360
@@ -0,0 +1,149 @@
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
+from pyproj import CRS, Transformer
+
+from .calculos import decimal_para_gms_lote, gms_para_decimal_lote
+from .models import ORDEM_ANEL, Vertice
+
+
+# ======CONVERSAO UTM <-> GEOGRAFICAS (PYPROJ)======
+
+# SIRGAS 2000 geográfico e UTM fuso 22S (Meridiano Central 51º WGr, o do memorial)
+CRS_GEOGRAFICO = "EPSG:4674"
+CRS_UTM_PADRAO = "EPSG:31982"
+# Diferença, em metros no plano UTM, a partir da qual lat/long e UTM não conferem
+TOLERANCIA_PADRAO = 0.5
+# Pares de CRS com Transformer já construído (cada construção consulta o proj.db)
+MAXIMO_TRANSFORMADORES = 16
+
+
+def crs_utm():
+    return getattr(settings, "REURB_CRS_UTM", CRS_UTM_PADRAO)
+
+
+def tolerancia_coordenadas():
+    return getattr(settings, "REURB_TOLERANCIA_COORDENADAS_M", TOLERANCIA_PADRAO)
+
+
+@lru_cache(maxsize=MAXIMO_TRANSFORMADORES)
+def transformador(origem, destino):
+    """Transformer de origem para destino, sempre na ordem (x, y) = (E/lon, N/lat)."""
+    return Transformer.from_crs(origem, destino, always_xy=True)
+
+
+def utm_para_geografico(e, n, crs=None):
+    """(latitude, longitude) em graus decimais de colunas inteiras de E e N, numa chamada só."""
+    lon, lat = transformador(crs or crs_utm(), CRS_GEOGRAFICO).transform(
+        np.asarray(e, dtype=np.float64), np.asarray(n, dtype=np.float64)
+    )
+    return lat, lon
+
+
+def geografico_para_utm(lat, lon, crs=None):
+    """(E, N) de colunas inteiras de latitude e longitude em graus decimais."""
+    return transformador(CRS_GEOGRAFICO, crs or crs_utm()).transform(
+        np.asarray(lon, dtype=np.float64), np.asarray(lat, dtype=np.float64)
+    )
+
+
+@lru_cache(maxsize=MAXIMO_TRANSFORMADORES)
+def geodesico(crs=CRS_GEOGRAFICO):
+    """Geod do elipsoide do CRS (GRS80 no SIRGAS 2000)."""
+    return CRS(crs).get_geod()
+
+
+def distancias_elipsoidais(lat1, lon1, lat2, lon2):
+    """Distâncias geodésicas (m) entre pares de pontos, em uma chamada para as colunas inteiras."""
+    _, _, distancias = geodesico().inv(
+        np.asarray(lon1, dtype=np.float64), np.asarray(lat1, dtype=np.float64),
+        np.asarray(lon2, dtype=np.float64), np.asarray(lat2, dtype=np.float64),
+    )
+    return np.asarray(distancias)
+
+
+def formatar_latitudes(lat):
+    return decimal_para_gms_lote(lat, casas=3, hemisferios=("N", "S"))
+
+
+def formatar_longitudes(lon):
+    return decimal_para_gms_lote(lon, casas=3, hemisferios=("L", "O"))
+
+
+# ======CONFERENCIA DOS VERTICES DE UM PROJETO======
+
+@dataclass
+class ConferenciaCoordenadas:
+    preenchidos: int = 0  # vértices que ganharam lat/long a partir da UTM
+    divergentes: list = field(default_factory=list)  # [(de_vertice, metros)]
+    invalidos: list = field(default_factory=list)  # de_vertice com lat/long ilegível
+    sem_utm: int = 0
+
+    @property
+    def mensagem(self):
+        partes = [f"Lat/long preenchidas pela UTM: {self.preenchidos}"]
+        if self.divergentes:
+            lista = ", ".join(f"{nome} ({metros:.2f} m)" for nome, metros in self.divergentes[:20])
+            partes.append(f"Lat/long diferente da UTM em {len(self.divergentes)} vértice(s): {lista}")
+        if self.invalidos:
+            partes.append(f"Lat/long ilegível em {len(self.invalidos)} vértice(s): {', '.join(self.invalidos[:20])}")
+        if self.sem_utm:
+            partes.append(f"Vértices sem UTM: {self.sem_utm}")
+        return ". ".join(partes) + "."
+
+
+def conferir_coordenadas(projeto, preencher=True, tolerancia=None, crs=None):
+    """
+    Confere lat/long e UTM de todos os vértices do projeto com uma conversão
+    vetorizada em cada sentido. Vértices sem lat/long recebem as calculadas
+    pela UTM (com preencher=True, num único bulk_update); os que têm as duas
+    e elas distam mais que a tolerância entram em divergentes.
+    """
+    tolerancia = tolerancia_coordenadas() if tolerancia is None else tolerancia
+    vertices = list(
+        Vertice.objects.filter(projeto=projeto)
+        .only("id", "de_vertice", "latitude", "longitude", "utm_n", "utm_e")
+        .order_by(*ORDEM_ANEL)
+    )
+    resultado = ConferenciaCoordenadas()
+
+    com_utm = [v for v in vertices if v.utm_n is not None and v.utm_e is not None]
+    resultado.sem_utm = len(vertices) - len(com_utm)
+    if not com_utm:
+        return resultado
+
+    e = np.array([v.utm_e for v in com_utm])
+    n = np.array([v.utm_n for v in com_utm])
+
+    vazios = np.array([not (v.latitude or "").strip() or not (v.longitude or "").strip() for v in com_utm])
+    lat, invalidos_lat = gms_para_decimal_lote([v.latitude for v in com_utm])
+    lon, invalidos_lon = gms_para_decimal_lote([v.longitude for v in com_utm])
+    ilegiveis = np.zeros(len(com_utm), dtype=bool)
+    ilegiveis[invalidos_lat + invalidos_lon] = True
+    ilegiveis &= ~vazios
+
+    # Lat/long gravadas -> UTM, e a distância até a UTM gravada
+    conferir = ~vazios & ~ilegiveis
+    if conferir.any():
+        e_calc, n_calc = geografico_para_utm(lat[conferir], lon[conferir], crs)
+        metros = np.hypot(e_calc - e[conferir], n_calc - n[conferir])
+        for i, distancia in zip(np.flatnonzero(conferir).tolist(), metros.tolist()):
+            if not distancia <= tolerancia:
+                resultado.divergentes.append((com_utm[i].de_vertice, distancia))
+    resultado.invalidos = [com_utm[i].de_vertice for i in np.flatnonzero(ilegiveis).tolist()]
+
+    # UTM -> lat/long para quem não tem
+    if preencher and vazios.any():
+        indices = np.flatnonzero(vazios)
+        lat_utm, lon_utm = utm_para_geografico(e[indices], n[indices], crs)
+        alterados = []
+        for i, latitude, longitude in zip(indices.tolist(), formatar_latitudes(lat_utm), formatar_longitudes(lon_utm)):
+            vertice = com_utm[i]
+            vertice.latitude, vertice.longitude = latitude, longitude
+            alterados.append(vertice)
+        Vertice.objects.bulk_update(alterados, ["latitude", "longitude"], batch_size=1000)
+        resultado.preenchidos = len(alterados)
+
+    return resultado
@@ -0,0 +1,32 @@
+import tempfile
+
+from django.conf import settings
+from django.http import FileResponse
+
+
+# ======DOCUMENTOS GERADOS PARA DOWNLOAD======
+
+MEMORIA_MAXIMA_PADRAO = 8 * 1024 * 1024
+
+
+def arquivo_temporario():
+    """Fica em memória até DOCUMENTOS_MEMORIA_MAX_BYTES; acima disso vai para o disco."""
+    return tempfile.SpooledTemporaryFile(
+        max_size=getattr(settings, "DOCUMENTOS_MEMORIA_MAX_BYTES", MEMORIA_MAXIMA_PADRAO)
+    )
+
+
+def resposta_documento(gerar, nome_arquivo, content_type):
+    """
+    Chama gerar(destino) com um arquivo temporário e envia esse mesmo arquivo
+    num FileResponse: o documento não é copiado para a resposta e o
+    Content-Length sai do tamanho do arquivo.
+    """
+    arquivo = arquivo_temporario()
+    try:
+        gerar(arquivo)
+        arquivo.seek(0)
+    except BaseException:
+        arquivo.close()
+        raise
+    return FileResponse(arquivo, as_attachment=True, filename=nome_arquivo, content_type=content_type)
@@ -0,0 +1,459 @@
+import heapq
+import itertools
+import math
+import threading
+from contextlib import contextmanager
+from fractions import Fraction
+
+import numpy as np
+from django.db import connection, transaction
+from django.db.models import Case, F, Value, When
+from django.dispatch import Signal
+
+from .anel import montar_anel
+from .calculos import azimutes_utm
+from .coordenadas import distancias_elipsoidais, utm_para_geografico
+from .models import ORDEM_ANEL, Projeto, Vertice
+
+
+# ======AREA E PERIMETRO PELAS COORDENADAS UTM======
+
+def area_perimetro(e, n):
+    """
+    Área (fórmula do laço, em m²) e perímetro (m) do anel fechado de
+    vértices, em uma passada vetorizada. Menos de 3 vértices: (0, 0).
+    """
+    e = np.asarray(e, dtype=np.float64)
+    n = np.asarray(n, dtype=np.float64)
+    if e.size < 3:
+        return 0.0, 0.0
+
+    # Coordenadas relativas ao primeiro vértice: com E/N na casa dos
+    # milhões, o produto cruzado perderia as casas decimais
+    e = e - e[0]
+    n = n - n[0]
+    e_seguinte = np.roll(e, -1)
+    n_seguinte = np.roll(n, -1)
+
+    area = abs(np.dot(e, n_seguinte) - np.dot(e_seguinte, n)) / 2
+    perimetro = np.hypot(e_seguinte - e, n_seguinte - n).sum()
+    return float(area), float(perimetro)
+
+
+# ======AZIMUTE E DISTANCIAS DE CADA LADO======
+
+def metricas_lados(e, n, indices=None):
+    """
+    (azimute em graus decimais, distância plana, distância elipsoidal) dos
+    lados i -> i+1 do anel fechado, para os índices pedidos (todos se
+    None). Lados com vértice sem UTM ficam NaN.
+    """
+    e = np.asarray(e, dtype=np.float64)
+    n = np.asarray(n, dtype=np.float64)
+    indices = np.arange(e.size) if indices is None else np.asarray(indices, dtype=np.int64)
+    seguintes = (indices + 1) % e.size
+
+    # Azimute e distância plana custam o mesmo para o anel inteiro; só a
+    # elipsoidal (pyproj) é restrita aos lados pedidos
+    azimutes = azimutes_utm(e, n)[indices]
+    e1, n1, e2, n2 = e[indices], n[indices], e[seguintes], n[seguintes]
+    planas = np.hypot(e2 - e1, n2 - n1)
+
+    validos = ~np.isnan(planas)
+    elipsoidais = np.full(indices.size, np.nan)
+    if validos.any():
+        lat1, lon1 = utm_para_geografico(e1[validos], n1[validos])
+        lat2, lon2 = utm_para_geografico(e2[validos], n2[validos])
+        elipsoidais[validos] = distancias_elipsoidais(lat1, lon1, lat2, lon2)
+    return azimutes, planas, elipsoidais
+
+
+def lados_afetados(ordem, sequencias, ids, alterados, removidos=()):
+    """
+    Posições, no anel novo, dos lados que mudam:
+    - os dos vértices cujo seguinte mudou (ordem nova x ordem gravada);
+    - o lado que sai de cada vértice alterado e o do anterior, que chega nele;
+    - o do vértice que vinha antes de cada excluído (pela sequência gravada).
+    ordem tem os índices da ordem gravada na ordem do anel (ver anel.py);
+    sequencias e ids estão na ordem gravada.
+    """
+    total = len(ordem)
+    if total == 0:
+        return np.array([], dtype=np.int64)
+    if alterados is None:
+        return np.arange(total)
+
+    ordem = np.asarray(ordem, dtype=np.int64)
+    posicao = np.empty(total, dtype=np.int64)
+    posicao[ordem] = np.arange(total)
+
+    seguinte_novo = ordem[(posicao + 1) % total]
+    afetados = [posicao[seguinte_novo != (np.arange(total) + 1) % total]]
+
+    indice = {vertice_id: i for i, vertice_id in enumerate(ids)}
+    alterados = posicao[[indice[v] for v in alterados if v in indice]]
+    afetados += [alterados, alterados - 1]
+
+    if removidos:
+        gravadas = [s for s in sequencias if s is not None]
+        anteriores = np.searchsorted(gravadas, sorted(removidos)) - 1
+        # Sem anterior gravado: o último da ordem gravada fecha o anel nele
+        anteriores[anteriores < 0] = total - 1
+        afetados.append(posicao[anteriores])
+
+    return np.unique(np.concatenate(afetados) % total)
+
+
+# ======CRUZAMENTOS ENTRE LADOS DO ANEL======
+# Aritmética exata: cada float é uma fração de potência de 2, então os
+# vértices viram inteiros numa escala comum e os produtos vetoriais não
+# arredondam. Só os pontos de cruzamento são Fraction.
+
+def _inteiros(e, n):
+    """Coordenadas relativas ao primeiro vértice como inteiros exatos numa mesma escala."""
+    razoes = [valor.as_integer_ratio() for valor in e + n]
+    escala = max(denominador for _, denominador in razoes)
+    inteiros = [numerador * (escala // denominador) for numerador, denominador in razoes]
+    x, y = inteiros[:len(e)], inteiros[len(e):]
+    return [v - x[0] for v in x], [v - y[0] for v in y]
+
+
+def _lado(a, b, p):
+    """Produto vetorial (b - a) x (p - a): >0 com p à esquerda de a -> b, 0 alinhados."""
+    return (b[0] - a[0]) * (p[1] - a[1]) - (b[1] - a[1]) * (p[0] - a[0])
+
+
+def _contem(a, b, p):
+    return a <= p <= b and _lado(a, b, p) == 0
+
+
+def _primeiro_toque(a, b, c, d):
+    """Primeiro ponto (na ordem da varredura) comum aos lados a-b e c-d, com a <= b e c <= d, ou None."""
+    d1, d2 = _lado(c, d, a), _lado(c, d, b)
+    d3, d4 = _lado(a, b, c), _lado(a, b, d)
+    if d1 == d2 == d3 == d4 == 0:
+        inicio = max(a, c)
+        return inicio if inicio <= min(b, d) else None
+    if d1 * d2 > 0 or d3 * d4 > 0:
+        return None
+    if d1 == 0:
+        return a
+    if d2 == 0:
+        return b
+    if d3 == 0:
+        return c
+    if d4 == 0:
+        return d
+    t = Fraction(d3, d3 - d4)
+    return (c[0] + t * (d[0] - c[0]), c[1] + t * (d[1] - c[1]))
+
+
+def _pares_que_se_tocam(x, y):
+    """
+    Todos os pares (i, j), i < j, de lados que têm algum ponto em comum,
+    pela linha de varredura de Bentley-Ottmann.
+
+    Os eventos são os vértices e os cruzamentos, em ordem de (x, y) (a linha
+    levemente inclinada percorre os lados verticais de baixo para cima). Os
+    lados ativos ficam ordenados por y na linha e só os que ficam vizinhos
+    nessa ordem são testados; o cruzamento deles vira um evento. Os lados que
+    passam por um evento são um bloco contíguo dos ativos: todos se tocam
+    ali e saem do ponto reordenados pela inclinação. O custo é
+    O((n + k) log n) para k pontos de contato, quantos lados se sobreponham
+    num eixo.
+    """
+    total = len(x)
+    pontos = list(zip(x, y))
+    inicio, fim = [], []
+    inicios, fins = {}, {}
+    for k in range(total):
+        a, b = sorted((pontos[k], pontos[(k + 1) % total]))
+        inicio.append(a)
+        fim.append(b)
+        inicios.setdefault(a, []).append(k)
+        fins.setdefault(b, []).append(k)
+
+    def inclinacao(s):
+        dx, dy = fim[s][0] - inicio[s][0], fim[s][1] - inicio[s][1]
+        return Fraction(dy, dx) if dx else math.inf
+
+    eventos = list(set(pontos))
+    heapq.heapify(eventos)
+    agendados = set(eventos)
+    ativos = []
+    pares = set()
+
+    def testar(s, t, p):
+        toque = _primeiro_toque(inicio[s], fim[s], inicio[t], fim[t])
+        if toque is not None and toque > p and toque not in agendados:
+            agendados.add(toque)
+            heapq.heappush(eventos, toque)
+
+    while eventos:
+        p = heapq.heappop(eventos)
+
+        # Primeiro ativo que não passa abaixo de p; dali, os que passam por p
+        baixo, alto = 0, len(ativos)
+        while baixo < alto:
+            meio = (baixo + alto) // 2
+            s = ativos[meio]
+            if _lado(inicio[s], fim[s], p) > 0:
+                baixo = meio + 1
+            else:
+                alto = meio
+        posicao = ate = baixo
+        while ate < len(ativos) and _contem(inicio[ativos[ate]], fim[ativos[ate]], p):
+            ate += 1
+
+        terminam = fins.get(p, [])
+        no_ponto = set(ativos[posicao:ate]).union(inicios.get(p, []), terminam)
+        if len(no_ponto) > 1:
+            pares.update(itertools.combinations(sorted(no_ponto), 2))
+
+        novos = no_ponto.difference(terminam)
+        if len(novos) > 1:
+            novos = sorted(novos, key=inclinacao)
+        else:
+            novos = list(novos)
+        ativos[posicao:ate] = novos
+
+        abaixo, acima = posicao - 1, posicao + len(novos)
+        if novos:
+            if abaixo >= 0:
+                testar(ativos[abaixo], novos[0], p)
+            if acima < len(ativos):
+                testar(novos[-1], ativos[acima], p)
+        elif abaixo >= 0 and acima < len(ativos):
+            testar(ativos[abaixo], ativos[acima], p)
+
+    return pares
+
+
+def cruzamentos(e, n):
+    """
+    Pares (i, j), i < j, de lados i -> i+1 do anel fechado que se cruzam,
+    se tocam ou, se vizinhos, voltam um sobre o outro.
+    """
+    e = np.asarray(e, dtype=np.float64).tolist()
+    n = np.asarray(n, dtype=np.float64).tolist()
+    total = len(e)
+    if total < 3:
+        return []
+
+    x, y = _inteiros(e, n)
+    achados = []
+    for i, j in sorted(_pares_que_se_tocam(x, y)):
+        if j == i + 1 or (i == 0 and j == total - 1):
+            # Vizinhos dividem um vértice: só contam se o segundo volta sobre o primeiro
+            a, b = (i, j) if j == i + 1 else (j, i)
+            ux, uy = x[b] - x[a], y[b] - y[a]
+            vx, vy = x[(b + 1) % total] - x[b], y[(b + 1) % total] - y[b]
+            if ux * vy - uy * vx != 0 or ux * vx + uy * vy >= 0:
+                continue
+        achados.append((i, j))
+    return achados
+
+
+def _opcional(valor):
+    return None if np.isnan(valor) else round(float(valor), 6)
+
+
+def anel_do_projeto(projeto_id):
+    """Anel dos vértices do projeto (só rótulos), para relatar quebras e repetições."""
+    rotulos = list(
+        Vertice.objects.filter(projeto_id=projeto_id).order_by(*ORDEM_ANEL).values_list("de_vertice", "para_vertice")
+    )
+    return montar_anel([de for de, _ in rotulos], [para for _, para in rotulos])
+
+
+def cruzamentos_do_projeto(projeto_id):
+    """
+    Lados do anel do projeto que se cruzam, como pares de (de_vertice,
+    para_vertice). Vazio se algum vértice não tem UTM ou se o anel não
+    fecha (os lados entre os pedaços da cadeia não existem no levantamento).
+    """
+    linhas = list(
+        Vertice.objects.filter(projeto_id=projeto_id).order_by(*ORDEM_ANEL)
+        .values_list("de_vertice", "para_vertice", "utm_e", "utm_n")
+    )
+    anel = montar_anel([linha[0] for linha in linhas], [linha[1] for linha in linhas])
+    if not anel.fechado or any(linha[2] is None or linha[3] is None for linha in linhas):
+        return []
+
+    lados = [linhas[i] for i in anel.ordem]
+    pares = cruzamentos([lado[2] for lado in lados], [lado[3] for lado in lados])
+    return [(lados[i][:2], lados[j][:2]) for i, j in pares]
+
+
+def mensagem_cruzamentos(pares):
+    lista = ", ".join(f"{a[0]}-{a[1]} x {b[0]}-{b[1]}" for a, b in pares[:20])
+    return f"O perímetro se cruza em {len(pares)} par(es) de lados: {lista}."
+
+
+def recalcular_geometria(projeto_id, alterados=None, removidos=()):
+    """
+    Recalcula, com uma leitura dos vértices do projeto:
+    - a sequência do anel, seguindo de_vertice -> para_vertice a partir do
+      primeiro vértice da ordem gravada (só as que mudaram são gravadas);
+    - area_calculada/perimetro_calculado (None enquanto houver vértice sem
+      UTM); área e perímetro ainda não informados (0) passam a ser os calculados;
+    - azimute e distâncias gravados nos vértices, só dos lados afetados
+      (todos com alterados=None). removidos são as sequências dos excluídos.
+    """
+    linhas = list(
+        Vertice.objects.filter(projeto_id=projeto_id).order_by(*ORDEM_ANEL)
+        .values_list("id", "de_vertice", "para_vertice", "sequencia", "utm_e", "utm_n")
+    )
+    ids = [linha[0] for linha in linhas]
+    sequencias = [linha[3] for linha in linhas]
+    ordem = montar_anel([linha[1] for linha in linhas], [linha[2] for linha in linhas]).ordem
+
+    _atualizar_vertices(["sequencia"], [
+        (posicao, ids[i]) for posicao, i in enumerate(ordem) if sequencias[i] != posicao
+    ])
+
+    ids_anel = [ids[i] for i in ordem]
+    e = np.array([np.nan if linhas[i][4] is None else linhas[i][4] for i in ordem], dtype=np.float64)
+    n = np.array([np.nan if linhas[i][5] is None else linhas[i][5] for i in ordem], dtype=np.float64)
+
+    if linhas and not (np.isnan(e).any() or np.isnan(n).any()):
+        area, perimetro = (round(valor, 2) for valor in area_perimetro(e, n))
+    else:
+        area = perimetro = None
+
+    atualizacao = {"area_calculada": area, "perimetro_calculado": perimetro}
+    if area is not None:
+        atualizacao["area"] = Case(When(area=0, then=Value(area)), default=F("area"))
+        atualizacao["perimetro"] = Case(When(perimetro=0, then=Value(perimetro)), default=F("perimetro"))
+    Projeto.objects.filter(id=projeto_id).update(**atualizacao)
+
+    indices = lados_afetados(ordem, sequencias, ids, alterados, removidos)
+    if indices.size:
+        azimutes, planas, elipsoidais = metricas_lados(e, n, indices)
+        _atualizar_vertices(["azimute", "distancia_plana", "distancia_elipsoidal"], [
+            (_opcional(az), _opcional(plana), _opcional(elipsoidal), ids_anel[i])
+            for i, az, plana, elipsoidal in zip(indices.tolist(), azimutes, planas, elipsoidais)
+        ])
+
+
+def _atualizar_vertices(campos, linhas):
+    """
+    UPDATE parametrizado com executemany; cada linha traz os valores dos
+    campos e o id no fim. O bulk_update monta um CASE por linha e, num anel
+    de 10 mil vértices, passa segundos resolvendo expressões.
+    """
+    if not linhas:
+        return
+    nome = connection.ops.quote_name
+
+    def coluna(campo):
+        return nome(Vertice._meta.get_field(campo).column)
+
+    atribuicoes = ", ".join(f"{coluna(campo)} = %s" for campo in campos)
+    sql = f"UPDATE {nome(Vertice._meta.db_table)} SET {atribuicoes} WHERE {coluna('id')} = %s"
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(sql, linhas)
+
+
+# ======RECALCULO UMA VEZ POR PROJETO======
+# Cada vértice salvo/excluído só marca o projeto (e o próprio id). O
+# recálculo roda no commit da transação, uma vez por projeto, ou na saída
+# de geometria_em_lote().
+
+_lote = threading.local()
+# Recálculos ainda não executados, por projeto; cada thread tem a sua conexão
+_commit = threading.local()
+
+# Enviado na saída de geometria_em_lote() com os projetos cujos vértices
+# mudaram no bloco (argumento projeto_ids), uma vez em vez de um por vértice
+vertices_alterados_em_lote = Signal()
+
+
+class _Recalculo:
+    """Vértices alterados de um projeto, acumulados até o commit."""
+
+    def __init__(self, projeto_id):
+        self.projeto_id = projeto_id
+        self.todos = False
+        self.alterados = set()
+        self.removidos = set()  # sequências dos vértices excluídos
+        self.executado = False
+
+    def juntar(self, outro):
+        self.todos |= outro.todos
+        self.alterados |= outro.alterados
+        self.removidos |= outro.removidos
+
+    def __call__(self):
+        if self.executado:
+            return
+        self.executado = True
+        pendentes = _pendentes_commit()
+        if pendentes.get(self.projeto_id) is self:
+            del pendentes[self.projeto_id]
+        recalcular_geometria(self.projeto_id, None if self.todos else self.alterados, self.removidos)
+
+
+def _pendentes_commit():
+    pendentes = getattr(_commit, "pendentes", None)
+    if pendentes is None:
+        pendentes = _commit.pendentes = {}
+    return pendentes
+
+
+def _agendar(recalculo):
+    pendentes = getattr(_lote, "pendentes", None)
+    if pendentes is not None:
+        if recalculo.projeto_id in pendentes:
+            pendentes[recalculo.projeto_id].juntar(recalculo)
+        else:
+            pendentes[recalculo.projeto_id] = recalculo
+        return
+
+    pendentes = _pendentes_commit()
+    agendado = pendentes.get(recalculo.projeto_id)
+    if agendado is None:
+        agendado = pendentes[recalculo.projeto_id] = recalculo
+    else:
+        agendado.juntar(recalculo)
+    # Registrado a cada chamada: se a transação do registro anterior foi
+    # desfeita, o callback sumiu com ela. O primeiro que rodar recalcula
+    # tudo o que foi juntado; os demais encontram executado=True
+    transaction.on_commit(agendado)
+
+
+def agendar_recalculo(projeto_id, vertice_id=None, sequencia_removida=None):
+    """
+    Recalcula a geometria do projeto quando os vértices alterados estiverem
+    gravados. Sem vertice_id nem sequencia_removida, todos os lados são
+    recalculados.
+    """
+    recalculo = _Recalculo(projeto_id)
+    if vertice_id is not None:
+        recalculo.alterados.add(vertice_id)
+    if sequencia_removida is not None:
+        recalculo.removidos.add(sequencia_removida)
+    recalculo.todos = vertice_id is None and sequencia_removida is None
+    _agendar(recalculo)
+
+
+def em_lote():
+    return getattr(_lote, "pendentes", None) is not None
+
+
+@contextmanager
+def geometria_em_lote():
+    """Importações: os vértices criados/alterados no bloco geram um recálculo por projeto, na saída."""
+    if em_lote():
+        yield
+        return
+
+    _lote.pendentes = {}
+    try:
+        yield
+    finally:
+        pendentes, _lote.pendentes = _lote.pendentes, None
+        for recalculo in pendentes.values():
+            _agendar(recalculo)
+        if pendentes:
+            vertices_alterados_em_lote.send(sender=Vertice, projeto_ids=list(pendentes))
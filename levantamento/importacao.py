@@ -0,0 +1,332 @@
+import codecs
+import logging
+
+from django.db import transaction
+
+from .calculos import gms_para_decimal_lote, parse_gms, parse_numeros_br
+from .geometria import agendar_recalculo, geometria_em_lote
+from .models import Confrontante, Vertice, somente_digitos
+
+logger = logging.getLogger(__name__)
+
+
+# ======LEITURA DOS ARQUIVOS TXT======
+
+BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+TAMANHO_AMOSTRA = 64 * 1024
+
+
+def detectar_encoding(amostra, fallback="latin-1"):
+    """
+    Detecta o encoding pelo BOM ou tentando UTF-8 na amostra inicial.
+    Uma sequência multibyte cortada no fim da amostra não conta como erro.
+    """
+    for bom, encoding in BOMS:
+        if amostra.startswith(bom):
+            return encoding
+
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(amostra, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return fallback
+
+
+def _blocos(arquivo):
+    if hasattr(arquivo, "chunks"):
+        yield from arquivo.chunks()
+    else:
+        while True:
+            bloco = arquivo.read(TAMANHO_AMOSTRA)
+            if not bloco:
+                break
+            yield bloco
+
+
+def decodificar_blocos(blocos, fallback="latin-1"):
+    """
+    Decodifica os blocos de bytes uma única vez, com decoder incremental.
+    Se um bloco posterior não for UTF-8 válido, troca para o fallback a
+    partir dele (arquivos do Windows com trechos em latin-1).
+    """
+    decoder = None
+    pendente = b""
+
+    for bloco in blocos:
+        if decoder is None:
+            pendente += bloco
+            if len(pendente) < TAMANHO_AMOSTRA:
+                continue
+            bloco, pendente = pendente, b""
+            decoder = codecs.getincrementaldecoder(detectar_encoding(bloco, fallback))()
+
+        try:
+            dados = decoder.getstate()[0] + bloco
+            yield decoder.decode(bloco)
+        except UnicodeDecodeError as e:
+            # O trecho antes do erro era válido; só o restante vai pelo fallback
+            valido = dados[:e.start].decode(e.encoding)
+            decoder = codecs.getincrementaldecoder(fallback)()
+            yield valido + decoder.decode(dados[e.start:])
+
+    if decoder is None:
+        if not pendente:
+            return
+        decoder = codecs.getincrementaldecoder(detectar_encoding(pendente, fallback))()
+        yield decoder.decode(pendente)
+
+    yield decoder.decode(b"", final=True)
+
+
+def ler_linhas(arquivo, fallback="latin-1"):
+    """
+    Gera as linhas (sem quebra) de um UploadedFile lendo por chunks(),
+    com memória constante, no mesmo comportamento do str.splitlines().
+    """
+    resto = ""
+
+    for texto in decodificar_blocos(_blocos(arquivo), fallback):
+        if not texto:
+            continue
+        linhas = (resto + texto).splitlines(keepends=True)
+        resto = ""
+
+        # A última linha pode estar incompleta ("\r" pode ser metade de "\r\n")
+        ultima = linhas[-1]
+        if ultima.splitlines()[0] == ultima or ultima.endswith("\r"):
+            resto = linhas.pop()
+
+        for linha in linhas:
+            yield linha.splitlines()[0]
+
+    if resto:
+        yield resto.splitlines()[0]
+
+
+def ler_registros(arquivo, separador="\t", pular_cabecalho=False, strip=True):
+    """
+    Gera (numero_linha, linha, campos) para cada linha não vazia do arquivo.
+    numero_linha começa em 1, como nas mensagens de erro dos importadores.
+    """
+    for i, linha in enumerate(ler_linhas(arquivo)):
+        if pular_cabecalho and i == 0:
+            continue
+        if not linha.strip():
+            continue
+        texto = linha.strip() if strip else linha
+        yield i + 1, linha, texto.split(separador)
+
+
+# ======IMPORTACAO DE VERTICES======
+
+INTERVALO_PROGRESSO = 500
+
+
+def importar_lat_long_utm_helper(
+    projeto,
+    linhas,
+    criar_se_nao_existir=True,
+    atualizar_existente=True,
+    tamanho_lote=500,
+    progresso=None
+):
+    """
+    Importa/atualiza vértices em lote: uma leitura dos vértices existentes
+    do projeto e uma única transação com bulk_create/bulk_update, de modo
+    que o número de consultas não depende do tamanho do arquivo.
+
+    progresso, se informado, é chamado com (linhas_processadas, erros)
+    a cada INTERVALO_PROGRESSO linhas.
+    """
+    atualizados = ignorados = erros = 0
+
+    # Uma única consulta: vértices existentes indexados por de_vertice
+    # (mantém o primeiro por id, como fazia o .first())
+    existentes = {}
+    for vertice in Vertice.objects.filter(projeto=projeto).order_by("id"):
+        existentes.setdefault(vertice.de_vertice, vertice)
+
+    novos = {}
+    alterados = {}
+
+    # 1ª passada: separa as colunas; os números são convertidos depois, por coluna
+    registros = []
+    for i, linha in enumerate(linhas):
+        if progresso and i % INTERVALO_PROGRESSO == 0:
+            progresso(i, erros)
+
+        if i == 0 or not linha.strip():
+            continue  # pula cabeçalho
+
+        partes = linha.split("\t")
+        if len(partes) < 6:
+            logger.warning("Erro linha %s: %s | Colunas insuficientes (%s)", i + 1, linha, len(partes))
+            erros += 1
+            continue
+
+        registros.append((i, linha, partes))
+
+    # Conversão vetorizada das colunas de distância e UTM
+    distancias, distancias_ok = parse_numeros_br([p[3] for _, _, p in registros], ponto_decimal=False)
+    norte, norte_ok = parse_numeros_br([p[4] for _, _, p in registros], casas=3)
+    leste, leste_ok = parse_numeros_br([p[5] for _, _, p in registros], casas=3)
+
+    # Validação das coordenadas geográficas (GMS) em lote
+    _, latitudes_invalidas = gms_para_decimal_lote([p[6] if len(p) > 6 else "" for _, _, p in registros])
+    _, longitudes_invalidas = gms_para_decimal_lote([p[7] if len(p) > 7 else "" for _, _, p in registros])
+    gms_invalidos = set(latitudes_invalidas) | set(longitudes_invalidas)
+
+    for k, (i, linha, partes) in enumerate(registros):
+        try:
+            v1 = partes[0].strip()
+            v2 = partes[1].strip()
+            distancia = float(distancias[k]) if distancias_ok[k] else None
+            utm_n = float(norte[k]) if norte_ok[k] else None
+            utm_e = float(leste[k]) if leste_ok[k] else None
+            latitude = parse_gms(partes[6]) if len(partes) > 6  and partes[6].strip() else None
+            longitude = parse_gms(partes[7]) if len(partes) > 7 and partes[7].strip() else None
+
+            # Campos obrigatórios no banco: valida antes de entrar no lote
+            if distancia is None:
+                raise ValueError("Distância inválida")
+            if latitude is None or longitude is None:
+                raise ValueError("Latitude/longitude ausente")
+            if k in gms_invalidos:
+                raise ValueError("Latitude/longitude inválida")
+
+            vertice = existentes.get(v1) or novos.get(v1)
+
+            if vertice:
+                if atualizar_existente:
+                    vertice.para_vertice = v2
+                    vertice.distancia = distancia
+                    vertice.utm_n = utm_n
+                    vertice.utm_e = utm_e
+                    vertice.latitude = latitude
+                    vertice.longitude = longitude
+                    if vertice.pk:
+                        alterados[vertice.pk] = vertice
+                    atualizados += 1
+                else:
+                    ignorados += 1
+            else:
+                if criar_se_nao_existir:
+                    novos[v1] = Vertice(
+                        projeto=projeto,
+                        de_vertice=v1,
+                        para_vertice=v2,
+                        distancia=distancia,
+                        utm_n=utm_n,
+                        utm_e=utm_e,
+                        latitude=latitude,
+                        longitude=longitude,
+                        confrontante_texto="A preencher"
+                    )
+                    atualizados += 1
+                else:
+                    ignorados += 1
+
+        except Exception as e:
+            logger.warning("Erro linha %s: %s | %s", i + 1, linha, e)
+            erros += 1
+
+    with transaction.atomic():
+        if novos:
+            Vertice.objects.bulk_create(novos.values(), batch_size=tamanho_lote)
+        if alterados:
+            Vertice.objects.bulk_update(
+                alterados.values(),
+                ["para_vertice", "distancia", "utm_n", "utm_e", "latitude", "longitude"],
+                batch_size=tamanho_lote
+            )
+    # bulk_create/bulk_update não disparam os signals
+    if novos or alterados:
+        agendar_recalculo(projeto.id)
+
+    return atualizados, ignorados, erros
+
+
+# Um recálculo de área/perímetro no fim, não um por vértice criado
+@geometria_em_lote()
+def importar_vertices_txt(projeto, arquivo, progresso=None):
+    """
+    Importa vértices no formato do modal "Importar Vértices":
+    De, Para, Longitude, Latitude, Distância, Confrontante[, N, E][, CPF/CNPJ].
+    Retorna (importados, lista de mensagens de erro).
+    """
+    falhas = []
+
+    registros = []
+    for i, (_, linha, campos) in enumerate(ler_registros(arquivo)):
+        if progresso and i % INTERVALO_PROGRESSO == 0:
+            progresso(i, len(falhas))
+
+        if len(campos) < 6:
+            falhas.append(f'Formato inválido na linha: {linha}')
+            continue
+        registros.append((linha, campos))
+
+    # Conversão vetorizada da distância e das coordenadas UTM (colunas 6 e 7, opcionais)
+    distancias, distancias_ok = parse_numeros_br([c[4] for _, c in registros])
+    norte, norte_ok = parse_numeros_br([c[6] if len(c) >= 8 else "" for _, c in registros])
+    leste, leste_ok = parse_numeros_br([c[7] if len(c) >= 8 else "" for _, c in registros])
+
+    # Longitude/latitude preenchidas precisam estar em GMS válido
+    _, longitudes_invalidas = gms_para_decimal_lote([c[2] or "0" for _, c in registros])
+    _, latitudes_invalidas = gms_para_decimal_lote([c[3] or "0" for _, c in registros])
+    gms_invalidos = set(longitudes_invalidas) | set(latitudes_invalidas)
+
+    # Confrontantes do projeto indexados pelo documento (só dígitos), numa consulta
+    confrontantes = {}
+    if any(len(c) > 8 and c[8] for _, c in registros):
+        for confrontante in Confrontante.objects.filter(projeto=projeto).order_by("id"):
+            confrontantes.setdefault(confrontante.documento, confrontante)
+
+    novos = []
+    for k, (linha, campos) in enumerate(registros):
+        de_vertice, para_vertice, longitude, latitude, distancia, confrontante_nome = campos[:6]
+
+        if not distancias_ok[k]:
+            falhas.append(f'Distância inválida na linha: {linha}')
+            continue
+        if k in gms_invalidos:
+            falhas.append(f'Longitude/latitude inválida na linha: {linha}')
+            continue
+
+        confrontante_cpf_cnpj = campos[8] if len(campos) > 8 else ''
+
+        vertice_data = {
+            'projeto': projeto,
+            'de_vertice': de_vertice,
+            'para_vertice': para_vertice,
+            'longitude': longitude,
+            'latitude': latitude,
+            'distancia': float(distancias[k]),
+            'confrontante_texto': confrontante_nome
+        }
+
+        # Adiciona coordenadas UTM se existirem
+        if norte_ok[k]:
+            vertice_data['utm_n'] = float(norte[k])
+        if leste_ok[k]:
+            vertice_data['utm_e'] = float(leste[k])
+
+        documento = somente_digitos(confrontante_cpf_cnpj)
+        confrontante = confrontantes.get(documento) if documento else None
+        if confrontante:
+            vertice_data['confrontante'] = confrontante
+            vertice_data['confrontante_texto'] = ''
+        novos.append(Vertice(**vertice_data))
+
+    Vertice.objects.bulk_create(novos, batch_size=500)
+    # bulk_create não dispara os signals; na saída do lote o recálculo roda
+    # e o cache de memoriais do projeto é invalidado uma vez
+    if novos:
+        agendar_recalculo(projeto.id)
+
+    return len(novos), falhas
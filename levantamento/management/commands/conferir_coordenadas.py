@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from levantamento.coordenadas import conferir_coordenadas
+from levantamento.geometria import cruzamentos_do_projeto, mensagem_cruzamentos, recalcular_geometria
+from levantamento.models import Projeto
+
+
+class Command(BaseCommand):
+    help = (
+        "Preenche lat/long pela UTM, lista os vértices em que as duas não conferem "
+        "e recalcula área e perímetro pelos vértices, avisando se o perímetro se cruza."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "projeto_ids",
+            nargs="*",
+            type=int,
+            help="IDs dos projetos (omitido com --todos).",
+        )
+        parser.add_argument(
+            "--todos",
+            action="store_true",
+            help="Confere todos os projetos.",
+        )
+        parser.add_argument(
+            "--somente-conferir",
+            action="store_true",
+            help="Não grava as lat/long calculadas, só relata.",
+        )
+        parser.add_argument(
+            "--tolerancia",
+            type=float,
+            default=None,
+            help="Diferença aceita em metros (padrão: REURB_TOLERANCIA_COORDENADAS_M).",
+        )
+
+    def handle(self, *args, **options):
+        projetos = Projeto.objects.order_by("id")
+        if not options["todos"]:
+            if not options["projeto_ids"]:
+                raise CommandError("Informe os IDs dos projetos ou use --todos.")
+            projetos = projetos.filter(id__in=options["projeto_ids"])
+
+        for projeto in projetos:
+            conferencia = conferir_coordenadas(
+                projeto, preencher=not options["somente_conferir"], tolerancia=options["tolerancia"]
+            )
+            recalcular_geometria(projeto.id)
+            projeto.refresh_from_db(fields=["area", "perimetro", "area_calculada", "perimetro_calculado"])
+
+            mensagem = conferencia.mensagem
+            if projeto.area_divergente:
+                mensagem += f" Área informada {projeto.area} m², calculada {projeto.area_calculada} m²."
+            if projeto.perimetro_divergente:
+                mensagem += f" Perímetro informado {projeto.perimetro} m, calculado {projeto.perimetro_calculado} m."
+            pares = cruzamentos_do_projeto(projeto.id)
+            if pares:
+                mensagem += " " + mensagem_cruzamentos(pares)
+            problemas = (
+                conferencia.divergentes or conferencia.invalidos or pares
+                or projeto.area_divergente or projeto.perimetro_divergente
+            )
+            estilo = self.style.WARNING if problemas else self.style.SUCCESS
+            self.stdout.write(estilo(f"{projeto.nome} (ID {projeto.id}): {mensagem}"))
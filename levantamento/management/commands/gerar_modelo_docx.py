@@ -0,0 +1,185 @@
+from docx import Document
+from docx.enum.table import WD_TABLE_ALIGNMENT
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.shared import Cm, Pt
+from django.core.management.base import BaseCommand
+
+from levantamento.memorial.notificacao import CAMINHO_MODELO_NOTIFICACAO
+from levantamento.memorial.word import CAMINHO_MODELO
+
+# Cada marcador {{CHAVE}} fica sozinho num run, para ser trocado direto no XML.
+# A linha de tabela e o parágrafo da descrição com marcadores são modelos que
+# o word.py replica para cada item.
+
+
+def _paragrafo(doc, texto, negrito=False, alinhamento=None, tamanho=12, recuo=None, antes=0, depois=6):
+    paragrafo = doc.add_paragraph()
+    run = paragrafo.add_run(texto)
+    run.bold = negrito
+    run.font.size = Pt(tamanho)
+    if alinhamento is not None:
+        paragrafo.alignment = alinhamento
+    formato = paragrafo.paragraph_format
+    formato.space_before = Pt(antes)
+    formato.space_after = Pt(depois)
+    if recuo is not None:
+        formato.first_line_indent = recuo
+    return paragrafo
+
+
+def _secao(doc, titulo):
+    return _paragrafo(doc, titulo, negrito=True, tamanho=14, antes=12)
+
+
+def _tabela(doc, cabecalho, marcadores, larguras, grade=True, altura=None):
+    tabela = doc.add_table(rows=1 if cabecalho else 0, cols=len(marcadores))
+    if grade:
+        tabela.style = "Table Grid"
+    tabela.alignment = WD_TABLE_ALIGNMENT.CENTER
+
+    if cabecalho:
+        for celula, texto in zip(tabela.rows[0].cells, cabecalho):
+            celula.text = ""
+            run = celula.paragraphs[0].add_run(texto)
+            run.bold = True
+            celula.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
+            sombreamento = OxmlElement("w:shd")
+            sombreamento.set(qn("w:val"), "clear")
+            sombreamento.set(qn("w:fill"), "D3D3D3")
+            celula._tc.get_or_add_tcPr().append(sombreamento)
+        # Cabeçalho repetido em cada página
+        cabecalho_repetido = OxmlElement("w:tblHeader")
+        tabela.rows[0]._tr.get_or_add_trPr().append(cabecalho_repetido)
+
+    linha = tabela.add_row()
+    for celula, marcador in zip(linha.cells, marcadores):
+        celula.text = ""
+        celula.paragraphs[0].add_run(marcador)
+    if altura is not None:
+        linha.height = altura
+
+    for linha in tabela.rows:
+        for celula, largura in zip(linha.cells, larguras):
+            celula.width = largura
+    return tabela
+
+
+def _documento():
+    """Documento A4 com as margens e a fonte do memorial em PDF."""
+    doc = Document()
+
+    secao = doc.sections[0]
+    secao.page_height, secao.page_width = Cm(29.7), Cm(21.0)
+    secao.left_margin = secao.right_margin = Cm(2.5)
+    secao.top_margin, secao.bottom_margin = Cm(2), Cm(1.5)
+
+    normal = doc.styles["Normal"]
+    normal.font.name = "Times New Roman"
+    normal.font.size = Pt(12)
+    normal.element.rPr.rFonts.set(qn("w:eastAsia"), "Times New Roman")
+    return doc
+
+
+def gerar_modelo(caminho):
+    doc = _documento()
+
+    titulo = _paragrafo(doc, "MEMORIAL DESCRITIVO", negrito=True, tamanho=16, alinhamento=WD_ALIGN_PARAGRAPH.CENTER, depois=24)
+    titulo.runs[0].underline = True
+
+    _secao(doc, "1. Beneficiário(s):")
+    _tabela(doc, ["Nome", "CPF"], ["{{BEN_NOME}}", "{{BEN_CPF}}"], [Cm(10), Cm(6)], grade=False)
+    _paragrafo(doc, "{{SEM_BENEFICIARIOS}}")
+
+    _secao(doc, "2. Localização do Imóvel:")
+    _paragrafo(doc, "{{INSCRICAO}}")
+    _paragrafo(doc, "{{ENDERECO}}", alinhamento=WD_ALIGN_PARAGRAPH.JUSTIFY, recuo=Cm(1.25))
+
+    for titulo_secao, marcador in (
+        ("3. Área:", "{{AREA}}"),
+        ("4. Perímetro:", "{{PERIMETRO}}"),
+        ("5. Época da Medição:", "{{EPOCA_MEDICAO}}"),
+        ("6. Instrumento Utilizado:", "{{INSTRUMENTO}}"),
+        ("7. Sistema Geodésico de Referência:", "SIRGAS 2000"),
+        ("8. Projeção Cartográfica de Distância e Área:", "UTM"),
+    ):
+        _secao(doc, titulo_secao)
+        _paragrafo(doc, marcador, recuo=Cm(1.25))
+
+    _secao(doc, "9. Tabela de Coordenadas, Confrontações e Medidas:")
+    _tabela(
+        doc,
+        ["VÉRTICE", "LATITUDE", "LONGITUDE", "DIST.(m)", "CONFRONTANTE"],
+        ["{{V_VERTICE}}", "{{V_LATITUDE}}", "{{V_LONGITUDE}}", "{{V_DISTANCIA}}", "{{V_CONFRONTANTE}}"],
+        [Cm(2), Cm(3.2), Cm(3.2), Cm(2.5), Cm(5.1)],
+    )
+
+    _secao(doc, "10. Descrição Perimétrica:")
+    descricao = _paragrafo(doc, "{{DESCRICAO}}", alinhamento=WD_ALIGN_PARAGRAPH.JUSTIFY, recuo=Cm(1.25), depois=0)
+    descricao.paragraph_format.line_spacing = 1.5
+
+    _paragrafo(doc, "{{LOCAL_DATA}}", antes=24, depois=60)
+
+    _paragrafo(doc, "__________________________________________________", alinhamento=WD_ALIGN_PARAGRAPH.CENTER, depois=0)
+    _paragrafo(doc, "{{TECNICO_NOME}}", negrito=True, alinhamento=WD_ALIGN_PARAGRAPH.CENTER, depois=0)
+    _paragrafo(doc, "{{TECNICO_TITULO}}", alinhamento=WD_ALIGN_PARAGRAPH.CENTER, depois=0)
+    _paragrafo(doc, "{{TECNICO_REGISTRO}}", alinhamento=WD_ALIGN_PARAGRAPH.CENTER, depois=60)
+
+    # Altura da linha = espaço para assinar antes do próximo par
+    _tabela(doc, None, ["{{ASSINATURA_1}}", "", "{{ASSINATURA_2}}"], [Cm(8), Cm(1), Cm(7)], grade=False, altura=Cm(3))
+    _paragrafo(doc, "{{SEM_ASSINATURAS}}")
+
+    doc.save(caminho)
+
+
+def gerar_modelo_notificacao(caminho):
+    doc = _documento()
+
+    _paragrafo(doc, "NOTIFICAÇÃO DE CONFRONTANTE", negrito=True, tamanho=16, alinhamento=WD_ALIGN_PARAGRAPH.CENTER)
+    _paragrafo(doc, "Regularização Fundiária Urbana (REURB) - Lei nº 13.465/2017", alinhamento=WD_ALIGN_PARAGRAPH.CENTER, depois=24)
+
+    _paragrafo(doc, "Ao(À) Sr(a).", depois=0)
+    _paragrafo(doc, "{{NOME}}", negrito=True, depois=0)
+    _paragrafo(doc, "{{DOCUMENTO}}", depois=0)
+    _paragrafo(doc, "{{ENDERECO}}", depois=24)
+
+    assunto = _paragrafo(doc, "Assunto: ", negrito=True)
+    assunto.add_run("{{ASSUNTO}}").font.size = Pt(12)
+
+    for marcador in ("{{CORPO_1}}", "{{CORPO_2}}"):
+        corpo = _paragrafo(doc, marcador, alinhamento=WD_ALIGN_PARAGRAPH.JUSTIFY, recuo=Cm(1.25))
+        corpo.paragraph_format.line_spacing = 1.5
+
+    _paragrafo(doc, "{{LOCAL_DATA}}", antes=12, depois=48)
+
+    _paragrafo(doc, "__________________________________________________", alinhamento=WD_ALIGN_PARAGRAPH.CENTER, depois=0)
+    _paragrafo(doc, "{{TECNICO_NOME}}", negrito=True, alinhamento=WD_ALIGN_PARAGRAPH.CENTER, depois=0)
+    _paragrafo(doc, "{{TECNICO_TITULO}}", alinhamento=WD_ALIGN_PARAGRAPH.CENTER, depois=0)
+    _paragrafo(doc, "{{TECNICO_REGISTRO}}", alinhamento=WD_ALIGN_PARAGRAPH.CENTER, depois=48)
+
+    _paragrafo(doc, "Recebi a via desta notificação em ____/____/________.", depois=24)
+    _paragrafo(doc, "Assinatura: ______________________________________________")
+
+    doc.save(caminho)
+
+
+class Command(BaseCommand):
+    help = "Gera os modelos memorial.docx e notificacao.docx usados nos documentos em Word (só quando o layout mudar)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--saida",
+            default=str(CAMINHO_MODELO),
+            help="Caminho do modelo do memorial (padrão: o usado pelo sistema).",
+        )
+        parser.add_argument(
+            "--saida-notificacao",
+            default=str(CAMINHO_MODELO_NOTIFICACAO),
+            help="Caminho do modelo da notificação dos confrontantes (padrão: o usado pelo sistema).",
+        )
+
+    def handle(self, *args, **options):
+        gerar_modelo(options["saida"])
+        gerar_modelo_notificacao(options["saida_notificacao"])
+        self.stdout.write(self.style.SUCCESS(f"Modelos gerados em {options['saida']} e {options['saida_notificacao']}"))
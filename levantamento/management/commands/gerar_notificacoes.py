@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from levantamento.memorial import FORMATOS_NOTIFICACAO, zip_notificacoes_em_lote
+from levantamento.models import Projeto
+
+
+class Command(BaseCommand):
+    help = "Gera as notificações dos confrontantes de vários projetos em paralelo e grava um ZIP."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "projeto_ids",
+            nargs="*",
+            type=int,
+            help="IDs dos projetos (omitido com --todos).",
+        )
+        parser.add_argument(
+            "--todos",
+            action="store_true",
+            help="Gera as notificações de todos os projetos.",
+        )
+        parser.add_argument(
+            "--formato",
+            choices=FORMATOS_NOTIFICACAO,
+            default="pdf",
+            help="Formato das cartas (padrão: pdf).",
+        )
+        parser.add_argument(
+            "--saida",
+            default="notificacoes.zip",
+            help="Arquivo ZIP de saída (padrão: notificacoes.zip).",
+        )
+        parser.add_argument(
+            "--processos",
+            type=int,
+            default=None,
+            help="Processos de renderização (padrão: um por núcleo).",
+        )
+
+    def handle(self, *args, **options):
+        if options["todos"]:
+            projeto_ids = list(Projeto.objects.values_list("id", flat=True))
+        else:
+            projeto_ids = options["projeto_ids"]
+        if not projeto_ids:
+            raise CommandError("Informe os IDs dos projetos ou use --todos.")
+
+        inicio = time.perf_counter()
+        with open(options["saida"], "wb") as saida:
+            for bloco in zip_notificacoes_em_lote(projeto_ids, options["formato"], processos=options["processos"]):
+                saida.write(bloco)
+
+        segundos = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f"Notificações de {len(projeto_ids)} projeto(s) em {segundos:.1f}s -> {options['saida']}"
+        ))
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from levantamento.tarefas import processar_pendentes
+
+
+class Command(BaseCommand):
+    help = "Executa as importações e memoriais enfileirados (worker sem broker externo)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--uma-vez",
+            action="store_true",
+            help="Processa as tarefas pendentes e encerra, em vez de ficar aguardando novas.",
+        )
+        parser.add_argument(
+            "--intervalo",
+            type=float,
+            default=2.0,
+            help="Segundos de espera entre consultas quando a fila está vazia (padrão: 2).",
+        )
+
+    def handle(self, *args, **options):
+        if options["uma_vez"]:
+            executadas = processar_pendentes()
+            self.stdout.write(self.style.SUCCESS(f"{executadas} tarefa(s) executada(s)."))
+            return
+
+        self.stdout.write("Aguardando tarefas... (Ctrl+C para sair)")
+        try:
+            while True:
+                # Conexões longas com o Postgres podem cair entre uma tarefa e outra
+                close_old_connections()
+                executadas = processar_pendentes()
+                if executadas:
+                    self.stdout.write(f"{executadas} tarefa(s) executada(s).")
+                else:
+                    time.sleep(options["intervalo"])
+        except KeyboardInterrupt:
+            self.stdout.write("Worker encerrado.")
@@ -0,0 +1,6 @@
+from .cache import cache_memoriais
+from .conteudo import conteudo_memorial
+from .lote import gerar_memoriais_em_lote, zip_memoriais_em_lote
+from .notificacao import FORMATOS_NOTIFICACAO, gerar_notificacoes_em_lote, zip_notificacoes_em_lote
+from .pdf import gerar_memorial_pdf
+from .word import gerar_memorial_docx
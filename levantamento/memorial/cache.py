@@ -0,0 +1,148 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+from .conteudo import conteudo_memorial, revisao
+from .dados import carregar_dados_memorial
+from .pdf import renderizar_memorial_pdf
+
+
+# ======CACHE DE MEMORIAIS EM DISCO======
+
+# Mudou o layout do PDF? Incremente para descartar os arquivos antigos
+VERSAO_LAYOUT = 3
+
+TAMANHO_MAXIMO_PADRAO = 200 * 1024 * 1024
+
+
+def _chave_da_revisao(revisao_conteudo):
+    chave = f"{VERSAO_LAYOUT}:{revisao_conteudo}"
+    return hashlib.sha256(chave.encode("utf-8")).hexdigest()
+
+
+def chave_memorial(projeto):
+    """
+    revisao() do conteúdo do memorial (a mesma usada pelo cache de
+    conteúdos) com a versão do layout: um campo novo no conteúdo muda as
+    duas chaves juntas.
+    """
+    return _chave_da_revisao(revisao(carregar_dados_memorial(projeto)))
+
+
+class CacheMemoriais:
+    """
+    PDFs já renderizados, um arquivo por (projeto, hash do conteúdo). O mtime
+    marca o último acesso; acima do tamanho máximo saem os menos usados.
+    """
+
+    def __init__(self, diretorio=None, tamanho_maximo=None):
+        self._diretorio = diretorio
+        self._tamanho_maximo = tamanho_maximo
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+        self.renderizacoes = 0
+        self.tempo_renderizacao = 0.0
+
+    @property
+    def diretorio(self):
+        diretorio = self._diretorio or getattr(settings, "MEMORIAL_CACHE_DIR", None) or Path(settings.MEDIA_ROOT) / "cache_memoriais"
+        return Path(diretorio)
+
+    @property
+    def tamanho_maximo(self):
+        if self._tamanho_maximo is not None:
+            return self._tamanho_maximo
+        return getattr(settings, "MEMORIAL_CACHE_MAX_BYTES", TAMANHO_MAXIMO_PADRAO)
+
+    def estatisticas(self):
+        consultas = self.acertos + self.faltas
+        return {
+            "acertos": self.acertos,
+            "faltas": self.faltas,
+            "taxa_acerto": self.acertos / consultas if consultas else 0.0,
+            "renderizacoes": self.renderizacoes,
+            "tempo_medio_renderizacao": self.tempo_renderizacao / self.renderizacoes if self.renderizacoes else 0.0,
+        }
+
+    def abrir(self, projeto):
+        """
+        Retorna (arquivo aberto em 'rb', acerto, segundos de renderização).
+        O arquivo já vem aberto para uma limpeza concorrente não apagá-lo
+        entre a verificação e o envio.
+        """
+        # Os dados são lidos uma vez: servem para a chave e, se faltar o
+        # arquivo, para montar o conteúdo
+        dados = carregar_dados_memorial(projeto)
+        revisao_conteudo = revisao(dados)
+        caminho = self.diretorio / f"{projeto.id}-{_chave_da_revisao(revisao_conteudo)}.pdf"
+
+        try:
+            arquivo = open(caminho, "rb")
+            os.utime(caminho)
+            with self._lock:
+                self.acertos += 1
+            return arquivo, True, 0.0
+        except FileNotFoundError:
+            pass
+
+        segundos = self._renderizar(conteudo_memorial(dados, revisao_conteudo), caminho)
+        with self._lock:
+            self.faltas += 1
+            self.renderizacoes += 1
+            self.tempo_renderizacao += segundos
+        arquivo = open(caminho, "rb")
+        self.limpar(manter=caminho)
+        return arquivo, False, segundos
+
+    def _renderizar(self, conteudo, caminho):
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        inicio = time.perf_counter()
+        # Grava num temporário da mesma pasta e renomeia: quem ler nunca vê PDF pela metade
+        descritor, temporario = tempfile.mkstemp(dir=caminho.parent, suffix=".tmp")
+        try:
+            with os.fdopen(descritor, "wb") as destino:
+                renderizar_memorial_pdf(conteudo, destino)
+            os.replace(temporario, caminho)
+        except BaseException:
+            os.unlink(temporario)
+            raise
+        return time.perf_counter() - inicio
+
+    def invalidar(self, projeto_id):
+        """Remove os memoriais do projeto (chamado pelos signals)."""
+        for caminho in self.diretorio.glob(f"{projeto_id}-*.pdf"):
+            try:
+                caminho.unlink()
+            except FileNotFoundError:
+                pass
+
+    def limpar(self, manter=None):
+        """Apaga os arquivos menos acessados até caber no tamanho máximo."""
+        arquivos = []
+        for caminho in self.diretorio.glob("*.pdf"):
+            try:
+                info = caminho.stat()
+            except FileNotFoundError:
+                continue
+            arquivos.append((info.st_mtime, info.st_size, caminho))
+
+        total = sum(tamanho for _, tamanho, _ in arquivos)
+        for _, tamanho, caminho in sorted(arquivos, key=lambda a: a[0]):
+            if total <= self.tamanho_maximo:
+                break
+            if caminho == manter:
+                continue
+            try:
+                caminho.unlink()
+            except FileNotFoundError:
+                pass
+            total -= tamanho
+
+
+cache_memoriais = CacheMemoriais()
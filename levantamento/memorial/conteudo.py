@@ -0,0 +1,176 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date
+
+from .dados import assinaturas_sublinhadas, linha_tabela_vertice, local_e_data, responsavel_tecnico, rotulo_documento
+from .descricao import descricao_perimetrica
+
+
+# ======CONTEUDO DO MEMORIAL (INDEPENDENTE DE FORMATO)======
+
+CABECALHO_VERTICES = ("VÉRTICE", "LATITUDE", "LONGITUDE", "DIST.(m)", "CONFRONTANTE")
+SEM_BENEFICIARIOS = "Nenhum beneficiário registrado."
+SEM_VERTICES = ("Nenhum vértice registrado.", "", "", "", "")
+SEM_DESCRICAO = "Não há vértices suficientes para gerar a descrição perimétrica."
+SEM_ASSINATURAS = "Nenhuma assinatura registrada."
+
+# Conteúdos mantidos em memória (PDF, Word e HTML da mesma revisão reaproveitam)
+MAXIMO_CONTEUDOS = 32
+
+
+@dataclass(frozen=True)
+class Assinatura:
+    nome: str
+    documento: str  # já com o rótulo: "CPF: ..." / "CNPJ: ..."
+    papel: str  # Requerente ou Confrontante
+    sublinhada: bool = False
+
+    @property
+    def linhas(self):
+        return [self.nome, self.documento, self.papel]
+
+
+@dataclass(frozen=True)
+class ConteudoMemorial:
+    """
+    Texto pronto de todas as seções do memorial. Os campos são texto puro,
+    exceto os blocos da descrição, que já vêm escapados e com <strong>.
+    """
+    projeto_id: int
+    titulo: str
+    nome_projeto: str
+    beneficiarios: list  # [(nome, cpf_cnpj)]
+    inscricao: str  # "" quando não informada
+    endereco: str
+    area: str
+    perimetro: str
+    epoca_medicao: str
+    instrumento: str
+    sistema_geodesico: str
+    projecao: str
+    linhas_vertices: list  # linhas de 5 colunas, sem o cabeçalho
+    descricao: list  # blocos de parágrafo
+    local_data: str
+    responsavel: dict
+    assinaturas: list = field(default_factory=list)
+    cabecalho_vertices: tuple = CABECALHO_VERTICES
+
+    @property
+    def tabela_vertices(self):
+        """Linhas da seção 9, com a linha de aviso quando não há vértices."""
+        return self.linhas_vertices or [SEM_VERTICES]
+
+    @property
+    def blocos_descricao(self):
+        """Blocos da seção 10, com o aviso quando não há descrição."""
+        return self.descricao or [SEM_DESCRICAO]
+
+    @property
+    def pares_assinaturas(self):
+        """Assinaturas de duas em duas (a segunda pode ser None)."""
+        return [
+            (self.assinaturas[i], self.assinaturas[i + 1] if i + 1 < len(self.assinaturas) else None)
+            for i in range(0, len(self.assinaturas), 2)
+        ]
+
+
+def montar_conteudo(dados):
+    """Formata uma vez tudo que o memorial imprime, a partir de um DadosMemorial."""
+    projeto = dados.projeto
+    inscricao = (projeto.inscricao_imobiliaria or "").strip()
+    sublinhadas = assinaturas_sublinhadas()
+
+    def assinatura(pessoa, papel):
+        return Assinatura(pessoa.nome, rotulo_documento(pessoa.cpf_cnpj), papel, pessoa.nome in sublinhadas)
+
+    return ConteudoMemorial(
+        projeto_id=projeto.id,
+        titulo="MEMORIAL DESCRITIVO",
+        nome_projeto=projeto.nome,
+        beneficiarios=[(ben.nome, ben.cpf_cnpj) for ben in dados.beneficiarios],
+        inscricao=f"Inscrição Imobiliária: {projeto.inscricao_imobiliaria}" if inscricao else "",
+        endereco=str(projeto.endereco),
+        area=f"{projeto.area}m²".replace(".", ","),
+        perimetro=f"{projeto.perimetro} m".replace(".", ","),
+        epoca_medicao=str(projeto.epoca_medicao),
+        instrumento=str(projeto.instrumento),
+        sistema_geodesico="SIRGAS 2000",
+        projecao="UTM",
+        linhas_vertices=[linha_tabela_vertice(v) for v in dados.vertices],
+        descricao=descricao_perimetrica(projeto, dados.vertices),
+        local_data=local_e_data(dados),
+        responsavel=responsavel_tecnico(),
+        assinaturas=[assinatura(ben, "Requerente") for ben in dados.beneficiarios]
+                    + [assinatura(con, "Confrontante") for con in dados.confrontantes],
+    )
+
+
+def configuracao_memorial():
+    """Parte do memorial que vem dos settings (entra nas chaves de cache)."""
+    return [responsavel_tecnico(), sorted(assinaturas_sublinhadas())]
+
+
+def revisao(dados):
+    """Hash de tudo que entra no conteúdo, inclusive a data impressa e o responsável."""
+    projeto = dados.projeto
+    conteudo = {
+        "data": date.today().isoformat(),
+        "configuracao": configuracao_memorial(),
+        "projeto": [
+            projeto.id, projeto.nome, projeto.inscricao_imobiliaria, projeto.endereco, projeto.area,
+            projeto.perimetro, projeto.epoca_medicao, projeto.instrumento,
+        ],
+        "vertices": [
+            (v.de_vertice, v.para_vertice, v.latitude, v.longitude, v.distancia, v.utm_n, v.utm_e, v.azimute, v.distancia_plana,
+             v.confrontante_texto, v.confrontante.nome if v.confrontante else None, v.confrontante.cpf_cnpj if v.confrontante else None)
+            for v in dados.vertices
+        ],
+        "beneficiarios": [(b.nome, b.cpf_cnpj, b.cidade) for b in dados.beneficiarios],
+        "confrontantes": [(c.nome, c.cpf_cnpj) for c in dados.confrontantes],
+    }
+    texto = json.dumps(conteudo, ensure_ascii=False, default=str, separators=(",", ":"))
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+class CacheConteudos:
+    """Conteúdos montados por revisão, os menos usados saem primeiro."""
+
+    def __init__(self, maximo=MAXIMO_CONTEUDOS):
+        self.maximo = maximo
+        self.acertos = 0
+        self.faltas = 0
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, dados, chave=None):
+        """chave: revisao(dados), se quem chama já a calculou."""
+        chave = chave or revisao(dados)
+        with self._lock:
+            conteudo = self._itens.get(chave)
+            if conteudo is not None:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return conteudo
+            self.faltas += 1
+
+        conteudo = montar_conteudo(dados)
+        with self._lock:
+            self._itens[chave] = conteudo
+            while len(self._itens) > self.maximo:
+                self._itens.popitem(last=False)
+        return conteudo
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+
+
+cache_conteudos = CacheConteudos()
+
+
+def conteudo_memorial(dados, chave=None):
+    """Conteúdo do memorial, montado só uma vez por revisão do projeto."""
+    return cache_conteudos.obter(dados, chave)
@@ -0,0 +1,90 @@
+from dataclasses import dataclass, field
+from datetime import date
+
+from django.conf import settings
+
+from ..models import ORDEM_ANEL, Beneficiario, Confrontante, Projeto, Vertice, somente_digitos
+
+
+# ======DADOS DO MEMORIAL======
+
+MESES = {
+    1: "Janeiro", 2: "Fevereiro", 3: "Março", 4: "Abril", 5: "Maio", 6: "Junho",
+    7: "Julho", 8: "Agosto", 9: "Setembro", 10: "Outubro", 11: "Novembro", 12: "Dezembro"
+}
+
+
+def responsavel_tecnico():
+    """Nome, título e registro (CFT) de quem assina os memoriais (settings.MEMORIAL_RESPONSAVEL_TECNICO)."""
+    return dict(settings.MEMORIAL_RESPONSAVEL_TECNICO)
+
+
+def assinaturas_sublinhadas():
+    return set(getattr(settings, "MEMORIAL_ASSINATURAS_SUBLINHADAS", ()))
+
+
+def data_por_extenso(data=None):
+    data = data or date.today()
+    return f"{data.day} de {MESES[data.month]} de {data.year}"
+
+@dataclass
+class DadosMemorial:
+    """Tudo que o memorial imprime, já carregado (pode ir para outro processo)."""
+    projeto: Projeto
+    beneficiarios: list = field(default_factory=list)
+    confrontantes: list = field(default_factory=list)  # só os não excluídos do PDF
+    vertices: list = field(default_factory=list)  # com o confrontante já carregado
+
+
+def local_e_data(dados):
+    """Linha "Cidade, dia de Mês de ano." com a cidade do primeiro beneficiário."""
+    cidade = dados.beneficiarios[0].cidade if dados.beneficiarios else "Cidade não especificada"
+    return f"{cidade}, {data_por_extenso()}."
+
+
+def tipo_documento(valor):
+    """'CPF' (11 dígitos), 'CNPJ' (14 dígitos) ou None."""
+    return {11: "CPF", 14: "CNPJ"}.get(len(somente_digitos(valor)))
+
+
+def rotulo_documento(valor):
+    """'CPF: ...' ou 'CNPJ: ...'; documentos fora do padrão saem como CPF."""
+    return f"{tipo_documento(valor) or 'CPF'}: {valor or ''}"
+
+
+def linha_tabela_vertice(vertice):
+    """Colunas da tabela de coordenadas (seção 9) para um vértice."""
+    return [
+        str(vertice.de_vertice),
+        str(vertice.latitude),
+        str(vertice.longitude).replace("O", "W"),
+        f"{float(vertice.distancia_lado):.2f}".replace(".", ","),
+        str(vertice.confrontante.nome if vertice.confrontante else vertice.confrontante_texto),
+    ]
+
+
+def carregar_dados_memoriais(projeto_ids):
+    """
+    Dados de vários projetos com quatro consultas no total, qualquer que seja
+    a quantidade de projetos. Retorna {projeto_id: DadosMemorial}.
+    """
+    dados = {
+        projeto.id: DadosMemorial(projeto)
+        for projeto in Projeto.objects.filter(id__in=projeto_ids).order_by("nome", "id")
+    }
+    ids = list(dados)
+
+    for beneficiario in Beneficiario.objects.filter(projeto_id__in=ids).order_by("id"):
+        dados[beneficiario.projeto_id].beneficiarios.append(beneficiario)
+    for confrontante in Confrontante.objects.filter(projeto_id__in=ids, excluir_do_pdf=False).order_by("id"):
+        dados[confrontante.projeto_id].confrontantes.append(confrontante)
+    for vertice in Vertice.objects.filter(projeto_id__in=ids).select_related("confrontante").order_by(*ORDEM_ANEL):
+        dados[vertice.projeto_id].vertices.append(vertice)
+
+    return dados
+
+
+def carregar_dados_memorial(projeto):
+    dados = carregar_dados_memoriais([projeto.id])[projeto.id]
+    dados.projeto = projeto
+    return dados
@@ -0,0 +1,76 @@
+from xml.sax.saxutils import escape
+
+from ..calculos import azimutes_utm, br, br_coord, decimal_para_gms_lote
+from .dados import tipo_documento
+
+
+# ======DESCRICAO PERIMETRICA======
+
+# Lados por parágrafo: parágrafos menores quebram linha rápido e podem mudar de página
+LADOS_POR_PARAGRAFO = 25
+
+
+def _documento_confrontante(confrontante):
+    tipo = tipo_documento(confrontante.cpf_cnpj) if confrontante else None
+    return f" {tipo}: {escape(confrontante.cpf_cnpj)}" if tipo else ""
+
+
+def segmentos_descricao(projeto, vertices):
+    """
+    Trechos da descrição perimétrica, em ordem: a abertura, um por lado do
+    polígono e o fechamento. Azimutes e distâncias são os gravados nos
+    vértices; só quando faltam (vértices ainda não recalculados) os azimutes
+    saem de uma conta vetorizada. Retorna [] com menos de 3 vértices.
+    """
+    total = len(vertices)
+    if total < 3:
+        return []
+
+    nan = float("nan")
+    if all(v.azimute is not None for v in vertices):
+        azimutes = decimal_para_gms_lote([v.azimute for v in vertices])
+    else:
+        azimutes = decimal_para_gms_lote(azimutes_utm(
+            [v.utm_e if v.utm_e is not None else nan for v in vertices],
+            [v.utm_n if v.utm_n is not None else nan for v in vertices],
+        ))
+
+    v_inicio = vertices[0]
+    segmentos = [
+        "Inicia-se a descrição deste perímetro no ponto de vértice "
+        f"<strong>{escape(v_inicio.de_vertice)}</strong>, de coordenadas "
+        f"N {br_coord(v_inicio.utm_n)}m e "
+        f"E {br_coord(v_inicio.utm_e)}m; "
+    ]
+
+    for i, v1 in enumerate(vertices):
+        v2 = vertices[(i + 1) % total]
+        confrontante = v1.confrontante.nome if v1.confrontante else v1.confrontante_texto
+        segmentos.append(
+            f"deste segue confrontando com {escape(confrontante or '')},{_documento_confrontante(v1.confrontante)}, "
+            f"com azimute de {azimutes[i]} e distância de {br(v1.distancia_lado)}m, "
+            f"até o vértice <strong>{escape(v2.de_vertice)}</strong>, de coordenadas "
+            f"N {br_coord(v2.utm_n)}m e E {br_coord(v2.utm_e)}m, "
+        )
+
+    perimetro = f"{projeto.perimetro:.2f}".replace(".", ",")
+    segmentos.append(
+        "ponto inicial da descrição deste perímetro. Todas as coordenadas aqui descritas estão georreferenciadas ao Sistema Geodésico Brasileiro "
+        "e encontram-se representadas no Sistema UTM, referenciadas ao Meridiano Central 51º WGr, "
+        "tendo como Datum o SIRGAS2000. Todos os azimutes e distâncias, área e perímetro foram "
+        f"calculados no plano de projeção UTM. Encerrado o perímetro total de {perimetro} m "
+        f"e área de {br(projeto.area)} m²."
+    )
+    return segmentos
+
+
+def descricao_perimetrica(projeto, vertices, lados_por_paragrafo=LADOS_POR_PARAGRAFO):
+    """
+    Descrição perimétrica em blocos de texto (cada um vira um parágrafo),
+    montados com join: custo linear no número de vértices.
+    """
+    segmentos = segmentos_descricao(projeto, vertices)
+    return [
+        "".join(segmentos[i:i + lados_por_paragrafo])
+        for i in range(0, len(segmentos), lados_por_paragrafo)
+    ]
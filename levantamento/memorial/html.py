@@ -0,0 +1,42 @@
+from django.core.cache import cache
+from django.template.loader import render_to_string
+
+from .cache import chave_memorial
+from .conteudo import SEM_ASSINATURAS, SEM_BENEFICIARIOS, conteudo_memorial
+from .dados import carregar_dados_memorial
+
+
+# ======PREVIA DO MEMORIAL EM HTML======
+
+TEMPLATE_PREVIA = "levantamento/memorial_previa.html"
+# Mudou o template? Incremente para não servir prévias antigas do cache
+VERSAO_PREVIA = 1
+# A chave já muda com o conteúdo e com a data; a validade só limpa o cache
+VALIDADE_PREVIA = 24 * 60 * 60
+
+
+def renderizar_memorial_html(conteudo):
+    """Seções 1 a 10 do memorial em HTML simples, para conferência na tela."""
+    return render_to_string(TEMPLATE_PREVIA, {
+        "conteudo": conteudo,
+        "sem_beneficiarios": SEM_BENEFICIARIOS,
+        "sem_assinaturas": SEM_ASSINATURAS,
+    })
+
+
+def previa_memorial(projeto, chave=None):
+    """
+    Retorna (html, acerto). O HTML fica no cache do Django pela chave de
+    conteúdo do memorial (a mesma do cache de PDFs), então só é montado de
+    novo quando algum dado impresso muda.
+    """
+    chave = chave or chave_memorial(projeto)
+    chave_cache = f"memorial_previa:{VERSAO_PREVIA}:{projeto.id}:{chave}"
+
+    html = cache.get(chave_cache)
+    if html is not None:
+        return html, True
+
+    html = renderizar_memorial_html(conteudo_memorial(carregar_dados_memorial(projeto)))
+    cache.set(chave_cache, html, VALIDADE_PREVIA)
+    return html, False
@@ -0,0 +1,139 @@
+import io
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.db import connections
+from django.utils.text import get_valid_filename
+
+from .conteudo import conteudo_memorial
+from .dados import carregar_dados_memoriais
+from .pdf import renderizar_memorial_pdf
+
+
+# ======MEMORIAIS EM LOTE (NUCLEO REURB)======
+
+def nome_arquivo_memorial(projeto):
+    return get_valid_filename(f"{projeto.nome} - Memorial.pdf") or f"projeto_{projeto.id}.pdf"
+
+
+def _renderizar(dados):
+    """Executado nos processos do pool: só reportlab, sem banco."""
+    buffer = io.BytesIO()
+    renderizar_memorial_pdf(conteudo_memorial(dados), buffer)
+    return buffer.getvalue()
+
+
+def _contexto_processos():
+    # forkserver/spawn: o processo filho não herda conexões nem threads do
+    # servidor; o initializer (django.setup) carrega os apps antes das tarefas
+    metodos = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in metodos else "spawn")
+
+
+def em_paralelo(itens, renderizar, processos=None):
+    """
+    Gera (item, bytes, erro) para cada item, na ordem em que ficam prontos,
+    distribuindo renderizar(item) entre `processos` processos (padrão:
+    núcleos). renderizar precisa ser uma função de módulo (vai por pickle).
+    """
+    processos = min(processos or os.cpu_count() or 1, len(itens) or 1)
+
+    if processos == 1:
+        for item in itens:
+            try:
+                yield item, renderizar(item), None
+            except Exception as e:
+                yield item, None, e
+        return
+
+    # Nada de conexão aberta atravessando a criação dos processos
+    connections.close_all()
+    with ProcessPoolExecutor(processos, mp_context=_contexto_processos(), initializer=django.setup) as pool:
+        futuros = {pool.submit(renderizar, item): item for item in itens}
+        for futuro in as_completed(futuros):
+            try:
+                yield futuros[futuro], futuro.result(), None
+            except Exception as e:
+                yield futuros[futuro], None, e
+
+
+def gerar_memoriais_em_lote(projeto_ids, processos=None):
+    """
+    Gera (projeto, pdf_em_bytes, erro) para cada projeto, na ordem em que os
+    PDFs ficam prontos. Os dados saem do banco em quatro consultas; a
+    renderização é distribuída entre `processos` processos (padrão: núcleos).
+    """
+    dados = carregar_dados_memoriais(projeto_ids)
+    for item, pdf, erro in em_paralelo(list(dados.values()), _renderizar, processos):
+        yield item.projeto, pdf, erro
+
+
+class _SaidaZip:
+    """Destino sem seek para o zipfile: acumula os bytes até serem recolhidos."""
+
+    def __init__(self):
+        self._partes = []
+        self._posicao = 0
+
+    def write(self, dados):
+        self._partes.append(bytes(dados))
+        self._posicao += len(dados)
+        return len(dados)
+
+    def tell(self):
+        return self._posicao
+
+    def flush(self):
+        pass
+
+    def recolher(self):
+        dados = b"".join(self._partes)
+        self._partes = []
+        return dados
+
+
+def zip_em_lote(resultados, nome_arquivo, identificacao):
+    """
+    Gera os blocos de um ZIP a partir de (item, bytes, erro), cada arquivo
+    entrando assim que fica pronto. nome_arquivo(item) dá o caminho dentro
+    do ZIP (repetido ganha o item.id na frente); os itens com erro vão
+    listados em ERROS.txt por identificacao(item).
+    """
+    saida = _SaidaZip()
+    erros = []
+    nomes = set()
+
+    with zipfile.ZipFile(saida, "w", compression=zipfile.ZIP_DEFLATED) as zip_saida:
+        for item, conteudo, erro in resultados:
+            if erro is not None:
+                erros.append(f"{identificacao(item)}: {erro}")
+                continue
+
+            nome = nome_arquivo(item)
+            if nome in nomes:
+                pasta, _, arquivo = nome.rpartition("/")
+                nome = f"{pasta}/{item.id} - {arquivo}" if pasta else f"{item.id} - {arquivo}"
+            nomes.add(nome)
+
+            zip_saida.writestr(nome, conteudo)
+            yield saida.recolher()
+
+        if erros:
+            zip_saida.writestr("ERROS.txt", "\n".join(erros))
+
+    yield saida.recolher()
+
+
+def zip_memoriais_em_lote(projeto_ids, processos=None):
+    """
+    Gera os blocos de um ZIP com os memoriais, cada PDF entrando no arquivo
+    assim que fica pronto. Projetos com erro vão listados em ERROS.txt.
+    """
+    return zip_em_lote(
+        gerar_memoriais_em_lote(projeto_ids, processos),
+        nome_arquivo_memorial,
+        lambda projeto: f"{projeto.nome} (ID {projeto.id})",
+    )
@@ -0,0 +1,175 @@
+import io
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from django.utils.text import get_valid_filename
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import cm
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+from ..models import Beneficiario, Confrontante, Projeto
+from .dados import DadosMemorial, local_e_data, responsavel_tecnico, rotulo_documento
+from .lote import em_paralelo, zip_em_lote
+from .pdf import ESTILOS, MARGENS
+from .word import preencher_modelo_docx
+
+
+# ======NOTIFICACAO DOS CONFRONTANTES (REURB)======
+
+# Gerado pelo comando gerar_modelo_docx
+CAMINHO_MODELO_NOTIFICACAO = Path(__file__).resolve().parent / "modelos" / "notificacao.docx"
+FORMATOS_NOTIFICACAO = ("pdf", "docx")
+
+ESTILO_DESTINATARIO = ParagraphStyle("Destinatario", parent=ESTILOS["esquerda"], spaceAfter=0, leading=15)
+
+
+@dataclass(frozen=True)
+class CartaNotificacao:
+    """Texto pronto da carta de um confrontante (vai por pickle para os processos)."""
+    id: int  # do confrontante
+    projeto_id: int
+    projeto_nome: str
+    nome: str
+    documento: str
+    endereco: str
+    assunto: str
+    corpo: list  # parágrafos em texto puro
+    local_data: str
+    responsavel: dict
+
+
+def _endereco(confrontante):
+    numero = f"nº {confrontante.numero}" if confrontante.numero else ""
+    return ", ".join(parte for parte in (confrontante.rua, numero, confrontante.bairro, confrontante.cidade) if parte)
+
+
+def montar_carta(projeto, beneficiarios, confrontante):
+    imovel = projeto.endereco
+    if projeto.inscricao_imobiliaria and projeto.inscricao_imobiliaria.strip():
+        imovel = f"{imovel}, inscrição imobiliária {projeto.inscricao_imobiliaria}"
+    requerentes = ", ".join(ben.nome for ben in beneficiarios) or "seus ocupantes"
+
+    return CartaNotificacao(
+        id=confrontante.id,
+        projeto_id=projeto.id,
+        projeto_nome=projeto.nome,
+        nome=confrontante.nome,
+        documento=rotulo_documento(confrontante.cpf_cnpj),
+        endereco=_endereco(confrontante),
+        assunto=f"Regularização Fundiária Urbana do imóvel {projeto.nome}",
+        corpo=[
+            f"Na qualidade de confrontante ({confrontante.direcao}) do imóvel localizado em {imovel}, "
+            f"objeto de Regularização Fundiária Urbana (REURB) requerida por {requerentes}, fica V.Sa. "
+            "NOTIFICADO(A), nos termos do art. 31 da Lei nº 13.465/2017, para, querendo, apresentar "
+            "impugnação no prazo de 30 (trinta) dias, contados do recebimento desta.",
+            "A ausência de manifestação no prazo será interpretada como concordância com a "
+            "regularização, conforme o § 6º do mesmo artigo. O memorial descritivo e a planta do "
+            "imóvel estão à disposição para consulta com o responsável técnico abaixo.",
+        ],
+        local_data=local_e_data(DadosMemorial(projeto, beneficiarios)),
+        responsavel=responsavel_tecnico(),
+    )
+
+
+def carregar_cartas(projeto_ids):
+    """Uma carta por confrontante dos projetos, com três consultas no total."""
+    projetos = {projeto.id: projeto for projeto in Projeto.objects.filter(id__in=projeto_ids)}
+    beneficiarios = defaultdict(list)
+    for beneficiario in Beneficiario.objects.filter(projeto_id__in=projetos).order_by("id"):
+        beneficiarios[beneficiario.projeto_id].append(beneficiario)
+
+    confrontantes = Confrontante.objects.filter(projeto_id__in=projetos).order_by("projeto__nome", "projeto_id", "id")
+    return [
+        montar_carta(projetos[confrontante.projeto_id], beneficiarios[confrontante.projeto_id], confrontante)
+        for confrontante in confrontantes
+    ]
+
+
+# ======CARTA EM PDF E EM WORD======
+
+def renderizar_carta_pdf(carta, destino):
+    doc = SimpleDocTemplate(destino, pagesize=A4, **MARGENS)
+    destinatario = "<br/>".join([
+        "Ao(À) Sr(a).", f"<b>{escape(carta.nome)}</b>", escape(carta.documento), escape(carta.endereco),
+    ])
+    elementos = [
+        Paragraph("NOTIFICAÇÃO DE CONFRONTANTE", ESTILOS["titulo"]),
+        Paragraph("Regularização Fundiária Urbana (REURB) - Lei nº 13.465/2017", ESTILOS["centro"]),
+        Spacer(1, 0.5*cm),
+        Paragraph(destinatario, ESTILO_DESTINATARIO),
+        Spacer(1, 0.8*cm),
+        Paragraph(f"<b>Assunto:</b> {escape(carta.assunto)}", ESTILOS["esquerda"]),
+    ]
+    elementos += [Paragraph(escape(paragrafo), ESTILOS["descricao"]) for paragrafo in carta.corpo]
+    elementos += [
+        Spacer(1, 0.5*cm),
+        Paragraph(escape(carta.local_data), ESTILOS["esquerda"]),
+        Spacer(1, 1.5*cm),
+        Paragraph("__________________________________________________", ESTILOS["centro"]),
+        Paragraph(escape(carta.responsavel["nome"]), ESTILOS["centro_negrito"]),
+        Paragraph(escape(carta.responsavel["titulo"]), ESTILOS["centro"]),
+        Paragraph(escape(carta.responsavel["registro"]), ESTILOS["centro"]),
+        Spacer(1, 1.5*cm),
+        Paragraph("Recebi a via desta notificação em ____/____/________.", ESTILOS["esquerda"]),
+        Spacer(1, 0.8*cm),
+        Paragraph("Assinatura: ______________________________________________", ESTILOS["esquerda"]),
+    ]
+    doc.build(elementos)
+
+
+def renderizar_carta_docx(carta, destino):
+    preencher_modelo_docx(CAMINHO_MODELO_NOTIFICACAO, {
+        "NOME": carta.nome,
+        "DOCUMENTO": carta.documento,
+        "ENDERECO": carta.endereco or None,
+        "ASSUNTO": carta.assunto,
+        "CORPO_1": carta.corpo[0],
+        "CORPO_2": carta.corpo[1],
+        "LOCAL_DATA": carta.local_data,
+        "TECNICO_NOME": carta.responsavel["nome"],
+        "TECNICO_TITULO": carta.responsavel["titulo"],
+        "TECNICO_REGISTRO": carta.responsavel["registro"],
+    }, destino)
+
+
+def _carta_pdf(carta):
+    buffer = io.BytesIO()
+    renderizar_carta_pdf(carta, buffer)
+    return buffer.getvalue()
+
+
+def _carta_docx(carta):
+    buffer = io.BytesIO()
+    renderizar_carta_docx(carta, buffer)
+    return buffer.getvalue()
+
+
+RENDERIZADORES = {"pdf": _carta_pdf, "docx": _carta_docx}
+
+
+# ======NOTIFICACOES EM LOTE======
+
+def nome_arquivo_notificacao(carta, formato):
+    pasta = get_valid_filename(carta.projeto_nome) or f"projeto_{carta.projeto_id}"
+    arquivo = get_valid_filename(f"{carta.nome} - Notificação.{formato}") or f"confrontante_{carta.id}.{formato}"
+    return f"{pasta}/{arquivo}"
+
+
+def gerar_notificacoes_em_lote(projeto_ids, formato="pdf", processos=None):
+    """(carta, bytes, erro) de cada confrontante dos projetos, renderizados em paralelo."""
+    return em_paralelo(carregar_cartas(projeto_ids), RENDERIZADORES[formato], processos)
+
+
+def zip_notificacoes_em_lote(projeto_ids, formato="pdf", processos=None):
+    """
+    Blocos de um ZIP com uma notificação por confrontante, numa pasta por
+    projeto. Cartas com erro vão listadas em ERROS.txt.
+    """
+    return zip_em_lote(
+        gerar_notificacoes_em_lote(projeto_ids, formato, processos),
+        lambda carta: nome_arquivo_notificacao(carta, formato),
+        lambda carta: f"{carta.nome} ({carta.projeto_nome}, confrontante ID {carta.id})",
+    )
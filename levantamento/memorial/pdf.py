@@ -0,0 +1,354 @@
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import Flowable, SimpleDocTemplate, Table, TableStyle, Paragraph
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import cm
+from reportlab.lib.enums import TA_JUSTIFY
+from reportlab.lib import colors
+from xml.sax.saxutils import escape
+
+from ..calculos import calcular_largura_confrontantes
+from .conteudo import SEM_ASSINATURAS, SEM_BENEFICIARIOS, SEM_DESCRICAO, conteudo_memorial
+from .dados import carregar_dados_memorial
+
+
+# ======LAYOUT DO PDF (MONTADO UMA VEZ, NA IMPORTAÇÃO)======
+
+MARGENS = dict(rightMargin=2.5*cm, leftMargin=2.5*cm, topMargin=2*cm, bottomMargin=1.5*cm)
+
+
+def _compilar_estilos():
+    styles = getSampleStyleSheet()
+    estilos = {
+        "titulo": ParagraphStyle(
+            'TitleStyle',
+            parent=styles['Heading1'],
+            fontName='Times-Roman',
+            fontSize=16,
+            alignment=1,
+            spaceAfter=12,
+            textTransform='uppercase',
+            fontWeight='bold',
+            underline=True
+        ),
+        "cabecalho": ParagraphStyle(
+            'HeadingStyle',
+            parent=styles['Heading2'],
+            fontName='Times-Roman',
+            fontSize=14,
+            spaceAfter=12,
+            fontWeight='bold'
+        ),
+        "normal": ParagraphStyle(
+            'NormalStyle',
+            parent=styles['Normal'],
+            fontName='Times-Roman',
+            fontSize=12,
+            spaceAfter=12,
+            firstLineIndent=1.25*cm,
+            alignment=4,
+            leading=5
+        ),
+        "descricao": ParagraphStyle(
+            'DescricaoStyle',
+            parent=styles['Normal'],
+            fontName='Times-Roman',
+            fontSize=12,
+            spaceAfter=12,
+            firstLineIndent=1.25*cm,
+            alignment=TA_JUSTIFY,
+            leading=18
+        ),
+        "centro": ParagraphStyle(
+            'CenterStyle',
+            parent=styles['Normal'],
+            fontName='Times-Roman',
+            fontSize=12,
+            spaceAfter=12,
+            alignment=1
+        ),
+        "esquerda": ParagraphStyle(
+            'LeftStyle',
+            parent=styles['Normal'],
+            fontName='Times-Roman',
+            fontSize=12,
+            spaceAfter=12,
+            alignment=0
+        ),
+        "secao": ParagraphStyle(
+            'SectionStyle',
+            parent=styles['Normal'],
+            fontName='Times-Roman',
+            fontSize=14,
+            spaceAfter=12,
+            fontWeight='bold'
+        ),
+        "negrito": ParagraphStyle('Bold', fontName='Times-Bold', fontSize=12),
+        "assinatura": ParagraphStyle('Signature', fontName='Times-Roman', fontSize=12, leading=14),
+    }
+    estilos["centro_negrito"] = ParagraphStyle('BoldCenter', parent=estilos["centro"], fontName='Times-Bold', fontWeight='bold')
+
+    # Descrição em vários parágrafos de um texto contínuo: só o primeiro tem
+    # recuo e só o último tem o espaço depois, para a quebra não aparecer
+    descricao = estilos["descricao"]
+    estilos["descricao_primeiro"] = ParagraphStyle('DescricaoPrimeiro', parent=descricao, spaceAfter=0)
+    estilos["descricao_meio"] = ParagraphStyle('DescricaoMeio', parent=descricao, firstLineIndent=0, spaceAfter=0)
+    estilos["descricao_ultimo"] = ParagraphStyle('DescricaoUltimo', parent=descricao, firstLineIndent=0)
+    return estilos
+
+
+ESTILOS = _compilar_estilos()
+
+TABELAS = {
+    "cabecalho_beneficiarios": TableStyle([
+        ('TEXTCOLOR', (0, 0), (-1, 0), '#000000'),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Times-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
+    ]),
+    "beneficiarios": TableStyle([
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Times-Roman'),
+        ('FONTSIZE', (0, 0), (-1, -1), 12),
+        ('ALIGN', (1, 0), (1, -1), 'CENTER'),
+    ]),
+    "vertices": TableStyle([
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('FONTNAME', (0, 0), (-1, -1), 'Times-Roman'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('ALIGN', (4,1), (4,-1), 'LEFT'),
+    ]),
+    "assinaturas": TableStyle([
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ]),
+}
+
+LARGURAS_BENEFICIARIOS = [10*cm, 6*cm]
+LARGURAS_VERTICES = [2*cm, 3.2*cm, 3.2*cm, 2.5*cm]  # a coluna do confrontante depende do texto
+LARGURA_MINIMA_CONFRONTANTES = 7*cm
+LARGURAS_ASSINATURAS = [8*cm, 1*cm, 7*cm]
+
+
+class TabelaPaginada(Flowable):
+    """
+    Tabela de muitas linhas com o cabeçalho repetido em cada página. O split
+    do Table recria a tabela com todas as linhas restantes a cada página
+    (custo quadrático); aqui cada página vira uma Table só com as linhas que
+    cabem nela, e o restante é a mesma lista com outro início.
+    """
+
+    def __init__(self, cabecalho, linhas, larguras, estilo, inicio=0, altura_linha=None):
+        super().__init__()
+        self.hAlign = "CENTER"  # como o Table
+        self.cabecalho = cabecalho
+        self.linhas = linhas
+        self.larguras = larguras
+        self.estilo = estilo
+        self.inicio = inicio
+        self._altura_linha = altura_linha
+        self._tabela = None
+
+    def _montar(self, fim):
+        return Table([self.cabecalho] + self.linhas[self.inicio:fim], colWidths=self.larguras, repeatRows=1, style=self.estilo)
+
+    def altura_linha(self):
+        # As células são texto de uma linha: todas as linhas têm a mesma altura
+        if self._altura_linha is None:
+            amostra = self.linhas[self.inicio:self.inicio + 1] or [self.cabecalho]
+            _, self._altura_linha = Table(amostra, colWidths=self.larguras, style=self.estilo).wrap(0, 0)
+        return self._altura_linha
+
+    def wrap(self, availWidth, availHeight):
+        cabem = int(availHeight // self.altura_linha())
+        if len(self.linhas) - self.inicio >= cabem:
+            # Não cabe: só informa uma altura maior que a disponível para vir o split
+            self.width, self.height = availWidth, availHeight + 1
+            self._tabela = None
+            return self.width, self.height
+        self._tabela = self._montar(len(self.linhas))
+        self.width, self.height = self._tabela.wrap(availWidth, availHeight)
+        return self.width, self.height
+
+    def split(self, availWidth, availHeight):
+        # Uma linha a menos: a do cabeçalho
+        cabem = int(availHeight // self.altura_linha()) - 1
+        if cabem < 1:
+            return []
+        fim = self.inicio + cabem
+        if fim >= len(self.linhas):
+            return [self._montar(len(self.linhas))]
+        return [
+            self._montar(fim),
+            TabelaPaginada(self.cabecalho, self.linhas, self.larguras, self.estilo, fim, self._altura_linha),
+        ]
+
+    def draw(self):
+        self._tabela.drawOn(self.canv, 0, 0)
+
+
+def _estilo_descricao(k, ultimo):
+    if k == 0:
+        return ESTILOS["descricao"] if ultimo == 0 else ESTILOS["descricao_primeiro"]
+    return ESTILOS["descricao_ultimo"] if k == ultimo else ESTILOS["descricao_meio"]
+
+
+def _texto_assinatura(assinatura):
+    nome = escape(assinatura.nome)
+    if assinatura.sublinhada:
+        nome = f"<u>{nome}</u>"
+    return "<br/>".join([nome, escape(assinatura.documento), assinatura.papel])
+
+
+def gerar_memorial_pdf(projeto, destino):
+    """
+    Monta o memorial descritivo do projeto em PDF e grava em destino
+    (caminho ou objeto tipo arquivo).
+    """
+    renderizar_memorial_pdf(conteudo_memorial(carregar_dados_memorial(projeto)), destino)
+
+
+def renderizar_memorial_pdf(conteudo, destino):
+    """
+    Gera o PDF a partir do conteúdo já montado, sem consultar o banco. Os
+    estilos vêm prontos de ESTILOS/TABELAS; aqui só entram os dados.
+    """
+    doc = SimpleDocTemplate(destino, pagesize=A4, **MARGENS)
+    elements = []
+
+    title_style = ESTILOS["titulo"]
+    heading_style = ESTILOS["cabecalho"]
+    normal_style = ESTILOS["normal"]
+    descricao_style = ESTILOS["descricao"]
+    center_style = ESTILOS["centro"]
+    left_style = ESTILOS["esquerda"]
+    section_style = ESTILOS["secao"]
+
+    # Título principal
+    elements.append(Paragraph(conteudo.titulo, title_style))
+    elements.append(Paragraph("<br/><br/>", normal_style))
+
+    # Seção 1: Beneficiário(s)
+    elements.append(Paragraph("1. Beneficiário(s):", section_style))
+    if conteudo.beneficiarios:
+        header_table = Table([["Nome", "CPF"]], colWidths=LARGURAS_BENEFICIARIOS)
+        header_table.setStyle(TABELAS["cabecalho_beneficiarios"])
+        elements.append(header_table)
+
+        data = [[Paragraph(escape(nome), ESTILOS["negrito"]), cpf_cnpj] for nome, cpf_cnpj in conteudo.beneficiarios]
+        table_ben = Table(data, colWidths=LARGURAS_BENEFICIARIOS)
+        table_ben.setStyle(TABELAS["beneficiarios"])
+        elements.append(table_ben)
+    else:
+        elements.append(Paragraph(SEM_BENEFICIARIOS, normal_style))
+    elements.append(Paragraph("<br/>", normal_style))
+
+    # Seção 2: Localização do Imóvel
+    elements.append(Paragraph("2. Localização do Imóvel:", heading_style))
+
+    if conteudo.inscricao:
+        elements.append(Paragraph(escape(conteudo.inscricao), normal_style))
+
+    elements.append(Paragraph(escape(conteudo.endereco), descricao_style))
+    elements.append(Paragraph("<br/>", normal_style))
+
+    # Seção 3: Área
+    elements.append(Paragraph("3. Área:", heading_style))
+    elements.append(Paragraph(conteudo.area, normal_style))
+    elements.append(Paragraph("<br/>", normal_style))
+
+    # Seção 4: Perímetro
+    elements.append(Paragraph("4. Perímetro:", heading_style))
+    elements.append(Paragraph(conteudo.perimetro, normal_style))
+    elements.append(Paragraph("<br/>", normal_style))
+
+    # Seção 5: Época da Medição
+    elements.append(Paragraph("5. Época da Medição:", heading_style))
+    elements.append(Paragraph(escape(conteudo.epoca_medicao), normal_style))
+    elements.append(Paragraph("<br/>", normal_style))
+
+    # Seção 6: Instrumento Utilizado
+    elements.append(Paragraph("6. Instrumento Utilizado:", heading_style))
+    elements.append(Paragraph(escape(conteudo.instrumento), normal_style))
+    elements.append(Paragraph("<br/>", normal_style))
+
+    # Seção 7: Sistema Geodésico de Referência
+    elements.append(Paragraph("7. Sistema Geodésico de Referência:", heading_style))
+    elements.append(Paragraph(conteudo.sistema_geodesico, normal_style))
+    elements.append(Paragraph("<br/>", normal_style))
+
+    # Seção 8: Projeção Cartográfica de Distância e Área
+    elements.append(Paragraph("8. Projeção Cartográfica de Distância e Área:", heading_style))
+    elements.append(Paragraph(conteudo.projecao, normal_style))
+    elements.append(Paragraph("<br/>", normal_style))
+
+    # Seção 9: Tabela de Coordenadas, Confrontações e Medidas
+    elements.append(Paragraph("9. Tabela de Coordenadas, Confrontações e Medidas:", heading_style))
+
+    data = [conteudo.cabecalho_vertices] + conteudo.tabela_vertices
+
+    largura_confrontantes = calcular_largura_confrontantes(data)
+    larguras = LARGURAS_VERTICES + [max(largura_confrontantes, LARGURA_MINIMA_CONFRONTANTES)]
+
+    table = TabelaPaginada(conteudo.cabecalho_vertices, conteudo.tabela_vertices, larguras, TABELAS["vertices"])
+
+    elements.append(table)
+    elements.append(Paragraph("<br/><br/>", normal_style))
+    elements.append(Paragraph("<br/>", normal_style))
+
+    # Seção 10: Descrição Perimétrica
+    elements.append(Paragraph("10. Descrição Perimétrica:", heading_style))
+
+    blocos = conteudo.descricao
+
+    if not blocos:
+        elements.append(Paragraph(SEM_DESCRICAO, normal_style))
+    else:
+        ultimo = len(blocos) - 1
+        for k, bloco in enumerate(blocos):
+            elements.append(Paragraph(bloco, _estilo_descricao(k, ultimo)))
+
+    # Local e Data
+    elements.append(Paragraph("<br/>", normal_style))
+    elements.append(Paragraph("<br/>", normal_style))
+
+    elements.append(Paragraph(escape(conteudo.local_data), left_style))
+    elements.append(Paragraph("<br/>", normal_style))
+    elements.append(Paragraph("<br/>", normal_style))
+    elements.append(Paragraph("<br/>", normal_style))
+    elements.append(Paragraph("<br/>", normal_style))
+    elements.append(Paragraph("<br/>", normal_style))
+
+    # Assinatura do Responsável Técnico
+    elements.append(Paragraph("__________________________________________________", center_style))
+    elements.append(Paragraph(escape(conteudo.responsavel["nome"]), ESTILOS["centro_negrito"]))
+    elements.append(Paragraph(escape(conteudo.responsavel["titulo"]), center_style))
+    elements.append(Paragraph(escape(conteudo.responsavel["registro"]), center_style))
+    elements.append(Paragraph("<br/>", center_style))
+    elements.append(Paragraph("<br/>", normal_style))
+    elements.append(Paragraph("<br/>", normal_style))
+    elements.append(Paragraph("<br/>", normal_style))
+    elements.append(Paragraph("<br/>", normal_style))
+
+    # Tabela de Assinaturas (Requerentes e Confrontantes)
+    if conteudo.assinaturas:
+        signature_data = []
+        for primeira, segunda in conteudo.pares_assinaturas:
+            signature_data.append([
+                Paragraph(_texto_assinatura(primeira), ESTILOS["assinatura"]),
+                "",
+                Paragraph(_texto_assinatura(segunda), ESTILOS["assinatura"]) if segunda else "",
+            ])
+            signature_data.append(["", "", ""])
+            signature_data.append(["", "", ""])
+            signature_data.append(["", "", ""])
+
+        table_sign = Table(signature_data, colWidths=LARGURAS_ASSINATURAS)
+        table_sign.setStyle(TABELAS["assinaturas"])
+        elements.append(table_sign)
+    else:
+        elements.append(Paragraph(SEM_ASSINATURAS, normal_style))
+
+    # Gerar o PDF
+    doc.build(elements)
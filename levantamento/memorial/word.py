@@ -0,0 +1,244 @@
+import copy
+import re
+import zipfile
+from functools import lru_cache
+from pathlib import Path
+from xml.sax.saxutils import unescape
+
+from lxml import etree
+
+from .conteudo import SEM_ASSINATURAS, SEM_BENEFICIARIOS, conteudo_memorial
+from .dados import carregar_dados_memorial
+
+
+# ======MEMORIAL EM WORD (MODELO DOCX PREENCHIDO NO XML)======
+
+# Gerado pelo comando gerar_modelo_docx
+CAMINHO_MODELO = Path(__file__).resolve().parent / "modelos" / "memorial.docx"
+DOCUMENTO = "word/document.xml"
+CONTENT_TYPE_DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+W_T = f"{{{W}}}t"
+W_R = f"{{{W}}}r"
+W_P = f"{{{W}}}p"
+W_TR = f"{{{W}}}tr"
+W_TBL = f"{{{W}}}tbl"
+W_BR = f"{{{W}}}br"
+W_B = f"{{{W}}}b"
+W_RPR = f"{{{W}}}rPr"
+W_PPR = f"{{{W}}}pPr"
+W_IND = f"{{{W}}}ind"
+XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+
+RE_MARCADOR = re.compile(r"\{\{(\w+)\}\}")
+RE_NEGRITO = re.compile(r"<strong>(.*?)</strong>")
+
+
+@lru_cache(maxsize=None)
+def _modelo(caminho=CAMINHO_MODELO):
+    """Entradas do ZIP do modelo, lidas do disco uma vez por processo."""
+    with zipfile.ZipFile(caminho) as modelo:
+        return [(info, modelo.read(info)) for info in modelo.infolist()]
+
+
+def _ancestral(elemento, tag):
+    while elemento is not None and elemento.tag != tag:
+        elemento = elemento.getparent()
+    return elemento
+
+
+def _remover(elemento):
+    elemento.getparent().remove(elemento)
+
+
+def _definir_texto(t, valor):
+    """Troca o texto do w:t; quebras de linha viram w:br no mesmo run."""
+    linhas = str(valor).split("\n")
+    t.text = linhas[0]
+    t.set(XML_SPACE, "preserve")
+    anterior = t
+    for linha in linhas[1:]:
+        quebra = etree.Element(W_BR)
+        anterior.addnext(quebra)
+        novo = etree.Element(W_T)
+        novo.text = linha
+        novo.set(XML_SPACE, "preserve")
+        quebra.addnext(novo)
+        anterior = novo
+
+
+def _replicar_linha(modelo, linhas):
+    """
+    Uma cópia da linha-modelo da tabela para cada item, inseridas de uma vez.
+    Os w:t da linha são preenchidos na ordem das colunas (um marcador por célula).
+    """
+    posicao = modelo.getparent().index(modelo)
+    tabela = modelo.getparent()
+    colunas = [bool(RE_MARCADOR.fullmatch(t.text or "")) for t in modelo.iter(W_T)]
+
+    novas = []
+    for valores in linhas:
+        linha = copy.deepcopy(modelo)
+        valores = iter(valores)
+        for t, marcador in zip(list(linha.iter(W_T)), colunas):
+            if marcador:
+                _definir_texto(t, next(valores))
+        novas.append(linha)
+
+    tabela.remove(modelo)
+    tabela[posicao:posicao] = novas
+
+
+def _negrito(run):
+    """Liga o negrito do run; w:b precisa ser o primeiro filho do w:rPr."""
+    propriedades = run.find(W_RPR)
+    if propriedades is None:
+        propriedades = etree.Element(W_RPR)
+        run.insert(0, propriedades)
+    negrito = propriedades.find(W_B)
+    if negrito is None:
+        negrito = etree.Element(W_B)
+        propriedades.insert(0, negrito)
+    negrito.attrib.pop(f"{{{W}}}val", None)
+
+
+def _paragrafos_descricao(modelo, blocos):
+    """Um parágrafo por bloco da descrição; <strong> vira run em negrito."""
+    run_modelo = next(modelo.iter(W_R))
+    posicao = modelo.getparent().index(modelo)
+    corpo = modelo.getparent()
+
+    novos = []
+    for k, bloco in enumerate(blocos):
+        paragrafo = copy.deepcopy(modelo)
+        for run in paragrafo.findall(W_R):
+            paragrafo.remove(run)
+        # Só o primeiro bloco tem recuo de primeira linha
+        if k > 0:
+            recuo = paragrafo.find(f"{W_PPR}/{W_IND}")
+            if recuo is not None:
+                recuo.getparent().remove(recuo)
+
+        for i, trecho in enumerate(RE_NEGRITO.split(bloco)):
+            if not trecho:
+                continue
+            run = copy.deepcopy(run_modelo)
+            _definir_texto(run.find(W_T), unescape(trecho))
+            if i % 2:
+                _negrito(run)
+            paragrafo.append(run)
+        novos.append(paragrafo)
+
+    corpo.remove(modelo)
+    corpo[posicao:posicao] = novos
+
+
+def _marcadores(raiz):
+    """{CHAVE: w:t} de cada {{CHAVE}} do documento."""
+    marcadores = {}
+    for t in raiz.iter(W_T):
+        encontrado = RE_MARCADOR.fullmatch(t.text or "")
+        if encontrado:
+            marcadores[encontrado.group(1)] = t
+    return marcadores
+
+
+def _preencher(raiz, conteudo):
+    marcadores = _marcadores(raiz)
+
+    def paragrafo(chave):
+        return _ancestral(marcadores[chave], W_P)
+
+    # Seção 1: beneficiários
+    if conteudo.beneficiarios:
+        _remover(paragrafo("SEM_BENEFICIARIOS"))
+        _replicar_linha(_ancestral(marcadores["BEN_NOME"], W_TR), conteudo.beneficiarios)
+    else:
+        _remover(_ancestral(marcadores["BEN_NOME"], W_TBL))
+        _definir_texto(marcadores["SEM_BENEFICIARIOS"], SEM_BENEFICIARIOS)
+
+    # Seções 2 a 6
+    if conteudo.inscricao:
+        _definir_texto(marcadores["INSCRICAO"], conteudo.inscricao)
+    else:
+        _remover(paragrafo("INSCRICAO"))
+    _definir_texto(marcadores["ENDERECO"], conteudo.endereco)
+    _definir_texto(marcadores["AREA"], conteudo.area)
+    _definir_texto(marcadores["PERIMETRO"], conteudo.perimetro)
+    _definir_texto(marcadores["EPOCA_MEDICAO"], conteudo.epoca_medicao)
+    _definir_texto(marcadores["INSTRUMENTO"], conteudo.instrumento)
+
+    # Seção 9: tabela de vértices, todas as linhas de uma vez
+    _replicar_linha(_ancestral(marcadores["V_VERTICE"], W_TR), conteudo.tabela_vertices)
+
+    # Seção 10: descrição perimétrica
+    _paragrafos_descricao(paragrafo("DESCRICAO"), conteudo.blocos_descricao)
+
+    # Local, data e responsável técnico
+    _definir_texto(marcadores["LOCAL_DATA"], conteudo.local_data)
+    _definir_texto(marcadores["TECNICO_NOME"], conteudo.responsavel["nome"])
+    _definir_texto(marcadores["TECNICO_TITULO"], conteudo.responsavel["titulo"])
+    _definir_texto(marcadores["TECNICO_REGISTRO"], conteudo.responsavel["registro"])
+
+    # Assinaturas (requerentes e confrontantes), duas por linha
+    if conteudo.assinaturas:
+        _remover(paragrafo("SEM_ASSINATURAS"))
+        pares = [
+            ["\n".join(a.linhas) if a else "" for a in par]
+            for par in conteudo.pares_assinaturas
+        ]
+        _replicar_linha(_ancestral(marcadores["ASSINATURA_1"], W_TR), pares)
+    else:
+        _remover(_ancestral(marcadores["ASSINATURA_1"], W_TBL))
+        _definir_texto(marcadores["SEM_ASSINATURAS"], SEM_ASSINATURAS)
+
+
+def _gravar(caminho_modelo, preencher, destino):
+    """Abre o document.xml do modelo, chama preencher(raiz) e grava o DOCX em destino."""
+    entradas = _modelo(caminho_modelo)
+    documento = dict((info.filename, dados) for info, dados in entradas)[DOCUMENTO]
+
+    raiz = etree.fromstring(documento)
+    preencher(raiz)
+
+    with zipfile.ZipFile(destino, "w", compression=zipfile.ZIP_DEFLATED) as saida:
+        for info, dados in entradas:
+            # Cópia do ZipInfo: o zipfile grava offset e tamanhos nele, e o
+            # original é compartilhado entre renderizações
+            info = copy.copy(info)
+            if info.filename != DOCUMENTO:
+                saida.writestr(info, dados)
+                continue
+            # O XML vai direto para a entrada do ZIP, sem virar bytes inteiro antes
+            with saida.open(info, "w") as xml:
+                etree.ElementTree(raiz).write(xml, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+
+def preencher_modelo_docx(caminho_modelo, valores, destino):
+    """
+    Troca cada {{CHAVE}} do modelo pelo texto de valores[CHAVE] (quebras de
+    linha viram w:br); com valor None o parágrafo do marcador é removido.
+    """
+    def preencher(raiz):
+        for chave, t in _marcadores(raiz).items():
+            valor = valores.get(chave)
+            if valor is None:
+                _remover(_ancestral(t, W_P))
+            else:
+                _definir_texto(t, valor)
+
+    _gravar(caminho_modelo, preencher, destino)
+
+
+def renderizar_memorial_docx(conteudo, destino):
+    """Preenche o modelo DOCX com o conteúdo já montado e grava em destino."""
+    _gravar(CAMINHO_MODELO, lambda raiz: _preencher(raiz, conteudo), destino)
+
+
+def gerar_memorial_docx(projeto, destino):
+    """
+    Monta o memorial descritivo do projeto em Word (DOCX) e grava em destino
+    (caminho ou objeto tipo arquivo).
+    """
+    renderizar_memorial_docx(conteudo_memorial(carregar_dados_memorial(projeto)), destino)
@@ -0,0 +1,89 @@
+# Generated by Django 6.0.1 on 2026-10-17 04:23
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Projeto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=200)),
+                ('inscricao_imobiliaria', models.CharField(blank=True, max_length=100, null=True, verbose_name='Inscrição Imobiliária')),
+                ('endereco', models.TextField()),
+                ('area', models.FloatField(help_text='Área em metros quadrados')),
+                ('perimetro', models.FloatField(help_text='Perímetro em metros')),
+                ('epoca_medicao', models.CharField(help_text='Março de 2025', max_length=50)),
+                ('instrumento', models.CharField(help_text='GNSS ComNav T30', max_length=100)),
+            ],
+            options={
+                'verbose_name': 'Projeto',
+                'verbose_name_plural': 'Projetos',
+            },
+        ),
+        migrations.CreateModel(
+            name='Confrontante',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=200)),
+                ('cpf_cnpj', models.CharField(max_length=18, validators=[django.core.validators.RegexValidator(message='Digite um CPF (XXX.XXX.XXX-XX) ou CNPJ (XX.XXX.XXX/XXXX-XX) válido.', regex='^\\d{3}\\.\\d{3}\\.\\d{3}-\\d{2}$|^\\d{2}\\.\\d{3}\\.\\d{3}/\\d{4}-\\d{2}$')])),
+                ('direcao', models.CharField(choices=[('Direita', 'Direita'), ('Esquerda', 'Esquerda'), ('Frente', 'Frente'), ('Fundos', 'Fundos')], max_length=10)),
+                ('rua', models.CharField(max_length=200)),
+                ('numero', models.CharField(max_length=20)),
+                ('bairro', models.CharField(max_length=100)),
+                ('cidade', models.CharField(max_length=100)),
+                ('excluir_do_pdf', models.BooleanField(default=False)),
+                ('projeto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='confrontantes', to='levantamento.projeto')),
+            ],
+            options={
+                'verbose_name': 'Confrontante',
+                'verbose_name_plural': 'Confrontantes',
+            },
+        ),
+        migrations.CreateModel(
+            name='Beneficiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=200)),
+                ('cpf_cnpj', models.CharField(max_length=18, validators=[django.core.validators.RegexValidator(message='Digite um CPF (XXX.XXX.XXX-XX) ou CNPJ (XX.XXX.XXX/XXXX-XX) válido.', regex='^\\d{3}\\.\\d{3}\\.\\d{3}-\\d{2}$|^\\d{2}\\.\\d{3}\\.\\d{3}/\\d{4}-\\d{2}$')])),
+                ('rua', models.CharField(max_length=200)),
+                ('numero', models.CharField(max_length=20)),
+                ('bairro', models.CharField(max_length=100)),
+                ('cidade', models.CharField(max_length=100)),
+                ('projeto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='beneficiarios', to='levantamento.projeto')),
+            ],
+            options={
+                'verbose_name': 'Beneficiário',
+                'verbose_name_plural': 'Beneficiários',
+            },
+        ),
+        migrations.CreateModel(
+            name='Vertice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('de_vertice', models.CharField(help_text='Ex.: V01', max_length=10)),
+                ('para_vertice', models.CharField(help_text='Ex.: V02', max_length=10)),
+                ('longitude', models.CharField(help_text='Ex.: 48°29\'05.593" O', max_length=20)),
+                ('latitude', models.CharField(help_text='Ex.: 27°27\'16.418" S', max_length=20)),
+                ('distancia', models.FloatField(help_text='Distância em metros')),
+                ('utm_n', models.FloatField(blank=True, null=True)),
+                ('utm_e', models.FloatField(blank=True, null=True)),
+                ('confrontante_texto', models.CharField(blank=True, help_text='Nome do confrontante se não for um registro, ex.: Rua do Lamim, APP', max_length=200)),
+                ('confrontante', models.ForeignKey(blank=True, help_text='Confrontante associado ou vazio', null=True, on_delete=django.db.models.deletion.SET_NULL, to='levantamento.confrontante')),
+                ('projeto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vertices', to='levantamento.projeto')),
+            ],
+            options={
+                'verbose_name': 'Vértice',
+                'verbose_name_plural': 'Vértices',
+            },
+        ),
+    ]
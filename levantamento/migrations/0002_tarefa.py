@@ -0,0 +1,39 @@
+# Generated by Django 6.0.1 on 2026-10-17 04:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('levantamento', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tarefa',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('importar_dados_completos', 'Importar dados completos'), ('importar_vertices', 'Importar vértices'), ('gerar_memorial_pdf', 'Gerar memorial (PDF)')], max_length=30)),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('executando', 'Executando'), ('concluida', 'Concluída'), ('erro', 'Erro')], default='pendente', max_length=15)),
+                ('arquivo', models.FileField(blank=True, help_text='Arquivo TXT enviado para importação', upload_to='tarefas/entrada/')),
+                ('resultado', models.FileField(blank=True, help_text='Documento gerado', upload_to='tarefas/resultado/')),
+                ('linhas_processadas', models.PositiveIntegerField(default=0)),
+                ('erros', models.PositiveIntegerField(default=0)),
+                ('mensagem', models.TextField(blank=True)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('iniciado_em', models.DateTimeField(blank=True, null=True)),
+                ('concluido_em', models.DateTimeField(blank=True, null=True)),
+                ('projeto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tarefas', to='levantamento.projeto')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Tarefa',
+                'verbose_name_plural': 'Tarefas',
+                'indexes': [models.Index(fields=['status', 'criado_em'], name='levantament_status_d2a4eb_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 6.0.1 on 2026-10-17 04:28
+
+import re
+
+from django.db import migrations, models
+
+
+def preencher_documento(apps, schema_editor):
+    """Preenche a coluna documento (só dígitos) dos registros existentes."""
+    for nome_modelo in ('Beneficiario', 'Confrontante'):
+        modelo = apps.get_model('levantamento', nome_modelo)
+        alterados = []
+        for pessoa in modelo.objects.only('id', 'cpf_cnpj').iterator(chunk_size=2000):
+            pessoa.documento = re.sub(r'\D', '', pessoa.cpf_cnpj or '')
+            alterados.append(pessoa)
+            if len(alterados) >= 2000:
+                modelo.objects.bulk_update(alterados, ['documento'])
+                alterados = []
+        if alterados:
+            modelo.objects.bulk_update(alterados, ['documento'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('levantamento', '0002_tarefa'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='beneficiario',
+            name='documento',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=18),
+        ),
+        migrations.AddField(
+            model_name='confrontante',
+            name='documento',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=18),
+        ),
+        migrations.RunPython(preencher_documento, migrations.RunPython.noop),
+    ]
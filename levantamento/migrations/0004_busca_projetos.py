@@ -0,0 +1,61 @@
+# Generated by Django 6.0.1 on 2026-10-17 04:41
+
+import re
+import unicodedata
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+def normalizar(texto):
+    decomposto = unicodedata.normalize('NFKD', texto or '')
+    sem_acento = ''.join(c for c in decomposto if not unicodedata.combining(c))
+    return re.sub(r'\s+', ' ', re.sub(r'[.\-/]', '', sem_acento.lower())).strip()
+
+
+def preencher_busca(apps, schema_editor):
+    """Preenche a coluna busca dos projetos existentes (mesma regra de busca.py)."""
+    Projeto = apps.get_model('levantamento', 'Projeto')
+    Beneficiario = apps.get_model('levantamento', 'Beneficiario')
+
+    beneficiarios = {}
+    for projeto_id, nome, documento in Beneficiario.objects.order_by('id').values_list('projeto_id', 'nome', 'documento'):
+        beneficiarios.setdefault(projeto_id, []).extend([nome, documento])
+
+    alterados = []
+    for projeto in Projeto.objects.only('id', 'nome', 'inscricao_imobiliaria'):
+        partes = [projeto.nome, projeto.inscricao_imobiliaria or ''] + beneficiarios.get(projeto.id, [])
+        projeto.busca = normalizar(' '.join(partes))
+        alterados.append(projeto)
+    Projeto.objects.bulk_update(alterados, ['busca'], batch_size=2000)
+
+
+def criar_indice_trigram(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS levantamento_projeto_busca_trgm '
+            'ON levantamento_projeto USING gin (busca gin_trgm_ops)'
+        )
+
+
+def remover_indice_trigram(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS levantamento_projeto_busca_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('levantamento', '0003_documento_normalizado'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='projeto',
+            name='busca',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(preencher_busca, migrations.RunPython.noop),
+        migrations.RunPython(criar_indice_trigram, remover_indice_trigram),
+    ]
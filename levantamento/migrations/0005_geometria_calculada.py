@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('levantamento', '0004_busca_projetos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projeto',
+            name='area_calculada',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='projeto',
+            name='perimetro_calculado',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+    ]
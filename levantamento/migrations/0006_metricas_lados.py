@@ -0,0 +1,28 @@
+# Generated by Django 6.0.1 on 2026-10-17 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('levantamento', '0005_geometria_calculada'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vertice',
+            name='azimute',
+            field=models.FloatField(blank=True, editable=False, help_text='Graus decimais, 0-360', null=True),
+        ),
+        migrations.AddField(
+            model_name='vertice',
+            name='distancia_elipsoidal',
+            field=models.FloatField(blank=True, editable=False, help_text='No elipsoide GRS80, em metros', null=True),
+        ),
+        migrations.AddField(
+            model_name='vertice',
+            name='distancia_plana',
+            field=models.FloatField(blank=True, editable=False, help_text='No plano UTM, em metros', null=True),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 6.0.1 on 2026-10-17 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('levantamento', '0006_metricas_lados'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vertice',
+            name='sequencia',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='vertice',
+            index=models.Index(fields=['projeto', 'sequencia'], name='levantament_projeto_0bc6c4_idx'),
+        ),
+    ]
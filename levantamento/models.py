@@ -1,6 +1,35 @@
+from django.conf import settings
 from django.db import models
 from django.core.validators import RegexValidator
 
+
+TOLERANCIA_GEOMETRIA = 0.01
+
+
+def somente_digitos(valor):
+    """Remove a máscara do CPF/CNPJ (pontos, traço, barra, espaços)."""
+    return "".join(c for c in (valor or "") if c.isdigit())
+
+
+class DocumentoNormalizadoMixin(models.Model):
+    """
+    Mantém a coluna documento (só dígitos, indexada) em sincronia com o
+    cpf_cnpj mascarado, para buscas exatas/por prefixo usarem o índice.
+    """
+    # 18: os importadores gravam sem passar pelos validators, e cpf_cnpj aceita
+    # até 18 caracteres, todos dígitos num documento malformado
+    documento = models.CharField(max_length=18, blank=True, editable=False, db_index=True)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        self.documento = somente_digitos(self.cpf_cnpj)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'cpf_cnpj' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'documento'}
+        super().save(*args, **kwargs)
+
 class Projeto(models.Model):
     nome = models.CharField(max_length=200)
     inscricao_imobiliaria = models.CharField(
@@ -15,15 +44,31 @@ class Projeto(models.Model):
     perimetro = models.FloatField(help_text="Perímetro em metros")
     epoca_medicao = models.CharField(max_length=50, help_text="Março de 2025")
     instrumento = models.CharField(max_length=100, help_text="GNSS ComNav T30")
+    # Nome, inscrição e beneficiários normalizados (ver busca.py); no PostgreSQL
+    # tem índice GIN gin_trgm_ops, criado na migração 0004
+    busca = models.TextField(blank=True, editable=False)
+    # Calculados pela UTM dos vértices (levantamento/geometria.py); vazios
+    # enquanto algum vértice não tiver UTM
+    area_calculada = models.FloatField(null=True, blank=True, editable=False)
+    perimetro_calculado = models.FloatField(null=True, blank=True, editable=False)
 
     def __str__(self):
         return self.nome
 
+    # Diferença acima de um centésimo (a precisão impressa no memorial)
+    @property
+    def area_divergente(self):
+        return self.area_calculada is not None and abs(self.area - self.area_calculada) > TOLERANCIA_GEOMETRIA
+
+    @property
+    def perimetro_divergente(self):
+        return self.perimetro_calculado is not None and abs(self.perimetro - self.perimetro_calculado) > TOLERANCIA_GEOMETRIA
+
     class Meta:
         verbose_name = "Projeto"
         verbose_name_plural = "Projetos"
 
-class Beneficiario(models.Model):
+class Beneficiario(DocumentoNormalizadoMixin):
     projeto = models.ForeignKey(Projeto, on_delete=models.CASCADE, related_name='beneficiarios')
     nome = models.CharField(max_length=200)
     cpf_cnpj = models.CharField(
@@ -47,7 +92,7 @@ class Beneficiario(models.Model):
         verbose_name = "Beneficiário"
         verbose_name_plural = "Beneficiários"
 
-class Confrontante(models.Model):
+class Confrontante(DocumentoNormalizadoMixin):
     DIRECAO_CHOICES = [
         ('Direita', 'Direita'),
         ('Esquerda', 'Esquerda'),
@@ -92,10 +137,74 @@ class Vertice(models.Model):
     utm_e = models.FloatField(null=True, blank=True)
     confrontante = models.ForeignKey(Confrontante, on_delete=models.SET_NULL, null=True, blank=True, help_text="Confrontante associado ou vazio")
     confrontante_texto = models.CharField(max_length=200, blank=True, help_text="Nome do confrontante se não for um registro, ex.: Rua do Lamim, APP")
+    # Posição no anel, gravada pelo recálculo da geometria seguindo de_vertice -> para_vertice
+    sequencia = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    # Lado deste vértice até o seguinte, calculado pela UTM (levantamento/geometria.py)
+    azimute = models.FloatField(null=True, blank=True, editable=False, help_text="Graus decimais, 0-360")
+    distancia_plana = models.FloatField(null=True, blank=True, editable=False, help_text="No plano UTM, em metros")
+    distancia_elipsoidal = models.FloatField(null=True, blank=True, editable=False, help_text="No elipsoide GRS80, em metros")
 
     def __str__(self):
         return f"{self.de_vertice} -> {self.para_vertice} ({self.projeto.nome})"
 
+    @property
+    def distancia_lado(self):
+        """Distância do memorial: a plana calculada ou, sem UTM, a importada."""
+        return self.distancia if self.distancia_plana is None else self.distancia_plana
+
     class Meta:
         verbose_name = "Vértice"
-        verbose_name_plural = "Vértices"
\ No newline at end of file
+        verbose_name_plural = "Vértices"
+        indexes = [models.Index(fields=['projeto', 'sequencia'])]
+
+
+# Ordem do anel para os order_by; vértices ainda sem sequência vão no fim, na ordem de criação
+ORDEM_ANEL = (models.F('sequencia').asc(nulls_last=True), 'id')
+
+class Tarefa(models.Model):
+    """Importações e memoriais executados fora da requisição pelo comando processar_tarefas."""
+
+    IMPORTAR_DADOS_COMPLETOS = 'importar_dados_completos'
+    IMPORTAR_VERTICES = 'importar_vertices'
+    GERAR_MEMORIAL_PDF = 'gerar_memorial_pdf'
+    TIPO_CHOICES = [
+        (IMPORTAR_DADOS_COMPLETOS, 'Importar dados completos'),
+        (IMPORTAR_VERTICES, 'Importar vértices'),
+        (GERAR_MEMORIAL_PDF, 'Gerar memorial (PDF)'),
+    ]
+
+    PENDENTE = 'pendente'
+    EXECUTANDO = 'executando'
+    CONCLUIDA = 'concluida'
+    ERRO = 'erro'
+    STATUS_CHOICES = [
+        (PENDENTE, 'Pendente'),
+        (EXECUTANDO, 'Executando'),
+        (CONCLUIDA, 'Concluída'),
+        (ERRO, 'Erro'),
+    ]
+
+    tipo = models.CharField(max_length=30, choices=TIPO_CHOICES)
+    status = models.CharField(max_length=15, choices=STATUS_CHOICES, default=PENDENTE)
+    projeto = models.ForeignKey(Projeto, on_delete=models.CASCADE, related_name='tarefas')
+    usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    arquivo = models.FileField(upload_to='tarefas/entrada/', blank=True, help_text="Arquivo TXT enviado para importação")
+    resultado = models.FileField(upload_to='tarefas/resultado/', blank=True, help_text="Documento gerado")
+    linhas_processadas = models.PositiveIntegerField(default=0)
+    erros = models.PositiveIntegerField(default=0)
+    mensagem = models.TextField(blank=True)
+    criado_em = models.DateTimeField(auto_now_add=True)
+    iniciado_em = models.DateTimeField(null=True, blank=True)
+    concluido_em = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} - {self.projeto.nome} ({self.get_status_display()})"
+
+    @property
+    def finalizada(self):
+        return self.status in (self.CONCLUIDA, self.ERRO)
+
+    class Meta:
+        verbose_name = "Tarefa"
+        verbose_name_plural = "Tarefas"
+        indexes = [models.Index(fields=['status', 'criado_em'])]
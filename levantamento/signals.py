@@ -0,0 +1,81 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .busca import atualizar_busca, indice_projetos
+from .geometria import agendar_recalculo, em_lote, vertices_alterados_em_lote
+from .memorial import cache_memoriais
+from .models import Beneficiario, Confrontante, Projeto, Vertice
+
+
+# ======COLUNA DE BUSCA E INDICE DE PREFIXOS DOS PROJETOS======
+
+@receiver(post_save, sender=Projeto)
+def projeto_salvo(sender, instance, raw=False, **kwargs):
+    indice_projetos.invalidar()
+    if not raw:
+        atualizar_busca(instance.id)
+
+
+@receiver(post_delete, sender=Projeto)
+def projeto_excluido(sender, instance, **kwargs):
+    indice_projetos.invalidar()
+
+
+@receiver(post_save, sender=Beneficiario)
+@receiver(post_delete, sender=Beneficiario)
+def beneficiario_alterado(sender, instance, raw=False, **kwargs):
+    if not raw:
+        atualizar_busca(instance.projeto_id)
+
+
+# ======CACHE DE MEMORIAIS======
+# O hash do conteúdo já evita servir PDF desatualizado; os signals só liberam
+# o espaço dos arquivos que não serão mais usados.
+
+@receiver(post_save, sender=Projeto)
+@receiver(post_delete, sender=Projeto)
+def memorial_do_projeto_alterado(sender, instance, **kwargs):
+    cache_memoriais.invalidar(instance.id)
+
+
+@receiver(post_save, sender=Beneficiario)
+@receiver(post_delete, sender=Beneficiario)
+@receiver(post_save, sender=Confrontante)
+@receiver(post_delete, sender=Confrontante)
+def memorial_dos_dados_alterado(sender, instance, **kwargs):
+    cache_memoriais.invalidar(instance.projeto_id)
+
+
+@receiver(post_save, sender=Vertice)
+@receiver(post_delete, sender=Vertice)
+def memorial_dos_vertices_alterado(sender, instance, **kwargs):
+    # Nas importações (geometria_em_lote) cada vértice varreria o diretório
+    # do cache; a invalidação fica para a saída do bloco
+    if not em_lote():
+        cache_memoriais.invalidar(instance.projeto_id)
+
+
+@receiver(vertices_alterados_em_lote)
+def memorial_dos_vertices_importados(sender, projeto_ids, **kwargs):
+    for projeto_id in projeto_ids:
+        cache_memoriais.invalidar(projeto_id)
+
+
+# ======AREA E PERIMETRO CALCULADOS======
+# Um recálculo por projeto e transação (ver geometria.py); as importações em
+# lote usam geometria_em_lote() ou agendam o recálculo depois do bulk_update.
+
+@receiver(post_save, sender=Vertice)
+def geometria_alterada(sender, instance, raw=False, **kwargs):
+    if not raw:
+        agendar_recalculo(instance.projeto_id, instance.id)
+
+
+@receiver(post_delete, sender=Vertice)
+def geometria_excluida(sender, instance, **kwargs):
+    # O lado que chegava no vértice excluído é o do anterior na sequência;
+    # sem sequência gravada ainda, recalcula todos
+    if instance.sequencia is None:
+        agendar_recalculo(instance.projeto_id)
+    else:
+        agendar_recalculo(instance.projeto_id, sequencia_removida=instance.sequencia)
@@ -0,0 +1,236 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db.models import F
+from django.urls import reverse
+from django.utils import timezone
+
+from .coordenadas import conferir_coordenadas
+from .geometria import anel_do_projeto, cruzamentos_do_projeto, mensagem_cruzamentos
+from .importacao import importar_lat_long_utm_helper, importar_vertices_txt, ler_linhas
+from .memorial import cache_memoriais
+from .models import Tarefa
+
+logger = logging.getLogger(__name__)
+
+
+# ======FILA DE TAREFAS (SEM BROKER EXTERNO)======
+
+CHAVE_SESSAO = 'tarefas_acompanhadas'
+TEMPO_MAXIMO_PADRAO = 60  # minutos
+RESULTADO_HORAS_PADRAO = 24
+
+
+def enfileirar(tipo, projeto, usuario=None, arquivo=None):
+    """Registra a tarefa como pendente; o comando processar_tarefas a executa."""
+    tarefa = Tarefa(tipo=tipo, projeto=projeto)
+    if usuario is not None and usuario.is_authenticated:
+        tarefa.usuario = usuario
+    if arquivo is not None:
+        tarefa.arquivo.save(arquivo.name, arquivo, save=False)
+    tarefa.save()
+    return tarefa
+
+
+def acompanhar(request, tarefa):
+    """Guarda a tarefa na sessão para a página principal mostrar o progresso."""
+    ids = request.session.get(CHAVE_SESSAO, [])
+    ids.append(tarefa.id)
+    request.session[CHAVE_SESSAO] = ids
+
+
+def tarefas_acompanhadas(request):
+    """
+    Tarefas da sessão; as que já terminaram são exibidas uma última vez
+    e deixam de ser acompanhadas.
+    """
+    ids = request.session.get(CHAVE_SESSAO, [])
+    if not ids:
+        return []
+
+    interromper_travadas(ids)
+
+    tarefas = list(Tarefa.objects.filter(id__in=ids).select_related('projeto').order_by('id'))
+    request.session[CHAVE_SESSAO] = [t.id for t in tarefas if not t.finalizada]
+    return tarefas
+
+
+def interromper_travadas(ids=None):
+    """
+    Dá como erro as tarefas em execução há mais que
+    TAREFA_TEMPO_MAXIMO_MINUTOS: o worker que as reservou morreu ou foi
+    encerrado no meio. Não voltam para a fila porque uma importação
+    interrompida já gravou parte dos vértices e repeti-la os duplicaria.
+    """
+    minutos = getattr(settings, 'TAREFA_TEMPO_MAXIMO_MINUTOS', TEMPO_MAXIMO_PADRAO)
+    agora = timezone.now()
+    travadas = Tarefa.objects.filter(status=Tarefa.EXECUTANDO, iniciado_em__lt=agora - timedelta(minutes=minutos))
+    if ids is not None:
+        travadas = travadas.filter(id__in=ids)
+    return travadas.update(
+        status=Tarefa.ERRO,
+        mensagem=f"Erro: tarefa interrompida (sem conclusão em {minutos} minutos). Envie novamente.",
+        concluido_em=agora,
+    )
+
+
+def limpar_resultados():
+    """
+    Apaga os documentos gerados há mais que TAREFA_RESULTADO_HORAS; a
+    tarefa continua registrada, só sem download.
+    """
+    horas = getattr(settings, 'TAREFA_RESULTADO_HORAS', RESULTADO_HORAS_PADRAO)
+    expiradas = Tarefa.objects.filter(
+        status=Tarefa.CONCLUIDA, concluido_em__lt=timezone.now() - timedelta(hours=horas),
+    ).exclude(resultado='')
+    apagadas = 0
+    for tarefa in expiradas:
+        tarefa.resultado.delete(save=False)
+        Tarefa.objects.filter(id=tarefa.id).update(resultado='')
+        apagadas += 1
+    return apagadas
+
+
+def reservar_proxima():
+    """
+    Marca a próxima tarefa pendente como em execução. O UPDATE condicional
+    garante que dois workers nunca peguem a mesma tarefa, em qualquer banco.
+    """
+    pendentes = Tarefa.objects.filter(status=Tarefa.PENDENTE).order_by('criado_em', 'id')
+    for tarefa_id in pendentes.values_list('id', flat=True)[:20]:
+        reservada = Tarefa.objects.filter(id=tarefa_id, status=Tarefa.PENDENTE).update(
+            status=Tarefa.EXECUTANDO,
+            iniciado_em=timezone.now(),
+        )
+        if reservada:
+            return Tarefa.objects.select_related('projeto').get(id=tarefa_id)
+    return None
+
+
+def _atualizar_progresso(tarefa):
+    def progresso(linhas_processadas, erros):
+        Tarefa.objects.filter(id=tarefa.id).update(
+            linhas_processadas=linhas_processadas,
+            erros=erros,
+        )
+    return progresso
+
+
+def _importar_dados_completos(tarefa):
+    with tarefa.arquivo.open('rb') as arquivo:
+        atualizados, ignorados, erros = importar_lat_long_utm_helper(
+            projeto=tarefa.projeto,
+            linhas=ler_linhas(arquivo),
+            criar_se_nao_existir=True,
+            atualizar_existente=True,
+            progresso=_atualizar_progresso(tarefa),
+        )
+    tarefa.linhas_processadas = atualizados + ignorados + erros
+    tarefa.erros = erros
+    tarefa.mensagem = (
+        f"Importação concluída! "
+        f"Atualizados: {atualizados}, "
+        f"Ignorados: {ignorados}, "
+        f"Erros: {erros}"
+    )
+    tarefa.mensagem += "\n" + conferir_coordenadas(tarefa.projeto).mensagem
+    tarefa.mensagem += _conferencia_perimetro(tarefa.projeto)
+
+
+def _importar_vertices(tarefa):
+    with tarefa.arquivo.open('rb') as arquivo:
+        importados, falhas = importar_vertices_txt(
+            tarefa.projeto,
+            arquivo,
+            progresso=_atualizar_progresso(tarefa),
+        )
+    tarefa.linhas_processadas = importados + len(falhas)
+    tarefa.erros = len(falhas)
+    conferencia = conferir_coordenadas(tarefa.projeto)
+    tarefa.mensagem = "\n".join([f"Vértices importados: {importados}", conferencia.mensagem] + falhas[:50])
+    tarefa.mensagem += _conferencia_perimetro(tarefa.projeto)
+
+
+def _conferencia_perimetro(projeto):
+    """Quebras e repetições da sequência de vértices e lados que se cruzam; vazio se está tudo certo."""
+    anel = anel_do_projeto(projeto.id)
+    if not anel.valido:
+        return "\n" + anel.mensagem
+    pares = cruzamentos_do_projeto(projeto.id)
+    return "\n" + mensagem_cruzamentos(pares) if pares else ""
+
+
+def _gerar_memorial_pdf(tarefa):
+    arquivo, _, _ = cache_memoriais.abrir(tarefa.projeto)
+    with arquivo:
+        tarefa.resultado.save(f"{tarefa.projeto.nome} - Memorial.pdf", File(arquivo), save=False)
+    tarefa.linhas_processadas = tarefa.projeto.vertices.count()
+    tarefa.mensagem = "Memorial gerado com sucesso!"
+
+
+EXECUTORES = {
+    Tarefa.IMPORTAR_DADOS_COMPLETOS: _importar_dados_completos,
+    Tarefa.IMPORTAR_VERTICES: _importar_vertices,
+    Tarefa.GERAR_MEMORIAL_PDF: _gerar_memorial_pdf,
+}
+
+
+def executar(tarefa):
+    """Executa uma tarefa já reservada e registra o resultado ou o erro."""
+    try:
+        EXECUTORES[tarefa.tipo](tarefa)
+        tarefa.status = Tarefa.CONCLUIDA
+        campos = ['status', 'linhas_processadas', 'erros', 'mensagem', 'resultado']
+    except Exception as e:
+        logger.exception("Erro na tarefa %s", tarefa.id)
+        tarefa.status = Tarefa.ERRO
+        tarefa.erros = F('erros') + 1
+        tarefa.mensagem = f"Erro: {str(e)}"
+        # linhas_processadas fica como o último progresso gravado
+        campos = ['status', 'erros', 'mensagem']
+
+    # O TXT enviado só serve para a importação
+    if tarefa.arquivo:
+        tarefa.arquivo.delete(save=False)
+        tarefa.arquivo = ''
+
+    tarefa.concluido_em = timezone.now()
+    tarefa.save(update_fields=campos + ['arquivo', 'concluido_em'])
+    tarefa.refresh_from_db()
+    return tarefa
+
+
+def processar_pendentes(limite=None):
+    """Executa as tarefas pendentes em sequência; retorna quantas rodaram."""
+    interromper_travadas()
+    limpar_resultados()
+    executadas = 0
+    while limite is None or executadas < limite:
+        tarefa = reservar_proxima()
+        if tarefa is None:
+            break
+        executar(tarefa)
+        executadas += 1
+    return executadas
+
+
+def status_tarefa(tarefa):
+    """Dados expostos no endpoint JSON de acompanhamento."""
+    dados = {
+        "id": tarefa.id,
+        "tipo": tarefa.tipo,
+        "tipo_display": tarefa.get_tipo_display(),
+        "projeto": tarefa.projeto.nome,
+        "status": tarefa.status,
+        "status_display": tarefa.get_status_display(),
+        "finalizada": tarefa.finalizada,
+        "linhas_processadas": tarefa.linhas_processadas,
+        "erros": tarefa.erros,
+        "mensagem": tarefa.mensagem,
+        "download": None,
+    }
+    if tarefa.status == Tarefa.CONCLUIDA and tarefa.resultado:
+        dados["download"] = reverse("baixar_resultado_tarefa", args=[tarefa.id])
+    return dados
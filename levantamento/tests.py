@@ -1,3 +1,1057 @@
-from django.test import TestCase
+import io
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .busca import IndicePrefixos, indice_projetos
+from .coordenadas import conferir_coordenadas, transformador, utm_para_geografico
+from .anel import montar_anel
+from .geometria import (
+    area_perimetro, cruzamentos, cruzamentos_do_projeto, geometria_em_lote, lados_afetados, recalcular_geometria,
+)
+from .calculos import decimal_para_gms_lote, gms_para_decimal_lote, parse_numeros_br
+from .memorial.cache import CacheMemoriais, cache_memoriais, chave_memorial
+from .memorial import gerar_memorial_docx, gerar_memorial_pdf
+from .memorial.conteudo import CABECALHO_VERTICES, cache_conteudos, conteudo_memorial, montar_conteudo, revisao
+from .memorial.dados import carregar_dados_memorial, carregar_dados_memoriais
+from .memorial.descricao import descricao_perimetrica
+from .memorial.notificacao import carregar_cartas
+from .memorial.pdf import TABELAS, TabelaPaginada
+from .memorial.word import CONTENT_TYPE_DOCX
+from .importacao import importar_lat_long_utm_helper, importar_vertices_txt, ler_linhas, ler_registros
+from .models import Beneficiario, Confrontante, Projeto, Tarefa, Vertice
+from .tarefas import processar_pendentes
+
+
+def criar_projeto(nome="Projeto Teste"):
+    return Projeto.objects.create(
+        nome=nome,
+        endereco="Rua Principal, s/n",
+        area=100.0,
+        perimetro=40.0,
+        epoca_medicao="Março de 2025",
+        instrumento="GNSS ComNav T30",
+    )
+
+
+def linha_completa(de, para, n, e):
+    return "\t".join([
+        de, para, "0°00'00\"", "10,00", n, e,
+        "27°27'16.418\" S", "48°29'05.593\" O",
+    ])
+
+
+class ImportarLatLongUtmHelperTests(TestCase):
+    def setUp(self):
+        self.projeto = criar_projeto()
+
+    def test_cria_e_atualiza_com_numero_fixo_de_consultas(self):
+        Vertice.objects.create(
+            projeto=self.projeto, de_vertice="V01", para_vertice="V02",
+            latitude="", longitude="", distancia=1.0,
+        )
+        linhas = ["V1\tV2\tAZ\tDD\tCX\tCY\tGX\tGY"]
+        linhas += [
+            linha_completa(f"V{i:02d}", f"V{i + 1:02d}", "6956911,591", "755924,028")
+            for i in range(1, 50)
+        ]
+        linhas.append("V999\tV01")  # colunas insuficientes
+
+        # SELECT dos existentes + SAVEPOINT + INSERT + UPDATE + RELEASE
+        with self.assertNumQueries(5):
+            resultado = importar_lat_long_utm_helper(self.projeto, linhas)
+
+        self.assertEqual(resultado, (49, 0, 1))
+        self.assertEqual(Vertice.objects.filter(projeto=self.projeto).count(), 49)
+        v01 = Vertice.objects.get(projeto=self.projeto, de_vertice="V01")
+        self.assertEqual(v01.distancia, 10.0)
+        self.assertAlmostEqual(v01.utm_n, 6956911.591)
+
+    def test_respeita_flags_de_criacao_e_atualizacao(self):
+        Vertice.objects.create(
+            projeto=self.projeto, de_vertice="V01", para_vertice="V02",
+            latitude="", longitude="", distancia=1.0,
+        )
+        linhas = [
+            "cabecalho",
+            linha_completa("V01", "V02", "1,0", "2,0"),
+            linha_completa("V02", "V01", "1,0", "2,0"),
+        ]
+
+        resultado = importar_lat_long_utm_helper(
+            self.projeto, linhas,
+            criar_se_nao_existir=False, atualizar_existente=False,
+        )
+
+        self.assertEqual(resultado, (0, 2, 0))
+        self.assertEqual(Vertice.objects.get(de_vertice="V01").distancia, 1.0)
+
+
+class ImportarVerticesLispTests(TestCase):
+    def test_colunas_convertidas_em_lote_e_linhas_ruins_avisadas(self):
+        projeto = criar_projeto()
+        self.client.force_login(User.objects.create_user("topografo", password="senha"))
+        conteudo = "\n".join([
+            "V1\tV2\tAZ\tDD\tCX\tCY\tGX\tGY",
+            "V01\tV02\t90\t10,5\t755924,028\t6.956.911,591\t-27\t-48",
+            "V02\tV01\t270\t10.5\t755934.528\t6956911.591",
+            "V03\tV01\t0\tdez\t755934,5\t6956911,5",
+            "V04\tV01",
+        ]).encode("utf-8")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            resposta = self.client.post(reverse("importar_vertices_lisp"), {
+                "projeto_id": projeto.id, "arquivo_lisp": SimpleUploadedFile("lisp.txt", conteudo),
+            }, follow=True)
+
+        mensagens = [str(m) for m in resposta.context["messages"]]
+        self.assertIn("Importação concluída: 2 vértices adicionados.", mensagens)
+        self.assertTrue(any("Linha 4" in m and "Linha 5" in m for m in mensagens))
+        v01 = Vertice.objects.get(de_vertice="V01")
+        self.assertEqual((v01.distancia, v01.utm_e, v01.utm_n), (10.5, 755924.028, 6956911.591))
+        self.assertEqual(v01.confrontante_texto, "A preencher")
+        self.assertIsNone(v01.confrontante)
+        self.assertEqual(Vertice.objects.get(de_vertice="V02").latitude, "")
+
+
+class ParseNumerosBrTests(TestCase):
+    def test_coluna_mista_em_uma_passada(self):
+        valores, validos = parse_numeros_br(
+            ["6.936.302,27", "755924.694", "80,29", "1.000.000", "-5,2", "", "abc", None],
+            casas=3,
+        )
+
+        self.assertEqual(validos.tolist(), [True, True, True, True, True, False, False, False])
+        self.assertEqual(valores[:5].tolist(), [6936302.27, 755924.694, 80.29, 1000000.0, -5.2])
+
+    def test_separadores_malformados_sao_invalidos(self):
+        valores, validos = parse_numeros_br(["6045,.", "92.51,8.5", "12.", "1,2,3", "6045,5", "1.234,5"])
+
+        self.assertEqual(validos.tolist(), [False, False, False, False, True, True])
+        self.assertEqual(valores[4:].tolist(), [6045.5, 1234.5])
+
+    def test_digitos_unicode_sao_invalidos(self):
+        valores, validos = parse_numeros_br(["10,5", "10²", "٣,5"], casas=3)
+
+        self.assertEqual(validos.tolist(), [True, False, False])
+        self.assertEqual(valores[0], 10.5)
+
+    def test_distancia_com_pontos_de_milhar(self):
+        valores, validos = parse_numeros_br(["1.234", "10,5"], ponto_decimal=False)
+
+        self.assertTrue(validos.all())
+        self.assertEqual(valores.tolist(), [1234.0, 10.5])
+
+
+class GmsLoteTests(TestCase):
+    def test_converte_lote_e_reporta_invalidos_por_indice(self):
+        decimais, invalidos = gms_para_decimal_lote(
+            ["48°29'05.593\" O", "27º27'16,418\"S", "lixo", "12.5", None]
+        )
+
+        self.assertEqual(invalidos, [2, 4])
+        self.assertAlmostEqual(decimais[0], -48.48488694444445)
+        self.assertAlmostEqual(decimais[1], -27.454560555555556)
+        self.assertEqual(decimais[3], 12.5)
+
+    def test_minutos_ou_segundos_acima_de_59_sao_invalidos(self):
+        decimais, invalidos = gms_para_decimal_lote(["27°75'99\" S", "27°27'60\" S", "27°60' S", "27°59'59.99\" S"])
+
+        self.assertEqual(invalidos, [0, 1, 2])
+        self.assertTrue(np.isnan(decimais[:3]).all())
+        self.assertAlmostEqual(decimais[3], -27.999997222222222)
+
+    def test_formata_sem_segundos_iguais_a_60(self):
+        self.assertEqual(
+            decimal_para_gms_lote([345.066665795119, 45.0, float("nan")]),
+            ["345°04'00.00\"", "45°00'00.00\"", ""],
+        )
+
+    def test_360_graus_arredondados_viram_zero(self):
+        self.assertEqual(
+            decimal_para_gms_lote([359.99999999, 359.999, 360.0]),
+            ["0°00'00.00\"", "359°59'56.40\"", "0°00'00.00\""],
+        )
+
+
+class LeituraStreamingTests(TestCase):
+    def arquivo(self, conteudo):
+        arquivo = SimpleUploadedFile("dados.txt", conteudo)
+        arquivo.DEFAULT_CHUNK_SIZE = 3  # força quebras no meio de "\r\n" e de multibytes
+        return arquivo
+
+    @mock.patch("levantamento.importacao.TAMANHO_AMOSTRA", 4)
+    def test_equivale_a_splitlines_em_utf8_com_bom(self):
+        texto = "V1\tV2\r\nção\tJosé\r\n\r\núltima"
+        conteudo = "\ufeff".encode("utf-8") + texto.encode("utf-8")
+
+        self.assertEqual(list(ler_linhas(self.arquivo(conteudo))), texto.splitlines())
+
+    def test_latin1_decodificado_uma_vez(self):
+        texto = "São José\tCentro\n"
+
+        self.assertEqual(list(ler_linhas(self.arquivo(texto.encode("latin-1")))), ["São José\tCentro"])
+
+    def test_registros_pulam_cabecalho_e_linhas_vazias(self):
+        registros = list(ler_registros(self.arquivo(b"cab\nV01\tV02\n\n V03\tV04 \n"), pular_cabecalho=True))
+
+        self.assertEqual(registros, [
+            (2, "V01\tV02", ["V01", "V02"]),
+            (4, " V03\tV04 ", ["V03", "V04"]),
+        ])
+
+
+class DocumentoNormalizadoTests(TestCase):
+    def setUp(self):
+        self.projeto = criar_projeto()
+        self.confrontante = Confrontante.objects.create(
+            projeto=self.projeto, nome="Maria", cpf_cnpj="12.345.678/0001-90",
+            direcao="Frente", rua="Rua A", numero="1", bairro="Centro", cidade="Palhoça",
+        )
+
+    def test_documento_sincronizado_ao_salvar(self):
+        self.assertEqual(self.confrontante.documento, "12345678000190")
+
+        self.confrontante.cpf_cnpj = "123.456.789-09"
+        self.confrontante.save(update_fields=["cpf_cnpj"])
+
+        self.confrontante.refresh_from_db()
+        self.assertEqual(self.confrontante.documento, "12345678909")
+
+    def test_documento_malformado_cabe_na_coluna(self):
+        # Gravado sem os validators, como fazem os importadores
+        beneficiario = Beneficiario.objects.create(
+            projeto=self.projeto, nome="Longo", cpf_cnpj="123456789012345678",
+            rua="Rua B", numero="2", bairro="Centro", cidade="Palhoça",
+        )
+
+        beneficiario.refresh_from_db()
+        self.assertEqual(beneficiario.documento, "123456789012345678")
+        self.assertLessEqual(len(beneficiario.documento), Beneficiario._meta.get_field("documento").max_length)
+
+    def test_busca_por_documento_exato_e_prefixo(self):
+        Beneficiario.objects.create(
+            projeto=self.projeto, nome="João", cpf_cnpj="123.456.789-09",
+            rua="Rua B", numero="2", bairro="Centro", cidade="Palhoça",
+        )
+        url = reverse("buscar_pessoa")
+
+        with self.assertNumQueries(1):
+            exato = self.client.get(url, {"doc": "123.456.789-09"}).json()
+        prefixo = self.client.get(url, {"doc": "12.345.678/0001"}).json()
+
+        self.assertEqual((exato["tipo"], exato["nome"]), ("Beneficiario", "João"))
+        self.assertEqual((prefixo["tipo"], prefixo["nome"]), ("Confrontante", "Maria"))
+        self.assertFalse(self.client.get(url, {"doc": "99999999999"}).json()["encontrado"])
+
+    def test_importacao_de_vertices_associa_confrontante_pelo_documento(self):
+        conteudo = "V01\tV02\t48°29'05.593\" O\t27°27'16.418\" S\t10,5\tMaria\t\t\t12345678000190\n"
+
+        importados, falhas = importar_vertices_txt(self.projeto, SimpleUploadedFile("v.txt", conteudo.encode()))
+
+        self.assertEqual((importados, falhas), (1, []))
+        vertice = Vertice.objects.get()
+        self.assertEqual(vertice.confrontante, self.confrontante)
+        self.assertEqual(vertice.confrontante_texto, "")
+
+
+class ConferenciaCoordenadasTests(TestCase):
+    def setUp(self):
+        self.projeto = criar_projeto()
+
+    def criar_vertice(self, nome, latitude="", longitude="", utm_n=6956938.013, utm_e=755924.694):
+        return Vertice.objects.create(
+            projeto=self.projeto, de_vertice=nome, para_vertice="V01",
+            latitude=latitude, longitude=longitude, distancia=1.0, utm_n=utm_n, utm_e=utm_e,
+        )
+
+    def test_transformador_reaproveitado(self):
+        self.assertIs(transformador("EPSG:31982", "EPSG:4674"), transformador("EPSG:31982", "EPSG:4674"))
+
+        lat, lon = utm_para_geografico([755924.694] * 3000, [6956938.013] * 3000)
+        self.assertEqual(len(lat), 3000)
+        self.assertAlmostEqual(lat[0], -27.48712, places=4)
+        self.assertAlmostEqual(lon[0], -48.40976, places=4)
+
+    def test_preenche_e_aponta_divergentes(self):
+        self.criar_vertice("V01")
+        self.criar_vertice("V02", "27°29'13.652\" S", "48°24'35.144\" O")
+        self.criar_vertice("V03", "27°29'13.652\" S", "48°24'36.144\" O")  # 1" a oeste: ~27 m
+        self.criar_vertice("V04", "sem dado", "48°24'35.144\" O")
+        self.criar_vertice("V05", utm_n=None, utm_e=None)
+
+        with self.assertNumQueries(2):
+            conferencia = conferir_coordenadas(self.projeto)
+
+        self.assertEqual(conferencia.preenchidos, 1)
+        self.assertEqual([nome for nome, _ in conferencia.divergentes], ["V03"])
+        self.assertAlmostEqual(conferencia.divergentes[0][1], 27.4, delta=0.5)
+        self.assertEqual(conferencia.invalidos, ["V04"])
+        self.assertEqual(conferencia.sem_utm, 1)
+
+        v01 = Vertice.objects.get(de_vertice="V01")
+        self.assertEqual((v01.latitude, v01.longitude), ("27°29'13.652\" S", "48°24'35.144\" O"))
+
+
+class GeometriaCalculadaTests(TestCase):
+    QUADRADO = [(6956900.0, 755900.0), (6956910.0, 755900.0), (6956910.0, 755910.0), (6956900.0, 755910.0)]
+
+    def setUp(self):
+        self.projeto = criar_projeto()
+
+    def criar_vertices(self, coordenadas):
+        for i, (n, e) in enumerate(coordenadas):
+            Vertice.objects.create(
+                projeto=self.projeto, de_vertice=f"V{i + 1:02d}", para_vertice=f"V{(i + 1) % len(coordenadas) + 1:02d}",
+                latitude="", longitude="", distancia=10.0, utm_n=n, utm_e=e,
+            )
+
+    def test_laco_com_coordenadas_utm(self):
+        n, e = zip(*self.QUADRADO)
+        area, perimetro = area_perimetro(e, n)
+
+        self.assertAlmostEqual(area, 100.0, places=6)
+        self.assertAlmostEqual(perimetro, 40.0, places=6)
+        self.assertEqual(area_perimetro(e[:2], n[:2]), (0.0, 0.0))
+
+    def test_um_recalculo_por_transacao(self):
+        with mock.patch("levantamento.geometria.recalcular_geometria", wraps=recalcular_geometria) as recalcular:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.criar_vertices(self.QUADRADO[:3])
+                Vertice.objects.filter(de_vertice="V03").get().delete()
+                self.criar_vertices(self.QUADRADO[2:])
+
+        self.assertEqual(recalcular.call_count, 1)
+        self.projeto.refresh_from_db()
+        self.assertEqual((self.projeto.area_calculada, self.projeto.perimetro_calculado), (100.0, 40.0))
+        self.assertFalse(self.projeto.area_divergente)
+
+    def test_transacao_desfeita_nao_perde_o_recalculo_seguinte(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.criar_vertices(self.QUADRADO[:3])
+            raise RuntimeError
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.criar_vertices(self.QUADRADO)
+
+        self.projeto.refresh_from_db()
+        self.assertEqual(self.projeto.area_calculada, 100.0)
+
+    def test_divergencia_e_area_em_branco(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.criar_vertices(self.QUADRADO[:3])
+
+        self.projeto.refresh_from_db()
+        self.assertEqual(self.projeto.area_calculada, 50.0)
+        self.assertTrue(self.projeto.area_divergente)
+        self.assertTrue(self.projeto.perimetro_divergente)
+
+        sem_area = Projeto.objects.create(nome="Sem área", endereco="Rua", area=0, perimetro=0, epoca_medicao="2025", instrumento="GNSS")
+        self.projeto = sem_area
+        with self.captureOnCommitCallbacks(execute=True):
+            with geometria_em_lote():
+                self.criar_vertices(self.QUADRADO)
+
+        sem_area.refresh_from_db()
+        self.assertEqual((sem_area.area, sem_area.perimetro), (100.0, 40.0))
+        self.assertFalse(sem_area.area_divergente)
+
+    def test_metricas_gravadas_nos_lados(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.criar_vertices(self.QUADRADO)
+
+        v01, v02, v03, v04 = Vertice.objects.order_by("id")
+        self.assertEqual((v01.azimute, v01.distancia_plana), (0.0, 10.0))
+        self.assertEqual((v02.azimute, v04.azimute), (90.0, 270.0))
+        # Fora do meridiano central o fator de escala UTM passa de 1
+        self.assertAlmostEqual(v01.distancia_elipsoidal, 10.0, delta=0.01)
+        self.assertLess(v01.distancia_elipsoidal, v01.distancia_plana)
+
+    def test_so_os_lados_afetados_sao_recalculados(self):
+        self.assertEqual(lados_afetados([0, 1, 2], [0, 1, 2], [10, 20, 30], {10}).tolist(), [0, 2])
+        self.assertEqual(lados_afetados([0, 1, 2], [0, 1, 3], [10, 20, 40], set(), {2}).tolist(), [1])
+        # V30 passou a vir antes de V20: mudam os lados que saem de 10, 30 e 20
+        self.assertEqual(lados_afetados([0, 2, 1], [0, 1, 2], [10, 20, 30], set()).tolist(), [0, 1, 2])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.criar_vertices(self.QUADRADO)
+        Vertice.objects.filter(de_vertice__in=["V01", "V04"]).update(azimute=123.0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            v03 = Vertice.objects.get(de_vertice="V03")
+            v03.utm_n = 6956920.0
+            v03.save()
+
+        azimutes = dict(Vertice.objects.values_list("de_vertice", "azimute"))
+        self.assertEqual((azimutes["V01"], azimutes["V04"]), (123.0, 123.0))
+        self.assertAlmostEqual(azimutes["V02"], 45.0, places=6)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Vertice.objects.get(de_vertice="V03").delete()
+
+        v02 = Vertice.objects.get(de_vertice="V02")
+        self.assertAlmostEqual(v02.distancia_plana, 14.142136, places=5)
+        self.assertEqual(v02.distancia_lado, v02.distancia_plana)
+
+
+class AnelVerticesTests(TestCase):
+    def test_segue_a_cadeia_fora_da_ordem_de_cadastro(self):
+        anel = montar_anel(["V01", "V03", "V02", "V04"], ["V02", "V04", "V03", "V01"])
+
+        self.assertEqual(anel.ordem, [0, 2, 1, 3])
+        self.assertTrue(anel.valido)
+
+    def test_quebra_ramificacao_e_repetido(self):
+        anel = montar_anel(["V01", "V02", "V03", "V03"], ["V02", "V09", "V01", "V01"])
+
+        self.assertFalse(anel.valido)
+        self.assertEqual(anel.quebras, [("V02", "V09")])
+        self.assertEqual(anel.duplicados, ["V03"])
+        self.assertEqual(anel.ramificacoes, ["V01"])
+        self.assertEqual(anel.ordem, [0, 1, 2, 3])
+        self.assertIn("V02 -> V09", anel.mensagem)
+
+    def test_sequencia_gravada_ordena_o_memorial(self):
+        projeto = criar_projeto()
+        with self.captureOnCommitCallbacks(execute=True):
+            for de, para, n, e in [
+                ("V01", "V02", 6956900.0, 755900.0), ("V03", "V04", 6956910.0, 755910.0),
+                ("V04", "V01", 6956900.0, 755910.0), ("V02", "V03", 6956910.0, 755900.0),
+            ]:
+                Vertice.objects.create(
+                    projeto=projeto, de_vertice=de, para_vertice=para, latitude="", longitude="",
+                    distancia=10.0, utm_n=n, utm_e=e,
+                )
+
+        sequencias = dict(Vertice.objects.values_list("de_vertice", "sequencia"))
+        self.assertEqual(sequencias, {"V01": 0, "V02": 1, "V03": 2, "V04": 3})
+        dados = carregar_dados_memorial(projeto)
+        self.assertEqual([v.de_vertice for v in dados.vertices], ["V01", "V02", "V03", "V04"])
+        self.assertEqual([v.azimute for v in dados.vertices], [0.0, 90.0, 180.0, 270.0])
+        projeto.refresh_from_db()
+        self.assertEqual(projeto.area_calculada, 100.0)
+
+
+class CruzamentosTests(TestCase):
+    def test_laco_volta_e_anel_simples(self):
+        # Laço (gravata): o lado 0 cruza o 2
+        self.assertEqual(cruzamentos([0, 10, 10, 0], [0, 10, 0, 10]), [(0, 2)])
+        # O lado 1 volta sobre o 0, e o 2 sai de um ponto do lado 0
+        self.assertEqual(cruzamentos([0, 10, 5, 5], [0, 0, 0, 10]), [(0, 1), (0, 2)])
+        # Vértice encostado no lado 0: tocam nele o lado que chega e o que sai
+        self.assertEqual(cruzamentos([0, 10, 10, 5, 5, 0], [0, 0, 10, 0, 5, 10]), [(0, 2), (0, 3)])
+
+        t = np.linspace(0, 2 * np.pi, 20000, endpoint=False)
+        self.assertEqual(cruzamentos(755900 + 100 * np.cos(t), 6956900 + 100 * np.sin(t)), [])
+
+    def test_mesmos_pares_que_todos_contra_todos(self):
+        def lado(a, b, p):
+            return (b[0] - a[0]) * (p[1] - a[1]) - (b[1] - a[1]) * (p[0] - a[0])
+
+        def sobre(a, b, p):
+            return lado(a, b, p) == 0 and min(a, b) <= p <= max(a, b)
+
+        def tocam(a, b, c, d):
+            if (lado(c, d, a) * lado(c, d, b) < 0) and (lado(a, b, c) * lado(a, b, d) < 0):
+                return True
+            return sobre(c, d, a) or sobre(c, d, b) or sobre(a, b, c) or sobre(a, b, d)
+
+        # Vértices inteiros numa grade pequena: lados repetidos, alinhados e vértices em comum
+        rng = np.random.default_rng(7)
+        for _ in range(200):
+            total = int(rng.integers(3, 12))
+            pontos = [tuple(p) for p in rng.integers(0, 4, (total, 2)).tolist()]
+            lados = [(pontos[k], pontos[(k + 1) % total]) for k in range(total)]
+            esperados = []
+            for i in range(total):
+                for j in range(i + 1, total):
+                    if j == i + 1 or (i == 0 and j == total - 1):
+                        # Vizinhos: só se o segundo volta sobre o primeiro
+                        (a, b), (c, d) = (lados[i], lados[j]) if j == i + 1 else (lados[j], lados[i])
+                        u, v = (b[0] - a[0], b[1] - a[1]), (d[0] - c[0], d[1] - c[1])
+                        if u[0] * v[1] - u[1] * v[0] == 0 and u[0] * v[0] + u[1] * v[1] < 0:
+                            esperados.append((i, j))
+                    elif tocam(*lados[i], *lados[j]):
+                        esperados.append((i, j))
+            self.assertEqual(cruzamentos([p[0] for p in pontos], [p[1] for p in pontos]), esperados)
+
+    def test_20k_vertices_abaixo_de_um_segundo(self):
+        # Retângulo de 2 km com os quatro lados traçados a cada 40 cm (ruído de 30 cm):
+        # milhares de lados se sobrepõem em E nos lados norte-sul e em N nos leste-oeste
+        rng = np.random.default_rng(3)
+        lado = np.linspace(10, 1990, 5000)
+        ruido = [rng.normal(0, 0.3, 5000) for _ in range(4)]
+        e = 755000 + np.concatenate([lado, 2000 + ruido[0], 2000 - lado, ruido[1]])
+        n = 6956000 + np.concatenate([ruido[2], lado, 2000 + ruido[3], 2000 - lado])
+
+        inicio = time.perf_counter()
+        self.assertEqual(cruzamentos(e, n), [])
+        self.assertLess(time.perf_counter() - inicio, 1.0)
+
+        # Um vértice do lado oeste puxado para dentro do lado leste cruza-o
+        e[17500] = 755000 + 2010
+        self.assertEqual(len(cruzamentos(e, n)), 2)
+
+    def test_pares_pelos_rotulos_dos_vertices(self):
+        projeto = criar_projeto()
+        for de, para, e, n in [
+            ("V01", "V02", 755900.0, 6956900.0), ("V02", "V03", 755910.0, 6956910.0),
+            ("V03", "V04", 755910.0, 6956900.0), ("V04", "V01", 755900.0, 6956910.0),
+        ]:
+            Vertice.objects.create(
+                projeto=projeto, de_vertice=de, para_vertice=para, latitude="", longitude="",
+                distancia=10.0, utm_n=n, utm_e=e,
+            )
+
+        self.assertEqual(cruzamentos_do_projeto(projeto.id), [(("V01", "V02"), ("V03", "V04"))])
+        Vertice.objects.filter(de_vertice="V04").update(utm_n=None)
+        self.assertEqual(cruzamentos_do_projeto(projeto.id), [])
+
+
+class BuscaProjetosTests(TestCase):
+    def setUp(self):
+        self.projeto = criar_projeto("Loteamento São João")
+        self.outro = criar_projeto("Chácara Alegria")
+        self.beneficiario = Beneficiario.objects.create(
+            projeto=self.outro, nome="José Antônio", cpf_cnpj="123.456.789-09",
+            rua="Rua B", numero="2", bairro="Centro", cidade="Palhoça",
+        )
+
+    def buscar(self, termo):
+        return [p["nome"] for p in self.client.get(reverse("buscar_projetos"), {"q": termo}).json()]
+
+    def test_ignora_acentos_e_mascara(self):
+        self.assertEqual(self.buscar("sao joao"), ["Loteamento São João"])
+        self.assertEqual(self.buscar("ANTONIO"), ["Chácara Alegria"])
+        self.assertEqual(self.buscar("123.456"), ["Chácara Alegria"])
+
+    def test_coluna_busca_acompanha_beneficiarios(self):
+        self.beneficiario.delete()
+
+        self.outro.refresh_from_db()
+        self.assertEqual(self.outro.busca, "chacara alegria")
+        self.assertEqual(self.buscar("jose"), [])
+
+
+class IndicePrefixosTests(TestCase):
+    def setUp(self):
+        criar_projeto("Loteamento São João")
+        criar_projeto("Chácara Alegria").beneficiarios.create(
+            nome="Loteria", cpf_cnpj="123.456.789-09",
+            rua="Rua B", numero="2", bairro="Centro", cidade="Palhoça",
+        )
+        indice_projetos.invalidar()
+
+    def buscar(self, termo):
+        return [p["nome"] for p in self.client.get(reverse("buscar_projetos"), {"q": termo}).json()]
+
+    def test_prefixos_curtos_respondidos_em_memoria(self):
+        antes = indice_projetos.estatisticas()
+
+        with self.assertNumQueries(1):  # montagem do índice
+            self.assertEqual(self.buscar("Lot"), ["Loteamento São João"])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.buscar("joã"), ["Loteamento São João"])
+            self.assertEqual(self.buscar("ch"), ["Chácara Alegria"])
+
+        depois = indice_projetos.estatisticas()
+        self.assertEqual(depois["faltas"] - antes["faltas"], 1)
+        self.assertEqual(depois["acertos"] - antes["acertos"], 2)
+
+    def test_signals_invalidam_o_indice(self):
+        self.assertEqual(self.buscar("ale"), ["Chácara Alegria"])
+
+        criar_projeto("Alecrim")
+
+        self.assertEqual(self.buscar("ale"), ["Alecrim", "Chácara Alegria"])
+
+    def test_limite_de_memoria_desliga_o_indice(self):
+        indice = IndicePrefixos(maximo_entradas=3)
+
+        self.assertIsNone(indice.buscar("lot"))
+        self.assertTrue(indice.estatisticas()["desligado"])
+
+
+class IndexConsultasTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("topografo", password="senha")
+        self.client.force_login(self.user)
+        self.projeto = criar_projeto()
+
+    def criar_vertices(self, quantidade):
+        for i in range(quantidade):
+            confrontante = Confrontante.objects.create(
+                projeto=self.projeto, nome=f"Vizinho {i}", cpf_cnpj="123.456.789-09",
+                direcao="Frente", rua="Rua A", numero=str(i), bairro="Centro", cidade="Palhoça",
+            )
+            Vertice.objects.create(
+                projeto=self.projeto, de_vertice=f"V{i:02d}", para_vertice=f"V{i + 1:02d}",
+                latitude="", longitude="", distancia=1.0, confrontante=confrontante,
+            )
+
+    def test_numero_de_consultas_nao_depende_do_tamanho_do_projeto(self):
+        # sessão + usuário + projetos + beneficiários + confrontantes + vértices
+        self.criar_vertices(2)
+        with self.assertNumQueries(6):
+            self.client.get(reverse("index"))
+
+        self.criar_vertices(30)
+        with self.assertNumQueries(6):
+            resposta = self.client.get(reverse("index"))
+
+        self.assertContains(resposta, "Vizinho 29 (123.456.789-09)")
+
+    def test_post_nao_recarrega_listas_antes_da_acao(self):
+        self.criar_vertices(10)
+        # sessão + usuário + exists() + 4 da página + gravação da sessão (savepoint/update/release)
+        with self.assertNumQueries(10):
+            resposta = self.client.post(reverse("index"), {
+                "action": "selecionar_projeto", "projeto_filtro": self.projeto.id,
+            })
+
+        self.assertEqual(resposta.context["projeto_selecionado"], self.projeto)
+        self.assertEqual(len(resposta.context["vertices"]), 10)
+
+
+class CacheMemoriaisTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        ajuste = override_settings(MEDIA_ROOT=self.media)
+        ajuste.enable()
+        self.addCleanup(ajuste.disable)
+
+        self.projeto = criar_projeto()
+        self.client.force_login(User.objects.create_user("topografo", password="senha"))
+
+    def baixar(self):
+        resposta = self.client.post(reverse("index"), {
+            "action": "gerar_memorial_pdf", "projeto_memorial": self.projeto.id,
+        })
+        self.assertTrue(b"".join(resposta.streaming_content).startswith(b"%PDF"))
+        return resposta["X-Memorial-Cache"]
+
+    def test_segundo_download_nao_renderiza(self):
+        self.assertEqual(self.baixar(), "MISS")
+        with mock.patch("levantamento.memorial.cache.renderizar_memorial_pdf") as gerar:
+            self.assertEqual(self.baixar(), "HIT")
+        gerar.assert_not_called()
+
+    def test_alteracao_nos_dados_invalida(self):
+        self.baixar()
+        Vertice.objects.create(
+            projeto=self.projeto, de_vertice="V01", para_vertice="V02",
+            latitude="", longitude="", distancia=1.0,
+        )
+
+        self.assertEqual(list(cache_memoriais.diretorio.glob("*.pdf")), [])
+        self.assertEqual(self.baixar(), "MISS")
+
+    def test_chave_do_pdf_segue_a_revisao_do_conteudo(self):
+        Vertice.objects.create(
+            projeto=self.projeto, de_vertice="V01", para_vertice="V02",
+            latitude="", longitude="", distancia=1.0,
+        )
+        chave, conteudo = chave_memorial(self.projeto), revisao(carregar_dados_memorial(self.projeto))
+
+        Vertice.objects.update(para_vertice="V09")
+
+        self.assertNotEqual(chave_memorial(self.projeto), chave)
+        self.assertNotEqual(revisao(carregar_dados_memorial(self.projeto)), conteudo)
+        with mock.patch("levantamento.memorial.cache.revisao", return_value=conteudo):
+            self.assertEqual(chave_memorial(self.projeto), chave)
+
+    def test_falta_le_os_dados_uma_vez(self):
+        with mock.patch("levantamento.memorial.cache.carregar_dados_memorial", wraps=carregar_dados_memorial) as carregar:
+            with mock.patch("levantamento.memorial.conteudo.revisao", wraps=revisao) as revisar:
+                arquivo, acerto, _ = cache_memoriais.abrir(self.projeto)
+                arquivo.close()
+
+        self.assertFalse(acerto)
+        self.assertEqual(carregar.call_count, 1)
+        revisar.assert_not_called()
+
+    def test_importacao_invalida_uma_vez(self):
+        conteudo = "".join(
+            f"V{i:02d}\tV{i + 1:02d}\t48°29'05.593\" O\t27°27'16.418\" S\t10,5\tRua\n" for i in range(1, 51)
+        )
+        with mock.patch.object(cache_memoriais, "invalidar") as invalidar:
+            importados, _ = importar_vertices_txt(self.projeto, SimpleUploadedFile("v.txt", conteudo.encode()))
+            with geometria_em_lote():
+                for vertice in Vertice.objects.filter(projeto=self.projeto)[:10]:
+                    vertice.save()
+
+        self.assertEqual(importados, 50)
+        self.assertEqual(invalidar.call_args_list, [mock.call(self.projeto.id)] * 2)
+
+    def test_remove_os_menos_usados_acima_do_limite(self):
+        cache = CacheMemoriais(tamanho_maximo=1)
+        outro = criar_projeto("Outro")
+
+        cache.abrir(self.projeto)[0].close()
+        cache.abrir(outro)[0].close()
+
+        arquivos = [c.name.split("-")[0] for c in cache.diretorio.glob("*.pdf")]
+        self.assertEqual(arquivos, [str(outro.id)])
+        self.assertEqual(cache.estatisticas()["faltas"], 2)
+
+
+class DescricaoPerimetricaTests(TestCase):
+    def vertices(self, quantidade):
+        confrontante = Confrontante(nome="Silva & Filhos", cpf_cnpj="123.456.789-09")
+        return [
+            Vertice(
+                de_vertice=f"V{i + 1:02d}", distancia=10.0,
+                utm_n=6956900.0 + 10 * (i % 2), utm_e=755900.0 + 10 * (i // 2),
+                confrontante=confrontante if i == 0 else None, confrontante_texto="Rua",
+            )
+            for i in range(quantidade)
+        ]
+
+    def test_blocos_de_tamanho_limitado_formam_o_texto_completo(self):
+        projeto = Projeto(area=100.0, perimetro=40.0)
+
+        blocos = descricao_perimetrica(projeto, self.vertices(60), lados_por_paragrafo=25)
+
+        # abertura + 60 lados + fechamento
+        self.assertEqual(len(blocos), 3)
+        texto = "".join(blocos)
+        self.assertTrue(texto.startswith("Inicia-se a descrição deste perímetro no ponto de vértice <strong>V01</strong>"))
+        self.assertIn("confrontando com Silva &amp; Filhos, CPF: 123.456.789-09, com azimute de 0°00'00.00\"", texto)
+        self.assertIn("até o vértice <strong>V01</strong>", blocos[-1])
+        self.assertTrue(texto.endswith("Encerrado o perímetro total de 40,00 m e área de 100,00 m²."))
+
+    def test_menos_de_tres_vertices(self):
+        self.assertEqual(descricao_perimetrica(Projeto(area=1.0, perimetro=1.0), self.vertices(2)), [])
+
+
+class ConteudoMemorialTests(TestCase):
+    def setUp(self):
+        self.projeto = criar_projeto()
+        Beneficiario.objects.create(projeto=self.projeto, nome="Empresa & Cia", cpf_cnpj="12.345.678/0001-90", cidade="Palhoça")
+        for i in range(3):
+            Vertice.objects.create(
+                projeto=self.projeto, de_vertice=f"V{i + 1:02d}", para_vertice=f"V{(i + 1) % 3 + 1:02d}",
+                latitude="", longitude="", distancia=10.0, utm_n=6956900.0 + 10 * (i % 2), utm_e=755900.0 + 10 * (i // 2),
+                confrontante_texto="Rua",
+            )
+        cache_conteudos.limpar()
+
+    def test_rotulos_e_linhas_prontos(self):
+        conteudo = montar_conteudo(carregar_dados_memorial(self.projeto))
+
+        self.assertEqual(conteudo.area, "100,0m²")
+        self.assertEqual(conteudo.assinaturas[0].linhas, ["Empresa & Cia", "CNPJ: 12.345.678/0001-90", "Requerente"])
+        self.assertEqual([linha[0] for linha in conteudo.tabela_vertices], ["V01", "V02", "V03"])
+        self.assertTrue(conteudo.local_data.startswith("Palhoça, "))
+        self.assertEqual(len(conteudo.pares_assinaturas), 1)
+
+    @override_settings(
+        MEMORIAL_RESPONSAVEL_TECNICO={"nome": "Ana Souza", "titulo": "Técnica em Agrimensura", "registro": "CFT 123"},
+        MEMORIAL_ASSINATURAS_SUBLINHADAS=["Empresa & Cia"],
+    )
+    def test_responsavel_tecnico_vem_dos_settings(self):
+        dados = carregar_dados_memorial(self.projeto)
+        conteudo = conteudo_memorial(dados)
+
+        self.assertEqual(conteudo.responsavel["nome"], "Ana Souza")
+        self.assertEqual(conteudo.responsavel["registro"], "CFT 123")
+        self.assertEqual(conteudo.responsavel["titulo"], "Técnica em Agrimensura")
+        self.assertTrue(conteudo.assinaturas[0].sublinhada)
+        antes = revisao(dados)
+        with override_settings(MEMORIAL_RESPONSAVEL_TECNICO={**settings.MEMORIAL_RESPONSAVEL_TECNICO, "nome": "Outro"}):
+            self.assertNotEqual(revisao(dados), antes)
+
+    def test_pdf_e_word_da_mesma_revisao_montam_uma_vez(self):
+        faltas = cache_conteudos.faltas
+        with mock.patch("levantamento.memorial.conteudo.montar_conteudo", wraps=montar_conteudo) as montar:
+            gerar_memorial_docx(self.projeto, io.BytesIO())
+            gerar_memorial_pdf(self.projeto, io.BytesIO())
+            self.assertEqual(montar.call_count, 1)
+
+            Vertice.objects.filter(projeto=self.projeto, de_vertice="V03").update(distancia=12.0)
+            gerar_memorial_docx(self.projeto, io.BytesIO())
+            self.assertEqual(montar.call_count, 2)
+
+        self.assertEqual(cache_conteudos.faltas - faltas, 2)
+
+
+class PreviaMemorialTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.projeto = criar_projeto()
+        confrontante = Confrontante.objects.create(projeto=self.projeto, nome="Silva & Filhos", cpf_cnpj="123.456.789-09")
+        for i, (n, e) in enumerate([(6956900.0, 755900.0), (6956910.0, 755900.0), (6956910.0, 755910.0)]):
+            Vertice.objects.create(
+                projeto=self.projeto, de_vertice=f"V{i + 1:02d}", para_vertice=f"V{(i + 1) % 3 + 1:02d}",
+                latitude="", longitude="", distancia=10.0, utm_n=n, utm_e=e,
+                confrontante=confrontante if i == 0 else None, confrontante_texto="Rua",
+            )
+        self.client.force_login(User.objects.create_user("topografo", password="senha"))
+        self.url = reverse("previa_memorial", args=[self.projeto.id])
+
+    def test_mostra_secoes_e_usa_cache(self):
+        resposta = self.client.get(self.url)
+
+        self.assertEqual(resposta["X-Memorial-Cache"], "MISS")
+        self.assertContains(resposta, "10. Descrição Perimétrica:")
+        self.assertContains(resposta, "confrontando com Silva &amp; Filhos, CPF: 123.456.789-09, com azimute de 0°00'00.00\"")
+        self.assertContains(resposta, "<strong>V02</strong>")
+
+        with mock.patch("levantamento.memorial.html.renderizar_memorial_html") as renderizar:
+            self.assertEqual(self.client.get(self.url)["X-Memorial-Cache"], "HIT")
+        renderizar.assert_not_called()
+
+    def test_mesma_revisao_responde_304(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        Vertice.objects.filter(projeto=self.projeto, de_vertice="V03").update(distancia=12.0)
+        resposta = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta["X-Memorial-Cache"], "MISS")
+
+
+class TabelaPaginadaTests(TestCase):
+    def test_cada_pagina_recebe_so_as_linhas_que_cabem(self):
+        linhas = [(f"V{i}", "", "", "1,00", "Rua") for i in range(100)]
+        tabela = TabelaPaginada(CABECALHO_VERTICES, linhas, [50] * 5, TABELAS["vertices"])
+
+        # Linhas de 18pt: 180pt comportam o cabeçalho e mais 9 linhas
+        self.assertGreater(tabela.wrap(400, 180)[1], 180)
+        pagina, restante = tabela.split(400, 180)
+
+        self.assertEqual(pagina.wrap(400, 180)[1], 180)
+        self.assertEqual(restante.inicio, 9)
+        self.assertEqual(restante.wrap(400, 2000)[1], 18 * 92)
+
+
+class MemoriaisLoteTests(TestCase):
+    def setUp(self):
+        self.projetos = [criar_projeto(f"Lote {i}") for i in range(3)]
+        for projeto in self.projetos:
+            Vertice.objects.create(
+                projeto=projeto, de_vertice="V01", para_vertice="V02",
+                latitude="", longitude="", distancia=1.0,
+            )
+        self.client.force_login(User.objects.create_user("topografo", password="senha"))
+
+    def test_dados_carregados_com_consultas_fixas(self):
+        with self.assertNumQueries(4):
+            dados = carregar_dados_memoriais([p.id for p in self.projetos])
+
+        self.assertEqual([len(d.vertices) for d in dados.values()], [1, 1, 1])
+
+    @override_settings(MEMORIAL_LOTE_PROCESSOS=1)
+    def test_endpoint_envia_zip_com_um_pdf_por_projeto(self):
+        resposta = self.client.post(reverse("gerar_memoriais_lote"), {
+            "projetos": [p.id for p in self.projetos[:2]],
+        })
+
+        self.assertEqual(resposta["Content-Type"], "application/zip")
+        with zipfile.ZipFile(io.BytesIO(b"".join(resposta.streaming_content))) as arquivo:
+            self.assertEqual(arquivo.namelist(), ["Lote_0_-_Memorial.pdf", "Lote_1_-_Memorial.pdf"])
+            self.assertTrue(arquivo.read("Lote_0_-_Memorial.pdf").startswith(b"%PDF"))
+
+
+@override_settings(MEMORIAL_LOTE_PROCESSOS=1)
+class NotificacoesTests(TestCase):
+    def setUp(self):
+        self.projetos = [criar_projeto(f"Lote {i}") for i in range(2)]
+        for projeto in self.projetos:
+            for nome in ("Maria", "João & Cia"):
+                Confrontante.objects.create(
+                    projeto=projeto, nome=nome, cpf_cnpj="123.456.789-09", direcao="Fundos",
+                    rua="Rua das Flores", numero="10", bairro="Centro", cidade="Tijucas",
+                )
+        self.client.force_login(User.objects.create_user("topografo", password="senha"))
+
+    def baixar(self, formato):
+        resposta = self.client.post(reverse("gerar_notificacoes"), {
+            "projetos": [p.id for p in self.projetos], "formato": formato,
+        })
+        self.assertEqual(resposta["Content-Type"], "application/zip")
+        return zipfile.ZipFile(io.BytesIO(b"".join(resposta.streaming_content)))
+
+    def test_cartas_carregadas_com_consultas_fixas(self):
+        with self.assertNumQueries(3):
+            cartas = carregar_cartas([p.id for p in self.projetos])
+
+        self.assertEqual(len(cartas), 4)
+        self.assertEqual(cartas[0].endereco, "Rua das Flores, nº 10, Centro, Tijucas")
+        self.assertIn("art. 31 da Lei nº 13.465/2017", cartas[0].corpo[0])
+
+    def test_zip_com_uma_carta_pdf_por_confrontante(self):
+        with self.baixar("pdf") as arquivo:
+            self.assertEqual(arquivo.namelist(), [
+                "Lote_0/Maria_-_Notificação.pdf", "Lote_0/João__Cia_-_Notificação.pdf",
+                "Lote_1/Maria_-_Notificação.pdf", "Lote_1/João__Cia_-_Notificação.pdf",
+            ])
+            self.assertTrue(arquivo.read("Lote_0/Maria_-_Notificação.pdf").startswith(b"%PDF"))
+
+    def test_carta_docx_preenchida(self):
+        with self.baixar("docx") as arquivo:
+            self.assertEqual(len(arquivo.namelist()), 4)
+            with zipfile.ZipFile(io.BytesIO(arquivo.read("Lote_1/João__Cia_-_Notificação.docx"))) as carta:
+                documento = carta.read("word/document.xml").decode("utf-8")
+
+        self.assertNotIn("{{", documento)
+        self.assertIn("João &amp; Cia", documento)
+        self.assertIn("CPF: 123.456.789-09", documento)
+        self.assertIn("Rua das Flores, nº 10, Centro, Tijucas", documento)
+
+    def test_anonimo_vai_para_o_login(self):
+        self.client.logout()
+        resposta = self.client.post(reverse("gerar_notificacoes"), {"projetos": [p.id for p in self.projetos]})
+
+        self.assertEqual(resposta.status_code, 302)
+        self.assertIn(settings.LOGIN_URL, resposta["Location"])
+        self.assertNotEqual(resposta.get("Content-Type"), "application/zip")
+
+
+class MemorialWordTests(TestCase):
+    def setUp(self):
+        self.projeto = criar_projeto()
+        self.client.force_login(User.objects.create_user("topografo", password="senha"))
+
+    def baixar(self):
+        resposta = self.client.post(reverse("index"), {
+            "action": "gerar_memorial", "projeto_memorial": self.projeto.id,
+        })
+        self.assertEqual(resposta["Content-Type"], CONTENT_TYPE_DOCX)
+        conteudo = b"".join(resposta.streaming_content)
+        self.assertEqual(int(resposta["Content-Length"]), len(conteudo))
+        with zipfile.ZipFile(io.BytesIO(conteudo)) as arquivo:
+            return arquivo.read("word/document.xml").decode("utf-8")
+
+    def test_preenche_tabela_e_descricao(self):
+        confrontante = Confrontante.objects.create(projeto=self.projeto, nome="Silva & Filhos", cpf_cnpj="123.456.789-09")
+        for i, (n, e) in enumerate([(6956900.0, 755900.0), (6956910.0, 755900.0), (6956910.0, 755910.0)]):
+            Vertice.objects.create(
+                projeto=self.projeto, de_vertice=f"V{i + 1:02d}", para_vertice=f"V{(i + 1) % 3 + 1:02d}",
+                latitude="", longitude="", distancia=10.0, utm_n=n, utm_e=e,
+                confrontante=confrontante if i == 0 else None, confrontante_texto="Rua",
+            )
+
+        documento = self.baixar()
+
+        self.assertNotIn("{{", documento)
+        self.assertIn(">V03</w:t>", documento)
+        self.assertIn("<w:b/><w:sz w:val=\"24\"/></w:rPr><w:t xml:space=\"preserve\">V02</w:t>", documento)
+        self.assertIn("Inicia-se a descrição deste perímetro no ponto de vértice ", documento)
+        self.assertIn("deste segue confrontando com Silva &amp; Filhos, CPF: 123.456.789-09", documento)
+        self.assertIn("Nenhum beneficiário registrado.", documento)
+
+    @override_settings(DOCUMENTOS_MEMORIA_MAX_BYTES=1024)
+    def test_sem_vertices(self):
+        # Com o limite baixo o documento passa para o disco antes do envio
+        documento = self.baixar()
+
+        self.assertIn("Nenhum vértice registrado.", documento)
+        self.assertIn("Não há vértices suficientes para gerar a descrição perimétrica.", documento)
+
+
+class TarefasTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        ajuste = override_settings(MEDIA_ROOT=self.media)
+        ajuste.enable()
+        self.addCleanup(ajuste.disable)
+
+        self.projeto = criar_projeto()
+        self.user = User.objects.create_user("topografo", password="senha")
+        self.client.force_login(self.user)
+
+    def test_importacao_roda_no_worker_e_expoe_progresso(self):
+        conteudo = "\n".join([
+            "V1\tV2\tAZ\tDD\tCX\tCY\tGX\tGY",
+            linha_completa("V01", "V02", "6956911,591", "755924,028"),
+            linha_completa("V02", "V01", "6956911,607", "755916,946"),
+        ]).encode("utf-8")
+        arquivo = SimpleUploadedFile("completo.txt", conteudo)
+
+        resposta = self.client.post(
+            reverse("importar_dados_completos", args=[self.projeto.id]),
+            {"arquivo_completo": arquivo},
+        )
+
+        self.assertRedirects(resposta, reverse("index"), fetch_redirect_response=False)
+        tarefa = Tarefa.objects.get()
+        self.assertEqual(tarefa.status, Tarefa.PENDENTE)
+        self.assertFalse(Vertice.objects.exists())
+
+        self.assertEqual(processar_pendentes(), 1)
+
+        status = self.client.get(reverse("status_tarefa", args=[tarefa.id])).json()
+        self.assertEqual(status["status"], Tarefa.CONCLUIDA)
+        self.assertEqual(status["linhas_processadas"], 2)
+        self.assertEqual(status["erros"], 0)
+        self.assertEqual(Vertice.objects.filter(projeto=self.projeto).count(), 2)
+
+    def test_memorial_em_segundo_plano_disponivel_para_download(self):
+        self.client.post(reverse("gerar_memorial_pdf_tarefa", args=[self.projeto.id]))
+        processar_pendentes()
+
+        tarefa = Tarefa.objects.get()
+        status = self.client.get(reverse("status_tarefa", args=[tarefa.id])).json()
+        self.assertEqual(status["status"], Tarefa.CONCLUIDA)
+
+        resposta = self.client.get(status["download"])
+        self.assertEqual(resposta.status_code, 200)
+        self.assertTrue(b"".join(resposta.streaming_content).startswith(b"%PDF"))
+
+        self.client.force_login(User.objects.create_user("outro", password="senha"))
+        self.assertEqual(self.client.get(status["download"]).status_code, 404)
+        self.assertEqual(self.client.get(reverse("status_tarefa", args=[tarefa.id])).status_code, 404)
+
+    @override_settings(TAREFA_RESULTADO_HORAS=24)
+    def test_documentos_expirados_sao_apagados(self):
+        self.client.post(reverse("gerar_memorial_pdf_tarefa", args=[self.projeto.id]))
+        processar_pendentes()
+        tarefa = Tarefa.objects.get()
+        caminho = tarefa.resultado.path
+
+        Tarefa.objects.update(concluido_em=timezone.now() - timedelta(hours=25))
+        processar_pendentes()
+
+        tarefa.refresh_from_db()
+        self.assertFalse(tarefa.resultado)
+        self.assertFalse(os.path.exists(caminho))
+        self.assertEqual(self.client.get(reverse("baixar_resultado_tarefa", args=[tarefa.id])).status_code, 404)
+
+    @override_settings(TAREFA_TEMPO_MAXIMO_MINUTOS=30)
+    def test_tarefa_de_worker_interrompido_vira_erro(self):
+        antiga = Tarefa.objects.create(
+            tipo=Tarefa.IMPORTAR_VERTICES, projeto=self.projeto, usuario=self.user, status=Tarefa.EXECUTANDO,
+            iniciado_em=timezone.now() - timedelta(minutes=31),
+        )
+        recente = Tarefa.objects.create(
+            tipo=Tarefa.IMPORTAR_VERTICES, projeto=self.projeto, status=Tarefa.EXECUTANDO,
+            iniciado_em=timezone.now(),
+        )
+
+        status = self.client.get(reverse("status_tarefa", args=[antiga.id])).json()
+        self.assertEqual(status["status"], Tarefa.ERRO)
+        self.assertTrue(status["finalizada"])
+        self.assertIn("interrompida", status["mensagem"])
+
+        processar_pendentes()
+        recente.refresh_from_db()
+        self.assertEqual(recente.status, Tarefa.EXECUTANDO)
@@ -9,5 +9,11 @@ urlpatterns = [
     path("buscar-pessoa/", views.buscar_pessoa_por_documento, name="buscar_pessoa"),
     path("importar-vertices/", views.importar_vertices_lisp, name="importar_vertices_lisp"),
     path("importar-vertices-completos/<int:projeto_id>/", views.importar_dados_completos, name="importar_dados_completos"),
+    path("gerar-memorial-pdf/<int:projeto_id>/", views.gerar_memorial_pdf_tarefa, name="gerar_memorial_pdf_tarefa"),
+    path("tarefas/<int:tarefa_id>/status/", views.status_tarefa_view, name="status_tarefa"),
+    path("tarefas/<int:tarefa_id>/download/", views.baixar_resultado_tarefa, name="baixar_resultado_tarefa"),
+    path("gerar-memoriais-lote/", views.gerar_memoriais_lote, name="gerar_memoriais_lote"),
+    path("gerar-notificacoes/", views.gerar_notificacoes, name="gerar_notificacoes"),
+    path("projetos/<int:projeto_id>/memorial/previa/", views.previa_memorial, name="previa_memorial"),
 
      ]
\ No newline at end of file
@@ -1,48 +1,33 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
-from django.http import HttpResponse, JsonResponse
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, FileResponse, Http404, StreamingHttpResponse
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q
-from .models import Projeto, Beneficiario, Confrontante, Vertice
-from docx import Document
-from docx.shared import Pt, Cm, RGBColor
-from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_LINE_SPACING
-from docx.enum.table import WD_ALIGN_VERTICAL
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
-import io, math
-from io import BytesIO
-from datetime import datetime
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import cm
-from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
-from reportlab.lib import colors
-from reportlab.pdfbase.pdfmetrics import stringWidth
-from pyproj import Transformer
-from numpy import arctan2, pi, degrees
+from django.utils.cache import get_conditional_response, quote_etag
+from .models import ORDEM_ANEL, Projeto, Beneficiario, Confrontante, Vertice, Tarefa, somente_digitos
+from .busca import buscar_projetos as buscar_projetos_por_termo
+from .documentos import resposta_documento
+from .calculos import br_coord, gms_para_decimal, parse_numeros_br, process_utm_coordinate
+from .coordenadas import conferir_coordenadas
+from .geometria import agendar_recalculo, anel_do_projeto, cruzamentos_do_projeto, geometria_em_lote, mensagem_cruzamentos
+from .importacao import ler_linhas, ler_registros
+from .memorial import (
+    FORMATOS_NOTIFICACAO, cache_memoriais, gerar_memorial_docx, zip_memoriais_em_lote, zip_notificacoes_em_lote,
+)
+from .memorial.cache import chave_memorial
+from .memorial.html import previa_memorial as previa_memorial_html
+from .memorial.word import CONTENT_TYPE_DOCX
+from .tarefas import enfileirar, acompanhar, interromper_travadas, tarefas_acompanhadas, status_tarefa
+import logging
+from functools import partial
+
+logger = logging.getLogger(__name__)
 
 def buscar_projetos(request):
     termo = request.GET.get("q", "").strip()
 
-    projetos = Projeto.objects.all()
-
-    if termo:
-        termo_limpo = termo.replace(".", "").replace("-", "").replace("/", "")
-        projetos = projetos.filter(
-            Q(nome__icontains=termo) |
-            Q(beneficiarios__cpf_cnpj__icontains=termo_limpo) |
-            Q(inscricao_imobiliaria__icontains=termo)
-        ).distinct()
-
-    projetos = projetos.order_by("nome")[:20]  # limite saudável
-
-    dados = [
-        {"id": p.id, "nome": p.nome}
-        for p in projetos
-    ]
+    dados = buscar_projetos_por_termo(termo)  # [{"id", "nome"}, ...]
 
     return JsonResponse(dados, safe=False)
 
@@ -52,14 +37,20 @@ def buscar_pessoa_por_documento(request):
     if not doc:
         return JsonResponse({"erro": "Documento vazio"}, status=400)
 
-    # remove máscara
-    doc_limpo = doc.replace(".", "").replace("-", "").replace("/", "")
+    # remove máscara; a busca usa o índice da coluna documento
+    doc_limpo = somente_digitos(doc)
+    if not doc_limpo:
+        return JsonResponse({"erro": "Documento vazio"}, status=400)
 
-    pessoa = (
-        Beneficiario.objects.filter(cpf_cnpj__replace__icontains=doc_limpo).first()
-        or
-        Confrontante.objects.filter(cpf_cnpj__replace__icontains=doc_limpo).first()
-    )
+    pessoa = None
+    for filtro in ({"documento": doc_limpo}, {"documento__startswith": doc_limpo}):
+        pessoa = (
+            Beneficiario.objects.filter(**filtro).order_by("id").first()
+            or
+            Confrontante.objects.filter(**filtro).order_by("id").first()
+        )
+        if pessoa:
+            break
 
     if not pessoa:
         return JsonResponse({"encontrado": False})
@@ -75,238 +66,6 @@ def buscar_pessoa_por_documento(request):
         "cidade": pessoa.cidade,
     })
 
-# Calcular Largura da coluna Confrontantes
-def calcular_largura_confrontantes(tabela_dados, coluna=4, fonte='Times-Roman', tamanho=10):
-    maior_largura = 0.0
-
-    for linha in tabela_dados:
-        texto = str(linha[coluna])
-        largura = float(stringWidth(texto, fonte, tamanho))
-
-        if largura > maior_largura:
-            maior_largura = largura
-
-    return maior_largura + 15
-
-# Calcular Azimute
-def gms_para_decimal(valor):
-    """
-    Converte '48°28'11.37" O' ou '27°12'33.12" S' para decimal
-    """
-    valor = valor.strip().replace(",", ".")
-
-    if "°" in valor:
-        direcao = valor[-1].upper()
-
-        valor = valor.replace("O", "").replace("W", "").replace("S", "").replace("N", "")
-        graus, resto = valor.split("°")
-        minutos, resto = resto.split("'")
-        segundos = resto.replace('"', "").strip()
-
-        decimal = float(graus) + float(minutos)/60 + float(segundos)/3600
-
-        if direcao in ["O", "W", "S"]:
-            decimal = -decimal
-
-        return decimal
-
-    return float(valor)
-
-def parse_float_br(valor):
-    if not valor:
-        return None
-    try:
-        return float(
-            str(valor)
-            .replace(".", "")
-            .replace(",", ".")
-        )
-    except ValueError:
-        return None
-
-def parse_gms(valor):
-    if not valor:
-        return ""
-    return valor.strip()
-
-
-def br(valor, casas=2):
-    try:
-        return f"{float(valor):.{casas}f}".replace(".", ",")
-    except:
-        return "0,00"
-
-def br_coord(valor, casas=3):
-    if valor is None or valor == "":
-        return "0,000"
-    try:
-        # Garante que o valor seja tratado como float antes de formatar
-        return f"{float(valor):.{casas}f}".replace(".", ",")
-    except (ValueError, TypeError):
-        return "0,000"
-
-
-def decimal_para_gms(angulo):
-    graus = int(angulo)
-    minutos_float = (angulo - graus) * 60
-    minutos = int(minutos_float)
-    segundos = (minutos_float - minutos) * 60
-    return f"{graus}°{minutos:02d}'{segundos:05.2f}\""
-
-
-def calcular_azimute_utm(e1, n1, e2, n2):
-    delta_e = e2 - e1
-    delta_n = n2 - n1
-
-    # Lógica que você testou: (X, Y) para Azimute Topográfico
-    azimute_rad = arctan2(delta_e, delta_n)
-
-    # Converte para graus decimais e garante intervalo 0-360
-    azimute_decimal = degrees(azimute_rad) % 360
-    
-    #return decimal_para_gms(azimute)
-    return decimal_para_gms(azimute_decimal)
-
-
-def calcular_azimute(lat1, lon1, lat2, lon2):
-    lat1 = math.radians(gms_para_decimal(lat1))
-    lon1 = math.radians(gms_para_decimal(lon1))
-    lat2 = math.radians(gms_para_decimal(lat2))
-    lon2 = math.radians(gms_para_decimal(lon2))
-
-    dlon = lon2 - lon1
-
-    x = math.sin(dlon) * math.cos(lat2)
-    y = math.cos(lat1) * math.sin(lat2) - math.sin(lat1) * math.cos(lat2) * math.cos(dlon)
-
-    azimute = math.degrees(math.atan2(x, y))
-    azimute = (azimute + 360) % 360
-
-    return decimal_para_gms(azimute)
-
-
-def process_utm_coordinate(value):
-
-    """Processa coordenada UTM do frontend para float"""
-    if not value or value == '' or value.strip() == '':
-        return None
-    
-    try:
-        # Log para debug
-        print(f"Processando coordenada UTM: '{value}'")
-        
-        # Se já é um número válido (pode vir do banco)
-        if isinstance(value, (int, float)):
-            return float(value)
-        
-        value = str(value).strip()
-        
-        # Caso 1: Já está no formato correto (ex: "6936302.27")
-        if '.' in value and ',' not in value:
-            try:
-                return float(value)
-            except ValueError:
-                pass
-        
-        # Caso 2: Tem vírgula como separador decimal (formato brasileiro)
-        if ',' in value:
-            # Remove pontos de milhar e substitui vírgula por ponto
-            parts = value.split(',')
-            if len(parts) == 2:
-                integer_part = parts[0].replace('.', '')
-                decimal_part = parts[1]
-                # Garante 3 casas decimais
-                if len(decimal_part) < 3:
-                    decimal_part = decimal_part.ljust(3, '0')
-                elif len(decimal_part) > 3:
-                    decimal_part = decimal_part[:3]
-                result = f"{integer_part}.{decimal_part}"
-                print(f"  Convertido '{value}' para '{result}'")
-                return float(result)
-        
-        # Caso 3: Tem apenas números (sem separador decimal)
-        # Remove todos os pontos (podem ser de milhar)
-        value = value.replace('.', '')
-        try:
-            return float(value)
-        except ValueError:
-            pass
-        
-        # Caso 4: Outros formatos
-        # Tenta converter diretamente
-        return float(value)
-        
-    except (ValueError, TypeError) as e:
-        print(f"Erro ao processar coordenada UTM: '{value}', erro: {e}")
-        return None
-
-def importar_lat_long_utm_helper(
-    projeto,
-    linhas,
-    criar_se_nao_existir=True,
-    atualizar_existente=True
-):
-    atualizados = ignorados = erros = 0
-
-    for i, linha in enumerate(linhas):
-        try:
-            if i == 0 or not linha.strip():
-                continue  # pula cabeçalho
-
-            partes = linha.split("\t")
-            if len(partes) < 6:
-                raise ValueError(f"Colunas insuficientes ({len(partes)})")
-
-
-            v1 = partes[0].strip()
-            v2 = partes[1].strip()
-            azimute   = partes[2]
-            distancia = parse_float_br(partes[3])
-            utm_n = process_utm_coordinate(partes[4])
-            utm_e = process_utm_coordinate(partes[5])
-            latitude = parse_gms(partes[6]) if len(partes) > 6  and partes[6].strip() else None
-            longitude = parse_gms(partes[7]) if len(partes) > 7 and partes[7].strip() else None
-
-            vertice = Vertice.objects.filter(
-                projeto=projeto,
-                de_vertice=v1
-            ).first()
-            
-            if vertice:
-                if atualizar_existente:
-                    vertice.para_vertice = v2
-                    vertice.distancia = distancia
-                    vertice.utm_n = utm_n
-                    vertice.utm_e = utm_e
-                    vertice.latitude = latitude
-                    vertice.longitude = longitude
-                    vertice.save()
-                    atualizados += 1
-                else:
-                    ignorados += 1
-            else:
-                if criar_se_nao_existir:
-                    Vertice.objects.create(
-                        projeto=projeto,
-                        de_vertice=v1,
-                        para_vertice=v2,
-                        distancia=distancia,
-                        utm_n=utm_n,
-                        utm_e=utm_e,
-                        latitude=latitude,
-                        longitude=longitude,
-                        confrontante_texto="A preencher"
-                    )
-                    atualizados += 1
-                else:
-                    ignorados += 1
-
-        except Exception as e:
-            print(f"Erro linha {i+1}: {linha} | {e}")
-            erros += 1
-
-    return atualizados, ignorados, erros
-
 @login_required
 def importar_vertices_lisp(request):
     if request.method == 'POST':
@@ -320,37 +79,55 @@ def importar_vertices_lisp(request):
         try:
             projeto = get_object_or_404(Projeto, id=projeto_id)
             
-            # Decodifica o arquivo (tratando possíveis erros de encoding do Windows)
-            try:
-                data = arquivo_txt.read().decode('utf-8').splitlines()
-            except UnicodeDecodeError:
-                arquivo_txt.seek(0)
-                data = arquivo_txt.read().decode('latin-1').splitlines()
-
-            # Remove o cabeçalho
-            linhas = data[1:] 
-            
-            for linha in linhas:
-                if not linha.strip(): continue # Pula linhas vazias
-                
-                colunas = linha.split('\t') # Separador da nossa LISP
-                
-                # Mapeamento baseado na LISP: 
-                # 0:V1, 1:V2, 2:AZ, 3:DD, 4:CX, 5:CY, 6:GX, 7:GY
-                Vertice.objects.create(
+            # Lê o arquivo em streaming (tratando possíveis erros de encoding do Windows),
+            # pulando o cabeçalho e as linhas vazias. Separador da nossa LISP: tabulação
+            # Mapeamento baseado na LISP: 0:V1, 1:V2, 2:AZ, 3:DD, 4:CX, 5:CY, 6:GX, 7:GY
+            registros = []
+            falhas = []
+            for numero, linha, colunas in ler_registros(arquivo_txt, pular_cabecalho=True, strip=False):
+                if len(colunas) < 6:
+                    falhas.append(f"Linha {numero}: colunas insuficientes ({len(colunas)})")
+                else:
+                    registros.append((numero, colunas))
+
+            # Distância e coordenadas convertidas coluna a coluna
+            distancias, distancias_ok = parse_numeros_br([c[3] for _, c in registros])
+            leste, leste_ok = parse_numeros_br([c[4] for _, c in registros])
+            norte, norte_ok = parse_numeros_br([c[5] for _, c in registros])
+            validos = distancias_ok & leste_ok & norte_ok
+
+            novos = []
+            for k, (numero, colunas) in enumerate(registros):
+                if not validos[k]:
+                    falhas.append(f"Linha {numero}: distância ou coordenada inválida")
+                    continue
+                novos.append(Vertice(
                     projeto=projeto,
-                    de_vertice=colunas[0],        # V1 (De)
-                    para_vertice=colunas[1],   # V2 (Para)
-                    distancia=colunas[3].replace(',', '.'), # Distância
-                    # Supondo que seu model Vertice tenha estes campos:
-                    utm_e=colunas[4].replace(',', '.'),   # CX
-                    utm_n=colunas[5].replace(',', '.'),   # CY
-                    latitude=colunas[6] if len(colunas) > 6 else "",
-                    longitude=colunas[7] if len(colunas) > 7 else "",
-                    confrontante="A preencher" # Valor padrão
-                )
-
-            messages.success(request, f"Importação concluída: {len(linhas)} vértices adicionados.")
+                    de_vertice=colunas[0].strip(),
+                    para_vertice=colunas[1].strip(),
+                    distancia=float(distancias[k]),
+                    utm_e=float(leste[k]),
+                    utm_n=float(norte[k]),
+                    latitude=colunas[6].strip() if len(colunas) > 6 else "",
+                    longitude=colunas[7].strip() if len(colunas) > 7 else "",
+                    confrontante_texto="A preencher",
+                ))
+
+            Vertice.objects.bulk_create(novos, batch_size=1000)
+            # bulk_create não dispara os signals
+            if novos:
+                agendar_recalculo(projeto.id)
+
+            messages.success(request, f"Importação concluída: {len(novos)} vértices adicionados.")
+            if falhas:
+                messages.warning(request, f"{len(falhas)} linha(s) ignorada(s): " + "; ".join(falhas[:20]))
+            anel = anel_do_projeto(projeto.id)
+            if not anel.valido:
+                messages.warning(request, anel.mensagem)
+            else:
+                pares = cruzamentos_do_projeto(projeto.id)
+                if pares:
+                    messages.warning(request, mensagem_cruzamentos(pares))
             
         except Exception as e:
             messages.error(request, f"Erro ao processar o arquivo: {str(e)}")
@@ -370,27 +147,11 @@ def importar_dados_completos(request, projeto_id):
 
     projeto = get_object_or_404(Projeto, id=projeto_id)
 
+    # A importação roda no worker (manage.py processar_tarefas); a página acompanha o progresso
     try:
-        try:
-            linhas = arquivo.read().decode("utf-8").splitlines()
-        except UnicodeDecodeError:
-            arquivo.seek(0)
-            linhas = arquivo.read().decode("latin-1").splitlines()
-
-        atualizados, ignorados, erros = importar_lat_long_utm_helper(
-            projeto=projeto,
-            linhas=linhas,
-            criar_se_nao_existir=True,
-            atualizar_existente=True
-        )
-
-        messages.success(
-            request,
-            f"Importação concluída! "
-            f"Atualizados: {atualizados}, "
-            f"Ignorados: {ignorados}, "
-            f"Erros: {erros}"
-        )
+        tarefa = enfileirar(Tarefa.IMPORTAR_DADOS_COMPLETOS, projeto, request.user, arquivo)
+        acompanhar(request, tarefa)
+        messages.success(request, "Importação enviada para processamento.")
 
     except Exception as e:
         messages.error(request, f"Erro na importação: {str(e)}")
@@ -398,6 +159,101 @@ def importar_dados_completos(request, projeto_id):
     return redirect("index")
 
 
+# ======TAREFAS EM SEGUNDO PLANO======
+
+@login_required
+def gerar_memorial_pdf_tarefa(request, projeto_id):
+    if request.method != "POST":
+        return redirect("index")
+
+    projeto = get_object_or_404(Projeto, id=projeto_id)
+    tarefa = enfileirar(Tarefa.GERAR_MEMORIAL_PDF, projeto, request.user)
+    acompanhar(request, tarefa)
+    messages.success(request, "Geração do memorial enviada para processamento.")
+    return redirect("index")
+
+
+@login_required
+def status_tarefa_view(request, tarefa_id):
+    interromper_travadas([tarefa_id])
+    tarefa = get_object_or_404(Tarefa.objects.select_related("projeto"), id=tarefa_id, usuario=request.user)
+    return JsonResponse(status_tarefa(tarefa))
+
+
+@login_required
+def baixar_resultado_tarefa(request, tarefa_id):
+    tarefa = get_object_or_404(Tarefa, id=tarefa_id, usuario=request.user, status=Tarefa.CONCLUIDA)
+    if not tarefa.resultado:
+        raise Http404("Tarefa sem documento gerado.")
+    return FileResponse(
+        tarefa.resultado.open("rb"),
+        as_attachment=True,
+        filename=tarefa.resultado.name.rsplit("/", 1)[-1],
+    )
+
+
+@login_required
+def previa_memorial(request, projeto_id):
+    """Memorial em HTML para conferir nomes e azimutes sem gerar o PDF."""
+    projeto = get_object_or_404(Projeto, id=projeto_id)
+    chave = chave_memorial(projeto)
+
+    # O navegador já tem esta revisão: 304 sem montar nada
+    etag = quote_etag(chave)
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        return response
+
+    html, acerto = previa_memorial_html(projeto, chave)
+    response = HttpResponse(html)
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    response["X-Memorial-Cache"] = "HIT" if acerto else "MISS"
+    return response
+
+
+@login_required
+def gerar_memoriais_lote(request):
+    """Memoriais dos projetos escolhidos num ZIP, enviado enquanto os PDFs ficam prontos."""
+    if request.method != "POST":
+        return redirect("index")
+
+    projeto_ids = [int(i) for i in request.POST.getlist("projetos") if i.isdigit()]
+    if not projeto_ids:
+        messages.error(request, "Selecione ao menos um projeto.")
+        return redirect("index")
+
+    response = StreamingHttpResponse(
+        zip_memoriais_em_lote(projeto_ids, processos=settings.MEMORIAL_LOTE_PROCESSOS),
+        content_type="application/zip",
+    )
+    response["Content-Disposition"] = 'attachment; filename="Memoriais.zip"'
+    return response
+
+
+@login_required
+def gerar_notificacoes(request):
+    """Notificações dos confrontantes dos projetos escolhidos num ZIP, uma carta por confrontante."""
+    if request.method != "POST":
+        return redirect("index")
+
+    projeto_ids = [int(i) for i in request.POST.getlist("projetos") if i.isdigit()]
+    if not projeto_ids:
+        messages.error(request, "Selecione ao menos um projeto.")
+        return redirect("index")
+    formato = request.POST.get("formato", "pdf")
+    if formato not in FORMATOS_NOTIFICACAO:
+        messages.error(request, "Formato de notificação inválido.")
+        return redirect("index")
+
+    response = StreamingHttpResponse(
+        zip_notificacoes_em_lote(projeto_ids, formato, processos=settings.MEMORIAL_LOTE_PROCESSOS),
+        content_type="application/zip",
+    )
+    response["Content-Disposition"] = 'attachment; filename="Notificacoes.zip"'
+    return response
+
+
 #======IMPORTACAO SOMENTE UTM======
 
 def importar_utm(request, projeto_id):
@@ -410,7 +266,7 @@ def importar_utm(request, projeto_id):
             messages.error(request, "Nenhum arquivo enviado.")
             return redirect("index")
 
-        linhas = arquivo.read().decode("utf-8").splitlines()
+        linhas = ler_linhas(arquivo)
         atualizados = 0
         ignorados = 0
         erros = 0
@@ -445,7 +301,7 @@ def importar_utm(request, projeto_id):
                 atualizados += 1
 
             except Exception as e:
-                print("Erro linha:", linha, e)
+                logger.warning("Erro linha: %s | %s", linha, e)
                 erros += 1
 
         messages.success(
@@ -469,7 +325,7 @@ def importar_lat_long_utm(request, projeto_id):
             messages.error(request, "Nenhum arquivo enviado.")
             return redirect("index")
 
-        linhas = arquivo.read().decode("utf-8").splitlines()
+        linhas = ler_linhas(arquivo)
 
         atualizados = ignorados = erros = 0
 
@@ -510,7 +366,7 @@ def importar_lat_long_utm(request, projeto_id):
                 atualizados += 1
 
             except Exception as e:
-                print(f"Erro linha {i+1}: {linha} | {e}")
+                logger.warning("Erro linha %s: %s | %s", i + 1, linha, e)
                 erros += 1
 
         messages.success(
@@ -545,40 +401,48 @@ def logout_view(request):
     return redirect('login')
 
 
-# View principal
-@login_required
-def index(request):
-    projetos = Projeto.objects.all().order_by("nome")
+def _dados_index(request):
+    """
+    Carrega os dados da página principal uma única vez, depois das ações do
+    POST: o número de consultas não depende do tamanho do projeto.
+    """
+    projetos = list(Projeto.objects.defer('busca').order_by('nome'))
+
+    # Projeto da sessão ou, se não houver (ou foi excluído), o mais recente
+    selecionado_id = str(request.session.get('projeto_selecionado_id'))
+    projeto_selecionado = next((p for p in projetos if str(p.id) == selecionado_id), None)
+    if projeto_selecionado is None and projetos:
+        projeto_selecionado = max(projetos, key=lambda p: p.id)
+
     beneficiarios = []
     confrontantes = []
     vertices = []
-    projeto_selecionado = None
+    if projeto_selecionado:
+        beneficiarios = list(projeto_selecionado.beneficiarios.order_by('id'))
+        confrontantes = list(projeto_selecionado.confrontantes.order_by('id'))
+        vertices = list(projeto_selecionado.vertices.select_related('confrontante').order_by(*ORDEM_ANEL))
 
-    if 'projeto_selecionado_id' in request.session:
-        try:
-            projeto_selecionado = Projeto.objects.get(id=request.session['projeto_selecionado_id'])
-        except Projeto.DoesNotExist:
-            projeto_selecionado = projetos.order_by('-id').first()
-    else:
-        projeto_selecionado = projetos.order_by('-id').first()
+    return {
+        'projetos': projetos,
+        'beneficiarios': beneficiarios,
+        'confrontantes': confrontantes,
+        'vertices': vertices,
+        'projeto_selecionado': projeto_selecionado,
+        'tarefas': tarefas_acompanhadas(request)
+    }
 
-    if projeto_selecionado:
-        beneficiarios = Beneficiario.objects.filter(projeto=projeto_selecionado)
-        confrontantes = Confrontante.objects.filter(projeto=projeto_selecionado)
-        vertices = Vertice.objects.filter(projeto=projeto_selecionado)
 
+# View principal
+@login_required
+def index(request):
     if request.method == 'POST':
         action = request.POST.get('action')
 
         if action == 'selecionar_projeto':
             projeto_id = request.POST.get('projeto_filtro')
-            try:
-                projeto_selecionado = Projeto.objects.get(id=projeto_id)
+            if Projeto.objects.filter(id=projeto_id).exists():
                 request.session['projeto_selecionado_id'] = projeto_id
-                beneficiarios = Beneficiario.objects.filter(projeto=projeto_selecionado)
-                confrontantes = Confrontante.objects.filter(projeto=projeto_selecionado)
-                vertices = Vertice.objects.filter(projeto=projeto_selecionado)
-            except Projeto.DoesNotExist:
+            else:
                 messages.error(request, 'Projeto selecionado não existe.')
 
         elif action == 'add_projeto':
@@ -594,8 +458,9 @@ def index(request):
                     nome=nome,
                     inscricao_imobiliaria=inscricao_imobiliaria,
                     endereco=endereco,
-                    area=float(area),
-                    perimetro=float(perimetro),
+                    # Em branco: calculados pela UTM quando os vértices forem importados
+                    area=float(area or 0),
+                    perimetro=float(perimetro or 0),
                     epoca_medicao=epoca_medicao,
                     instrumento=instrumento
                 )
@@ -636,18 +501,7 @@ def index(request):
             if projeto_id and arquivo:
                 try:
                     projeto = Projeto.objects.get(id=projeto_id)
-                    try:
-                        conteudo = arquivo.read().decode('utf-8').splitlines()
-                    except UnicodeDecodeError:
-                        arquivo.seek(0)
-                        try:
-                            conteudo = arquivo.read().decode('latin-1').splitlines()
-                        except UnicodeDecodeError:
-                            arquivo.seek(0)
-                            conteudo = arquivo.read().decode('windows-1252').splitlines()
-                    
-                    for linha in conteudo:
-                        campos = linha.strip().split('\t')
+                    for _, linha, campos in ler_registros(arquivo):
                         if len(campos) != 6:
                             messages.error(request, f'Formato inválido na linha: {linha}')
                             continue
@@ -772,9 +626,8 @@ def index(request):
             projeto_id = request.POST.get('projeto_filtro')
             if projeto_id:
                 confrontantes = Confrontante.objects.filter(projeto__id=projeto_id)
-                for confrontante in confrontantes:
-                    confrontante.excluir_do_pdf = str(confrontante.id) in excluir_ids
-                    confrontante.save()
+                confrontantes.filter(id__in=excluir_ids).update(excluir_do_pdf=True)
+                confrontantes.exclude(id__in=excluir_ids).update(excluir_do_pdf=False)
                 messages.success(request, 'Seleção de confrontantes atualizada!')
             return redirect('index')
 
@@ -785,18 +638,7 @@ def index(request):
             if projeto_id and arquivo:
                 try:
                     projeto = Projeto.objects.get(id=projeto_id)
-                    try:
-                        conteudo = arquivo.read().decode('utf-8').splitlines()
-                    except UnicodeDecodeError:
-                        arquivo.seek(0)
-                        try:
-                            conteudo = arquivo.read().decode('latin-1').splitlines()
-                        except UnicodeDecodeError:
-                            arquivo.seek(0)
-                            conteudo = arquivo.read().decode('windows-1252').splitlines()
-                    
-                    for linha in conteudo:
-                        campos = linha.strip().split('\t')
+                    for _, linha, campos in ler_registros(arquivo):
                         if len(campos) != 7:
                             messages.error(request, f'Formato inválido na linha: {linha}')
                             continue
@@ -830,66 +672,11 @@ def index(request):
             if projeto_id and arquivo:
                 try:
                     projeto = Projeto.objects.get(id=projeto_id)
-                    try:
-                        conteudo = arquivo.read().decode('utf-8').splitlines()
-                    except UnicodeDecodeError:
-                        arquivo.seek(0)
-                        try:
-                            conteudo = arquivo.read().decode('latin-1').splitlines()
-                        except UnicodeDecodeError:
-                            arquivo.seek(0)
-                            conteudo = arquivo.read().decode('windows-1252').splitlines()
-                    
-                    for linha in conteudo:
-                        campos = linha.strip().split('\t')
-                        if len(campos) < 6:
-                            messages.error(request, f'Formato inválido na linha: {linha}')
-                            continue
-                        de_vertice, para_vertice, longitude, latitude, distancia, confrontante_nome = campos[:6]
-                        
-                        # Inicializa coordenadas UTM
-                        utm_n = None
-                        utm_e = None
-                        
-                        # Tenta obter coordenadas UTM se existirem
-                        if len(campos) >= 8:
-                            try:
-                                utm_n = float(campos[6].replace(",", "."))
-                                utm_e = float(campos[7].replace(",", "."))
-                            except (ValueError, IndexError):
-                                pass
-                        
-                        confrontante_cpf_cnpj = campos[8] if len(campos) > 8 else ''
-
-                        vertice_data = {
-                            'projeto': projeto,
-                            'de_vertice': de_vertice,
-                            'para_vertice': para_vertice,
-                            'longitude': longitude,
-                            'latitude': latitude,
-                            'distancia': float(distancia.replace(",", ".")),
-                            'confrontante_texto': confrontante_nome
-                        }
-                        
-                        # Adiciona coordenadas UTM se existirem
-                        if utm_n is not None:
-                            vertice_data['utm_n'] = utm_n
-                        if utm_e is not None:
-                            vertice_data['utm_e'] = utm_e
-                            
-                        if confrontante_cpf_cnpj:
-                            try:
-                                confrontante = Confrontante.objects.get(cpf_cnpj=confrontante_cpf_cnpj, projeto=projeto)
-                                vertice_data['confrontante'] = confrontante
-                                vertice_data['confrontante_texto'] = ''
-                            except Confrontante.DoesNotExist:
-                                pass
-                        Vertice.objects.create(**vertice_data)
-                    messages.success(request, 'Vértices importados com sucesso!')
+                    tarefa = enfileirar(Tarefa.IMPORTAR_VERTICES, projeto, request.user, arquivo)
+                    acompanhar(request, tarefa)
+                    messages.success(request, 'Importação de vértices enviada para processamento.')
                 except Projeto.DoesNotExist:
                     messages.error(request, 'Projeto selecionado não existe.')
-                except ValueError as e:
-                    messages.error(request, f'Erro ao importar vértices: {str(e)}')
                 except Exception as e:
                     messages.error(request, f'Erro inesperado: {str(e)}')
             else:
@@ -902,36 +689,53 @@ def index(request):
             if projeto_id and arquivo:
                 try:
                     projeto = Projeto.objects.get(id=projeto_id)
-                    vertices = Vertice.objects.filter(projeto=projeto).order_by("id")
+                    vertices = Vertice.objects.filter(projeto=projeto).order_by(*ORDEM_ANEL)
 
-                    try:
-                        linhas = arquivo.read().decode("utf-8").splitlines()
-                    except UnicodeDecodeError:
-                        arquivo.seek(0)
-                        linhas = arquivo.read().decode("latin-1").splitlines()
+                    # Só as duas últimas colunas ficam em memória, não o arquivo inteiro
+                    colunas_n = []
+                    colunas_e = []
+                    for linha in ler_linhas(arquivo):
+                        if not linha.strip():
+                            continue
+                        partes = linha.replace(",", " ").split()
+                        colunas_n.append(partes[-2])
+                        colunas_e.append(partes[-1])
 
-                    if len(linhas) != vertices.count():
+                    vertices = list(vertices)
+                    if len(colunas_n) != len(vertices):
                         messages.error(request, "Quantidade de linhas no arquivo não confere com os vértices.")
                         return redirect("index")
 
-                    atualizados = 0
-
-                    for i, linha in enumerate(linhas):
-                        partes = linha.replace(",", " ").split()
+                    # Conversão vetorizada das duas colunas
+                    norte, norte_ok = parse_numeros_br(colunas_n)
+                    leste, leste_ok = parse_numeros_br(colunas_e)
+                    invalidos = ~(norte_ok & leste_ok)
+                    if invalidos.any():
+                        raise ValueError(f"coordenada inválida na linha {int(invalidos.argmax()) + 1}")
 
-                        utm_n = float(partes[-2].replace(",", "."))
-                        utm_e = float(partes[-1].replace(",", "."))
+                    atualizados = 0
 
-                        vertice = vertices[i]
+                    with geometria_em_lote():
+                        for vertice, utm_n, utm_e in zip(vertices, norte.tolist(), leste.tolist()):
 
-                        # ✅ SOMENTE SE NÃO TIVER UTM AINDA
-                        if not vertice.utm_n or not vertice.utm_e:
-                            vertice.utm_n = utm_n
-                            vertice.utm_e = utm_e
-                            vertice.save()
-                            atualizados += 1
+                            # ✅ SOMENTE SE NÃO TIVER UTM AINDA
+                            if not vertice.utm_n or not vertice.utm_e:
+                                vertice.utm_n = utm_n
+                                vertice.utm_e = utm_e
+                                vertice.save()
+                                atualizados += 1
 
                     messages.success(request, f"{atualizados} vértices atualizados com UTM.")
+
+                    # Lat/long que faltam saem da UTM; as que não conferem são avisadas
+                    conferencia = conferir_coordenadas(projeto)
+                    if conferencia.divergentes or conferencia.invalidos:
+                        messages.warning(request, conferencia.mensagem)
+                    elif conferencia.preenchidos:
+                        messages.info(request, conferencia.mensagem)
+                    pares = cruzamentos_do_projeto(projeto.id)
+                    if pares:
+                        messages.warning(request, mensagem_cruzamentos(pares))
                 except Projeto.DoesNotExist:
                     messages.error(request, "Projeto não encontrado.")
                 except Exception as e:
@@ -1095,366 +899,40 @@ def index(request):
             except Exception as e:
                 messages.error(request, f'Erro ao excluir vértice: {str(e)}')
 
-        elif action == 'gerar_memorial_pdf':
+        elif action == 'gerar_memorial':
             projeto_id = request.POST.get('projeto_memorial')
             try:
                 projeto = Projeto.objects.get(id=projeto_id)
-                vertices = Vertice.objects.filter(projeto=projeto)
-                beneficiarios = Beneficiario.objects.filter(projeto=projeto)
-                confrontantes = Confrontante.objects.filter(projeto=projeto, excluir_do_pdf=False)
-
-                # Log para depuração
-                print(f"Projeto ID (PDF): {projeto_id}")
-                print(f"Beneficiários encontrados (PDF): {len(beneficiarios)}")
-                print(f"Confrontantes encontrados (PDF): {len(confrontantes)}")
-                print(f"Vértices encontrados (PDF): {len(vertices)}")
-                print(f"Perímetro => {projeto.perimetro}", type(projeto.perimetro))
-
-                # Buffer para o PDF
-                buffer = io.BytesIO()
-                doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=2.5*cm, leftMargin=2.5*cm, topMargin=2*cm, bottomMargin=1.5*cm)
-                elements = []
-
-                # Estilos
-                styles = getSampleStyleSheet()
-                title_style = ParagraphStyle(
-                    'TitleStyle',
-                    parent=styles['Heading1'],
-                    fontName='Times-Roman',
-                    fontSize=16,
-                    alignment=1,
-                    spaceAfter=12,
-                    textTransform='uppercase',
-                    fontWeight='bold',
-                    underline=True
-                )
-                heading_style = ParagraphStyle(
-                    'HeadingStyle',
-                    parent=styles['Heading2'],
-                    fontName='Times-Roman',
-                    fontSize=14,
-                    spaceAfter=12,
-                    fontWeight='bold'
+                return resposta_documento(
+                    partial(gerar_memorial_docx, projeto),
+                    f"{projeto.nome} - Memorial.docx",
+                    CONTENT_TYPE_DOCX
                 )
-                normal_style = ParagraphStyle(
-                    'NormalStyle',
-                    parent=styles['Normal'],
-                    fontName='Times-Roman',
-                    fontSize=12,
-                    spaceAfter=12,
-                    firstLineIndent=1.25*cm,
-                    alignment=4,
-                    leading=5
-                )
-                descricao_style = ParagraphStyle(
-                    'DescricaoStyle',
-                    parent=styles['Normal'],
-                    fontName='Times-Roman',
-                    fontSize=12,
-                    spaceAfter=12,
-                    firstLineIndent=1.25*cm,
-                    alignment=TA_JUSTIFY,
-                    leading=18
-                )
-                center_style = ParagraphStyle(
-                    'CenterStyle',
-                    parent=styles['Normal'],
-                    fontName='Times-Roman',
-                    fontSize=12,
-                    spaceAfter=12,
-                    alignment=1
-                )
-                left_style = ParagraphStyle(
-                    'LeftStyle',
-                    parent=styles['Normal'],
-                    fontName='Times-Roman',
-                    fontSize=12,
-                    spaceAfter=12,
-                    alignment=0
-                )
-                section_style = ParagraphStyle(
-                    'SectionStyle',
-                    parent=styles['Normal'],
-                    fontName='Times-Roman',
-                    fontSize=14,
-                    spaceAfter=12,
-                    fontWeight='bold'
-                )
-
-                # Título principal
-                elements.append(Paragraph("MEMORIAL DESCRITIVO", title_style))
-                elements.append(Paragraph("<br/><br/>", normal_style))
-
-                # Seção 1: Beneficiário(s)
-                elements.append(Paragraph("1. Beneficiário(s):", section_style))
-                if beneficiarios:
-                    header_data = [["Nome", "CPF"]]
-                    header_table = Table(header_data, colWidths=[10*cm, 6*cm])
-                    header_table.setStyle(TableStyle([
-                        ('TEXTCOLOR', (0, 0), (-1, 0), '#000000'),
-                        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                        ('FONTNAME', (0, 0), (-1, -1), 'Times-Bold'),
-                        ('FONTSIZE', (0, 0), (-1, -1), 12),
-                        ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
-                    ]))
-                    elements.append(header_table)
-
-                    data = []
-                    for ben in beneficiarios:
-                        data.append([Paragraph(ben.nome, ParagraphStyle('Bold', fontName='Times-Bold', fontSize=12)), ben.cpf_cnpj])
-                    table_ben = Table(data, colWidths=[10*cm, 6*cm])
-                    table_ben.setStyle(TableStyle([
-                        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                        ('FONTNAME', (0, 0), (-1, -1), 'Times-Roman'),
-                        ('FONTSIZE', (0, 0), (-1, -1), 12),
-                        ('ALIGN', (1, 0), (1, -1), 'CENTER'),
-                    ]))
-                    elements.append(table_ben)
-                else:
-                    elements.append(Paragraph("Nenhum beneficiário registrado.", normal_style))
-                elements.append(Paragraph("<br/>", normal_style))
-
-                # Seção 2: Localização do Imóvel
-                elements.append(Paragraph("2. Localização do Imóvel:", heading_style))
-                
-                if projeto.inscricao_imobiliaria and projeto.inscricao_imobiliaria.strip():
-                    elements.append(Paragraph(f"Inscrição Imobiliária: {projeto.inscricao_imobiliaria}", normal_style))
-                
-                elements.append(Paragraph(f"{projeto.endereco}", descricao_style))
-                elements.append(Paragraph("<br/>", normal_style))
-
-                # Seção 3: Área
-                elements.append(Paragraph("3. Área:", heading_style))
-                elements.append(Paragraph(f"{projeto.area}m²".replace(".",","), normal_style))
-                elements.append(Paragraph("<br/>", normal_style))
-
-                # Seção 4: Perímetro
-                elements.append(Paragraph("4. Perímetro:", heading_style))
-                elements.append(Paragraph(f"{projeto.perimetro} m".replace(".",","), normal_style))
-                elements.append(Paragraph("<br/>", normal_style))
-
-                # Seção 5: Época da Medição
-                elements.append(Paragraph("5. Época da Medição:", heading_style))
-                elements.append(Paragraph(f"{projeto.epoca_medicao}", normal_style))
-                elements.append(Paragraph("<br/>", normal_style))
-
-                # Seção 6: Instrumento Utilizado
-                elements.append(Paragraph("6. Instrumento Utilizado:", heading_style))
-                elements.append(Paragraph(f"{projeto.instrumento}", normal_style))
-                elements.append(Paragraph("<br/>", normal_style))
-
-                # Seção 7: Sistema Geodésico de Referência
-                elements.append(Paragraph("7. Sistema Geodésico de Referência:", heading_style))
-                elements.append(Paragraph("SIRGAS 2000", normal_style))
-                elements.append(Paragraph("<br/>", normal_style))
-
-                # Seção 8: Projeção Cartográfica de Distância e Área
-                elements.append(Paragraph("8. Projeção Cartográfica de Distância e Área:", heading_style))
-                elements.append(Paragraph("UTM", normal_style))
-                elements.append(Paragraph("<br/>", normal_style))
-
-                # Seção 9: Tabela de Coordenadas, Confrontações e Medidas
-                elements.append(Paragraph("9. Tabela de Coordenadas, Confrontações e Medidas:", heading_style))
-
-                data = [['VÉRTICE', 'LATITUDE', 'LONGITUDE', 'DIST.(m)', 'CONFRONTANTE']]
-
-                if vertices:
-                    for v in vertices:
-                        data.append([
-                            str(v.de_vertice),
-                            str(v.latitude),
-                            str(v.longitude).replace("O","W"),
-                            f'{float(v.distancia):.2f}'.replace(".",","),
-                            str(v.confrontante.nome if v.confrontante else v.confrontante_texto)
-                        ])
-                else:
-                    data.append(["Nenhum vértice registrado.", "", "", "", ""])
-
-                largura_confrontantes = calcular_largura_confrontantes(data)
-                larguras = [
-                    2 * cm,
-                    3.2 * cm,
-                    3.2 * cm,
-                    2.5 * cm,
-                    max(largura_confrontantes, 7 * cm)
-                ]
-
-                table = Table(data, colWidths=larguras, repeatRows=1)
-
-                print("LARGURA CONFRONTANTES =>", largura_confrontantes, type(largura_confrontantes))
-
-                table.setStyle(TableStyle([
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-                    ('FONTNAME', (0, 0), (-1, -1), 'Times-Roman'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 10),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('ALIGN', (4,1), (4,-1), 'LEFT'),
-                ]))
-
-                elements.append(table)
-                elements.append(Paragraph("<br/><br/>", normal_style))
-                elements.append(Paragraph("<br/>", normal_style))
-
-                # Seção 10: Descrição Perimétrica
-                elements.append(Paragraph("10. Descrição Perimétrica:", heading_style))
-
-                lista_vertices = list(vertices)
-                total = len(lista_vertices)
-
-                if total < 3:
-                    elements.append(
-                        Paragraph(
-                            "Não há vértices suficientes para gerar a descrição perimétrica.",
-                            normal_style
-                        )
-                    )
-                else:
-                    texto = "Inicia-se a descrição deste perímetro no ponto de vértice "
-
-                    v_inicio = lista_vertices[0]
-                    texto += (
-                        f"<strong>{v_inicio.de_vertice}</strong>, de coordenadas "
-                        f"N {br_coord(v_inicio.utm_n)}m e "
-                        f"E {br_coord(v_inicio.utm_e)}m; "
-                    )
-
-                    for i in range(total):
-                        v1 = lista_vertices[i]
-                        v2 = lista_vertices[(i + 1) % total]
-
-                        azimute = calcular_azimute_utm(
-                            v1.utm_e, v1.utm_n,
-                            v2.utm_e, v2.utm_n
-                        )
-
-                        distancia = br(v1.distancia)
-
-                        confrontante = (
-                            v1.confrontante.nome
-                            if v1.confrontante
-                            else v1.confrontante_texto
-                        )
-
-                        confrontante_doc = ""
-                        if v1.confrontante and v1.confrontante.cpf_cnpj:
-                            doc_raw = v1.confrontante.cpf_cnpj
-                            doc_numbers = "".join(filter(str.isdigit, doc_raw))
-
-                            if len(doc_numbers) == 11:
-                                confrontante_doc = f" CPF: {doc_raw}"
-                            elif len(doc_numbers) == 14:
-                                confrontante_doc = f" CNPJ: {doc_raw}"
-
-                        texto += (
-                            f"deste segue confrontando com {confrontante},{confrontante_doc}, "
-                            f"com azimute de {azimute} e distância de {distancia}m, "
-                            f"até o vértice <strong>{v2.de_vertice}</strong>, de coordenadas "
-                            f"N {br_coord(v2.utm_n)}m e E {br_coord(v2.utm_e)}m, "
-                        )
-                    perimetro = f"{projeto.perimetro:.2f}".replace(".", ",")
-                    texto += (
-                        "ponto inicial da descrição deste perímetro. Todas as coordenadas aqui descritas estão georreferenciadas ao Sistema Geodésico Brasileiro "
-                        "e encontram-se representadas no Sistema UTM, referenciadas ao Meridiano Central 51º WGr, "
-                        "tendo como Datum o SIRGAS2000. Todos os azimutes e distâncias, área e perímetro foram "
-                        f"calculados no plano de projeção UTM. Encerrado o perímetro total de {perimetro} m "
-                        f"e área de {br(projeto.area)} m²."
-                    )
-
-                    elements.append(Paragraph(texto, descricao_style))
-
-                # Local e Data
-                elements.append(Paragraph("<br/>", normal_style))
-                elements.append(Paragraph("<br/>", normal_style))
-
-                data_atual = datetime.now()
-
-                meses = {
-                    1: "Janeiro", 2: "Fevereiro", 3: "Março", 4: "Abril", 5: "Maio", 6: "Junho",
-                    7: "Julho", 8: "Agosto", 9: "Setembro", 10: "Outubro", 11: "Novembro", 12: "Dezembro"
-                }
-
-                data_formatada = f"{data_atual.day} de {meses[data_atual.month]} de {data_atual.year}"
-
-                beneficiario = projeto.beneficiarios.first()
-                cidade_beneficiario = beneficiario.cidade if beneficiario else "Cidade não especificada"
-                elements.append(Paragraph(f"{cidade_beneficiario}, {data_formatada}.", left_style))
-                elements.append(Paragraph("<br/>", normal_style))
-                elements.append(Paragraph("<br/>", normal_style))
-                elements.append(Paragraph("<br/>", normal_style))
-                elements.append(Paragraph("<br/>", normal_style))
-                elements.append(Paragraph("<br/>", normal_style))
-
-                # Assinatura do Responsável Técnico
-                elements.append(Paragraph("__________________________________________________", center_style))
-                elements.append(Paragraph("Everton Valdir Pinto Vieira", ParagraphStyle('BoldCenter', parent=center_style, fontName='Times-Bold', fontWeight='bold')))
-                elements.append(Paragraph("Resp. Técnico em Agrimensura", center_style))
-                elements.append(Paragraph("CFT 02544161957", center_style))
-                elements.append(Paragraph("<br/>", center_style))
-                elements.append(Paragraph("<br/>", normal_style))
-                elements.append(Paragraph("<br/>", normal_style))
-                elements.append(Paragraph("<br/>", normal_style))
-                elements.append(Paragraph("<br/>", normal_style))
-
-                # Tabela de Assinaturas (Requerentes e Confrontantes)
-                all_signatures = [(ben.nome, ben.cpf_cnpj, "Requerente") for ben in beneficiarios] + \
-                                [(con.nome, con.cpf_cnpj, "Confrontante") for con in confrontantes]
-                if all_signatures:
-                    signature_data = []
-                    for i in range(0, len(all_signatures), 2):
-                        row = ["", "", ""]
-                        nome1, cpf1, tipo1 = all_signatures[i]
-                        text1 = f"{nome1}<br/>CPF: {cpf1}<br/>{tipo1}"
-                        style1 = ParagraphStyle('Signature', fontName='Times-Roman', fontSize=12, leading=14)
-                        if nome1 in ["Alcides De Oliveira", "Maria Aparecida Trindade Oliveira"]:
-                            text1 = f"<u>{nome1}</u><br/>CPF: {cpf1}<br/>{tipo1}"
-                        row[0] = Paragraph(text1, style1)
-                        row[1] = ""
-                        if i + 1 < len(all_signatures):
-                            nome2, cpf2, tipo2 = all_signatures[i + 1]
-                            text2 = f"{nome2}<br/>CPF: {cpf2}<br/>{tipo2}"
-                            style2 = ParagraphStyle('Signature', fontName='Times-Roman', fontSize=12, leading=14)
-                            if nome2 in ["Alcides De Oliveira", "Maria Aparecida Trindade Oliveira"]:
-                                text2 = f"<u>{nome2}</u><br/>CPF: {cpf2}<br/>{tipo2}"
-                            row[2] = Paragraph(text2, style2)
-                        signature_data.append(row)
-                        signature_data.append(["", "", ""])
-                        signature_data.append(["", "", ""])
-                        signature_data.append(["", "", ""])
-
-                    table_sign = Table(signature_data, colWidths=[8*cm, 1*cm, 7*cm])
-                    table_sign.setStyle(TableStyle([
-                        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                    ]))
-                    elements.append(table_sign)
-                else:
-                    elements.append(Paragraph("Nenhuma assinatura registrada.", normal_style))
+            except Projeto.DoesNotExist:
+                messages.error(request, 'Projeto selecionado não existe.')
+            except Exception as e:
+                messages.error(request, f'Erro ao gerar memorial em Word: {str(e)}')
 
-                # Gerar o PDF
-                doc.build(elements)
-                buffer.seek(0)
+        elif action == 'gerar_memorial_pdf':
+            projeto_id = request.POST.get('projeto_memorial')
+            try:
+                projeto = Projeto.objects.get(id=projeto_id)
+                # Só renderiza se o conteúdo mudou desde o último download
+                arquivo, acerto, segundos = cache_memoriais.abrir(projeto)
 
-                response = HttpResponse(
-                    buffer.getvalue(),
+                response = FileResponse(
+                    arquivo,
+                    as_attachment=True,
+                    filename=f"{projeto.nome} - Memorial.pdf",
                     content_type='application/pdf'
                 )
-                response['Content-Disposition'] = f'attachment; filename="{projeto.nome} - Memorial.pdf"'
+                response['X-Memorial-Cache'] = 'HIT' if acerto else 'MISS'
+                response['X-Memorial-Render-Ms'] = f"{segundos * 1000:.0f}"
                 return response
             except Projeto.DoesNotExist:
                 messages.error(request, 'Projeto selecionado não existe.')
             except Exception as e:
                 messages.error(request, f'Erro ao gerar memorial em PDF: {str(e)}')
-                print(f"Erro detalhado (PDF): {str(e)}")
+                logger.exception("Erro ao gerar memorial em PDF")
 
-        if projeto_selecionado:
-            beneficiarios = Beneficiario.objects.filter(projeto=projeto_selecionado)
-            confrontantes = Confrontante.objects.filter(projeto=projeto_selecionado)
-            vertices = Vertice.objects.filter(projeto=projeto_selecionado)
-
-    return render(request, 'levantamento/index.html', {
-        'projetos': projetos,
-        'beneficiarios': beneficiarios,
-        'confrontantes': confrontantes,
-        'vertices': vertices,
-        'projeto_selecionado': projeto_selecionado
-    })
\ No newline at end of file
+    return render(request, 'levantamento/index.html', _dados_index(request))
\ No newline at end of file
@@ -41,6 +41,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'levantamento',
 ]
 
@@ -89,6 +90,19 @@ WSGI_APPLICATION = 'reurb_BD.wsgi.application'
 # }
 
 # BASE DE DADOS POSTGRESQL SUPABASE
+# Conexões persistentes: cada worker reaproveita a conexão (TLS) com o Supabase
+# entre requisições por até DB_CONN_MAX_AGE segundos (0 = uma conexão por
+# requisição; vazio = sem limite). Com DB_CONN_HEALTH_CHECKS a conexão é
+# testada antes de ser reutilizada e reaberta se tiver caído.
+# Atrás do pooler do Supabase em modo transação (porta 6543) use DB_PGBOUNCER=1,
+# que desliga os cursores do lado do servidor usados por .iterator().
+# Para medir o ganho: python manage.py medir_conexoes
+def env_bool(nome, padrao):
+    return os.getenv(nome, padrao).strip().lower() in ('1', 'true', 'sim', 'yes')
+
+
+conn_max_age = os.getenv('DB_CONN_MAX_AGE', '60').strip()
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -97,6 +111,13 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
         'PORT': os.getenv('DB_PORT'),
+        'CONN_MAX_AGE': int(conn_max_age) if conn_max_age else None,
+        'CONN_HEALTH_CHECKS': env_bool('DB_CONN_HEALTH_CHECKS', '1'),
+        'DISABLE_SERVER_SIDE_CURSORS': env_bool('DB_PGBOUNCER', '0'),
+        'OPTIONS': {
+            'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', '10')),
+            'sslmode': os.getenv('DB_SSLMODE', 'prefer'),
+        },
     }
 }
 
@@ -143,6 +164,43 @@ USE_TZ = True
 STATIC_ROOT = BASE_DIR / "staticfiles"
 STATIC_URL = '/static/'
 
+# Arquivos enviados para as tarefas em segundo plano e documentos gerados
+
+MEDIA_ROOT = BASE_DIR / "media"
+MEDIA_URL = '/media/'
+
+# Documentos gerados para download ficam em memória até este tamanho e
+# depois passam para um arquivo temporário (levantamento/documentos.py)
+DOCUMENTOS_MEMORIA_MAX_BYTES = int(os.getenv('DOCUMENTOS_MEMORIA_MAX_MB', '8')) * 1024 * 1024
+
+# Cache em disco dos memoriais em PDF (levantamento/memorial/cache.py).
+# Sem MEMORIAL_CACHE_DIR, os arquivos ficam em MEDIA_ROOT/cache_memoriais
+MEMORIAL_CACHE_MAX_BYTES = int(os.getenv('MEMORIAL_CACHE_MAX_MB', '200')) * 1024 * 1024
+
+# Tarefa em execução há mais que isto (worker morto no meio) é dada como erro
+TAREFA_TEMPO_MAXIMO_MINUTOS = int(os.getenv('TAREFA_TEMPO_MAXIMO_MINUTOS', '60'))
+# Memoriais gerados pelas tarefas ficam para download por este tempo
+TAREFA_RESULTADO_HORAS = int(os.getenv('TAREFA_RESULTADO_HORAS', '24'))
+
+# Processos usados pelos memoriais em lote (vazio = um por núcleo)
+MEMORIAL_LOTE_PROCESSOS = int(os.getenv('MEMORIAL_LOTE_PROCESSOS') or 0) or None
+
+# Responsável técnico que assina os memoriais (PDF e Word)
+MEMORIAL_RESPONSAVEL_TECNICO = {
+    'nome': os.getenv('MEMORIAL_TECNICO_NOME', 'Everton Valdir Pinto Vieira'),
+    'titulo': os.getenv('MEMORIAL_TECNICO_TITULO', 'Resp. Técnico em Agrimensura'),
+    'registro': os.getenv('MEMORIAL_TECNICO_REGISTRO', 'CFT 02544161957'),
+}
+
+# Nomes que saem sublinhados no quadro de assinaturas do memorial
+MEMORIAL_ASSINATURAS_SUBLINHADAS = ['Alcides De Oliveira', 'Maria Aparecida Trindade Oliveira']
+
+
+# Coordenadas planas dos levantamentos (levantamento/coordenadas.py): SIRGAS
+# 2000 / UTM fuso 22S, e a diferença aceita entre lat/long e UTM de um vértice
+REURB_CRS_UTM = os.getenv('REURB_CRS_UTM', 'EPSG:31982')
+REURB_TOLERANCIA_COORDENADAS_M = float(os.getenv('REURB_TOLERANCIA_COORDENADAS_M', '0.5'))
+
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field